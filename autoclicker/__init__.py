@@ -1,3 +1,3 @@
-from .core import AutoClicker, MS_PER_SEC, ms_to_sec, coerce_bool, safe_int
+from .core import AutoClicker, MS_PER_SEC, US_PER_SEC, ms_to_sec, us_to_sec, coerce_bool, safe_int
 
-__all__ = ["AutoClicker", "MS_PER_SEC", "ms_to_sec", "coerce_bool", "safe_int"]
+__all__ = ["AutoClicker", "MS_PER_SEC", "US_PER_SEC", "ms_to_sec", "us_to_sec", "coerce_bool", "safe_int"]
@@ -1,11 +1,41 @@
+import argparse
+import multiprocessing
+import sys
+
 try:
     from .ui import App
+    from .profiler import DEFAULT_PROFILE_PREFIX
+    from .session import run_headless
 except ImportError:
     from autoclicker.ui import App
+    from autoclicker.profiler import DEFAULT_PROFILE_PREFIX
+    from autoclicker.session import run_headless
 
 
-def main():
-    app = App()
+def main(argv=None):
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(prog="python -m autoclicker")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without the window using the saved config and its schedule",
+    )
+    parser.add_argument(
+        "--control",
+        metavar="ADDRESS",
+        help="serve the local control API on a port, 127.0.0.1:PORT or a unix socket path",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DEFAULT_PROFILE_PREFIX,
+        metavar="PREFIX",
+        help="sample the click and UI threads during sessions; writes PREFIX.txt and PREFIX.collapsed",
+    )
+    args = parser.parse_args(argv)
+    if args.headless:
+        sys.exit(run_headless(control_address=args.control, profile=args.profile))
+    app = App(control_address=args.control, profile=args.profile)
     app.mainloop()
 
 
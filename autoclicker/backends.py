@@ -0,0 +1,301 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import platform
+import sys
+import time
+
+from pynput.mouse import Button, Controller
+
+from .config import write_atomic
+
+# Capability flags a backend advertises.
+CAP_MOVE = "move"              # moves the real cursor
+CAP_READ_POSITION = "read_position"
+CAP_BATCH = "batch"            # queues events until click() or flush() sends them
+CAP_BACKGROUND = "background"  # delivers to one window without touching the cursor
+
+DEFAULT_BACKEND = "auto"
+# Written by `bench backends`; "auto" picks the fastest measured backend.
+BACKEND_RESULTS_FILENAME = "autoclicker_backends.json"
+
+
+class InputBackend:
+    name = None
+    capabilities = frozenset()
+
+    def press(self, button, x, y):
+        raise NotImplementedError
+
+    def release(self, button, x, y):
+        raise NotImplementedError
+
+    def click(self, button, x, y, count):
+        for _ in range(count):
+            self.press(button, x, y)
+            self.release(button, x, y)
+
+    def move(self, x, y):
+        pass
+
+    def batch(self, events):
+        # events: ("move", x, y), ("press", button, x, y), ("release", button, x, y)
+        # or ("click", button, x, y, count), sent together.
+        for op, *args in events:
+            getattr(self, op)(*args)
+        self.flush()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PynputBackend(InputBackend):
+    name = "pynput"
+    capabilities = frozenset({CAP_MOVE, CAP_READ_POSITION})
+
+    def __init__(self, mouse=None):
+        self.mouse = mouse if mouse else Controller()
+
+    def press(self, button, x, y):
+        self.mouse.press(button)
+
+    def release(self, button, x, y):
+        self.mouse.release(button)
+
+    def click(self, button, x, y, count):
+        self.mouse.click(button, count)
+
+    def move(self, x, y):
+        self.mouse.position = (x, y)
+
+
+class BackgroundBackend(InputBackend):
+    # Posts messages to one window; events are dropped once it goes away.
+    name = "background"
+    capabilities = frozenset({CAP_BACKGROUND})
+
+    def __init__(self, clicker, sleep=time.sleep, double_click_gap_sec=0.005):
+        self.clicker = clicker
+        self.sleep = sleep
+        self.double_click_gap_sec = double_click_gap_sec
+
+    def is_valid(self):
+        if not self.clicker:
+            return False
+        is_valid = getattr(self.clicker, "is_valid", None)
+        return is_valid() if callable(is_valid) else True
+
+    def press(self, button, x, y):
+        if self.is_valid():
+            self.clicker.press(x, y, button)
+
+    def release(self, button, x, y):
+        if self.is_valid():
+            self.clicker.release(x, y, button)
+
+    def click(self, button, x, y, count):
+        if not self.is_valid():
+            return
+        for i in range(count):
+            self.clicker.press(x, y, button)
+            self.clicker.release(x, y, button)
+            if count == 2 and i == 0:
+                self.sleep(self.double_click_gap_sec)
+
+
+X_BUTTONS = {Button.left: 1, Button.middle: 2, Button.right: 3}
+X_CURRENT_SCREEN = -1
+_xtest_libs = None
+_xtest_usable = None
+
+
+def _load_xtest():
+    # (libX11, libXtst) with prototypes set, or None off X11; looked up once.
+    global _xtest_libs
+    if _xtest_libs is not None:
+        return _xtest_libs or None
+    _xtest_libs = ()
+    if not sys.platform.startswith("linux") or not os.environ.get("DISPLAY"):
+        return None
+    x11_path = ctypes.util.find_library("X11")
+    xtst_path = ctypes.util.find_library("Xtst")
+    if not x11_path or not xtst_path:
+        return None
+    try:
+        x11 = ctypes.CDLL(x11_path)
+        xtst = ctypes.CDLL(xtst_path)
+    except OSError:
+        return None
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    x11.XFlush.argtypes = [ctypes.c_void_p]
+    xtst.XTestQueryExtension.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+    xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+    xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+    _xtest_libs = (x11, xtst)
+    return _xtest_libs
+
+
+def xtest_available():
+    global _xtest_usable
+    if _xtest_usable is None:
+        _xtest_usable = False
+        libs = _load_xtest()
+        display = libs[0].XOpenDisplay(None) if libs else None
+        if display:
+            values = [ctypes.c_int() for _ in range(4)]
+            _xtest_usable = bool(libs[1].XTestQueryExtension(display, *[ctypes.byref(value) for value in values]))
+            libs[0].XCloseDisplay(display)
+    return _xtest_usable
+
+
+class XTestBackend(InputBackend):
+    # One display connection for the engine's lifetime. Motion, press and
+    # release are queued; click() and flush() send everything in one XFlush.
+    name = "xtest"
+    capabilities = frozenset({CAP_MOVE, CAP_BATCH})
+
+    def __init__(self):
+        libs = _load_xtest()
+        if not libs:
+            raise ValueError("XTest is not available")
+        self.x11, xtst = libs
+        self.display = self.x11.XOpenDisplay(None)
+        if not self.display:
+            raise ValueError("unable to open the X display")
+        self.fake_button = xtst.XTestFakeButtonEvent
+        self.fake_motion = xtst.XTestFakeMotionEvent
+        self.xflush = self.x11.XFlush
+
+    def press(self, button, x, y):
+        self.fake_button(self.display, X_BUTTONS[button], 1, 0)
+
+    def release(self, button, x, y):
+        self.fake_button(self.display, X_BUTTONS[button], 0, 0)
+
+    def _queue_click(self, button, count):
+        display = self.display
+        code = X_BUTTONS[button]
+        for _ in range(count):
+            self.fake_button(display, code, 1, 0)
+            self.fake_button(display, code, 0, 0)
+
+    def click(self, button, x, y, count):
+        self._queue_click(button, count)
+        self.xflush(self.display)
+
+    def move(self, x, y):
+        self.fake_motion(self.display, X_CURRENT_SCREEN, int(x), int(y), 0)
+
+    def batch(self, events):
+        for op, *args in events:
+            if op == "move":
+                self.move(*args)
+            elif op == "click":
+                self._queue_click(args[0], args[3])
+            else:
+                self.fake_button(self.display, X_BUTTONS[args[0]], int(op == "press"), 0)
+        self.flush()
+
+    def flush(self):
+        if self.display:
+            self.xflush(self.display)
+
+    def close(self):
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+            self.display = None
+
+
+# name -> (factory, available, rank); without measurements "auto" picks the
+# highest-ranked available backend.
+BACKENDS = {}
+
+
+def register_backend(name, factory, available=None, rank=0):
+    BACKENDS[name] = (factory, available, rank)
+
+
+def backend_available(name):
+    if name not in BACKENDS:
+        return False
+    available = BACKENDS[name][1]
+    return available is None or bool(available())
+
+
+def available_backends():
+    names = [name for name in BACKENDS if backend_available(name)]
+    return sorted(names, key=lambda name: -BACKENDS[name][2])
+
+
+def get_backend_results_path(base_dir=None):
+    if base_dir:
+        return os.path.join(base_dir, BACKEND_RESULTS_FILENAME)
+    return BACKEND_RESULTS_FILENAME
+
+
+def _machine():
+    # Results only hold for the host and display they were measured on.
+    return {"host": platform.node(), "display": os.environ.get("DISPLAY")}
+
+
+def write_backend_results(results, path=None):
+    # results: name -> {"p50_us": ..., "events_per_sec": ...}
+    write_atomic(path or get_backend_results_path(), json.dumps(dict(_machine(), results=results)))
+
+
+def read_backend_results(path=None):
+    try:
+        with open(path or get_backend_results_path(), "r") as handle:
+            data = json.load(handle)
+        if {key: data.get(key) for key in ("host", "display")} != _machine():
+            return {}
+        return {name: float(result["p50_us"]) for name, result in data["results"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def auto_backend_name(measured=None):
+    # The available backend with the lowest measured p50 latency, else the
+    # highest-ranked one. measured: name -> p50 us, as read_backend_results().
+    names = available_backends()
+    if not names:
+        raise ValueError("no input backend is available")
+    measured = read_backend_results() if measured is None else measured
+    timed = [name for name in names if name in measured]
+    if timed:
+        return min(timed, key=measured.get)
+    return names[0]
+
+
+def create_backend(name=DEFAULT_BACKEND):
+    if name in (None, DEFAULT_BACKEND):
+        name = auto_backend_name()
+    if name not in BACKENDS:
+        raise ValueError(f"unknown input backend: {name}")
+    if not backend_available(name):
+        raise ValueError(f"input backend '{name}' is not available here")
+    return BACKENDS[name][0]()
+
+
+def backend_from_config(value):
+    if not value or value == DEFAULT_BACKEND:
+        return None
+    if value not in BACKENDS:
+        print(f"Invalid input backend: {value} (known: {', '.join(sorted(BACKENDS))})")
+        return None
+    if not backend_available(value):
+        print(f"Input backend '{value}' is not available here; using auto")
+        return None
+    return value
+
+
+register_backend("pynput", PynputBackend)
+# Ranked below pynput, so "auto" only picks it once `bench backends` has
+# measured it faster on this display.
+register_backend("xtest", XTestBackend, available=xtest_available, rank=-10)
@@ -0,0 +1,942 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from PIL import Image, ImageFilter
+from pynput.mouse import Button
+
+from .config import AutoSaver, write_atomic
+from .backends import (CAP_MOVE, PynputBackend, auto_backend_name, available_backends, create_backend,
+                       get_backend_results_path, write_backend_results)
+from .control import DEFAULT_STATS_INTERVAL_MS, ControlServer
+from .core import AutoClicker, MS_PER_SEC, US_PER_MS, US_PER_SEC
+from .layout import LayoutManager
+from .locate import TemplateLocator
+from .metrics import EngineMetrics
+from .pixel import PixelCondition
+from .preview import PreviewWorker, preview_config, preview_key
+from .process import ProcessClicker, SharedStats
+from .profiles import ProfileStore
+from .session import engine_kwargs_from_config, profile_snapshot, resolve_profile
+from .script import OP_LOOP, OP_NEXT, STRIDE
+from .sweep import simulate
+from .trace import Tracer
+from .tuning import SCHED_PRIORITY_HIGH, SCHED_PRIORITY_REALTIME, spin_sleeper
+from .verify import InjectionVerifier
+
+DEFAULT_BENCH_DURATION_SEC = 3.0
+DEFAULT_BENCH_INTERVAL_MS = 5
+BENCH_TIMER_SLACK_NS = 1000
+# Requested waits for the sleep resolution table, and the spin budget compared.
+BENCH_RESOLUTION_TARGETS_US = (50, 100, 250, 500, 1000)
+BENCH_RESOLUTION_SAMPLES = 200
+BENCH_SPIN_US = 1000
+BENCH_CAPTURE_COST_SEC = 0.004
+BENCH_PIXEL_REGION = (100, 100, 8, 8)
+BENCH_SCREEN_SIZE = (1920, 1080)
+BENCH_TEMPLATE_SIZE = (64, 48)
+BENCH_LOCATE_ROUNDS = 20
+BENCH_SCRIPT_ITERATIONS = 200000
+BENCH_METRICS_ROUNDS = 5
+BENCH_TRACE_SPANS_PER_CLICK = 8
+BENCH_BACKEND_EVENTS = 2000
+BENCH_BACKEND_POINT = (200, 200)
+# Entries and rows per human-like settings group: hold, drift, thinking pause, fatigue.
+BENCH_LAYOUT_GROUPS = ((2, 2), (4, 2), (4, 3), (4, 4))
+BENCH_LAYOUT_TOGGLES = 2000
+BENCH_THEME_RUNS = 5
+BENCH_PROFILE_COUNTS = (10, 100, 1000)
+BENCH_AUTOSAVE_BURSTS = 20
+BENCH_AUTOSAVE_BURST = 10
+BENCH_AUTOSAVE_DELAY_MS = 20
+BENCH_SWITCHES = 200
+BENCH_VERIFY_CLICKS = 500
+BENCH_VERIFY_TIMEOUT_SEC = 30
+BENCH_SWITCH_POLL_SEC = 0.00005
+# Typing 120 into the mean interval field, then undoing back to 80.
+BENCH_PREVIEW_EDITS = (1, 12, 120, 12, 1, 8, 80)
+BENCH_PROFILE_SETTINGS = {
+    "interval_us": 50_000, "random_interval_us": 30_000, "timing_model": "Uniform", "button": "Left",
+    "click_type": "Single", "human_like": True, "drift_enabled": True, "offset_x": 15, "offset_y": 15,
+}
+# Run in a fresh interpreter per sample so each one pays the full load cost.
+BENCH_THEME_SCRIPT = '''
+import json, os, sys, time, tkinter
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return 0
+
+root = tkinter.Tk()
+root.withdraw()
+root.update()
+start = time.perf_counter()
+before = rss_kb()
+root.tk.call("source", sys.argv[1])
+steps = []
+for mode in ("dark", "light"):
+    root.tk.call("sv_load_theme", mode)
+    root.update()
+    steps.append((time.perf_counter() - start, rss_kb() - before))
+print(json.dumps(steps))
+'''
+BENCH_LAYOUT_BURST = 4
+BENCH_SUBSCRIBER_COUNTS = (0, 100, 400)
+BENCH_STATS_INTERVAL_MS = DEFAULT_STATS_INTERVAL_MS
+UI_LOAD_WIDGETS = 400
+
+
+class NullMouse:
+    def __init__(self):
+        self.position = (0, 0)
+
+    def press(self, button):
+        pass
+
+    def release(self, button):
+        pass
+
+    def click(self, button, count):
+        pass
+
+
+class SlowFrameSource:
+    def __init__(self, color):
+        self.color = color
+        self.grabs = 0
+
+    def grab(self, bbox):
+        # Emulates a screen capture round trip; sleeps release the GIL like real grabs do.
+        time.sleep(BENCH_CAPTURE_COST_SEC)
+        self.grabs += 1
+        left, top, right, bottom = bbox
+        return Image.new("RGB", (right - left, bottom - top), self.color)
+
+
+class StillFrameSource:
+    def __init__(self, image):
+        self.image = image
+
+    def grab(self, bbox):
+        return self.image if bbox is None else self.image.crop(bbox)
+
+
+class StopWhenIdleApp:
+    # Ends a clicker run() called on the current thread once clicking stops.
+    def __init__(self):
+        self.clicker = None
+
+    def after(self, delay_ms, callback):
+        self.clicker.program_running = False
+
+    def stop_clicking_ui(self):
+        pass
+
+
+class StatsController:
+    def __init__(self, stats):
+        self.stats_source = stats
+
+    def start(self, profile=None, cps=None):
+        pass
+
+    def stop(self):
+        pass
+
+    def configure(self, updates):
+        pass
+
+    def stats(self):
+        return {"running": self.stats_source.running, "click_count": self.stats_source.click_count}
+
+
+def _drain_subscribers(address, count, stop_event, received):
+    subscribe = (json.dumps({"cmd": "subscribe"}) + "\n").encode()
+    selector = selectors.DefaultSelector()
+    clients = []
+    for _ in range(count):
+        client = socket.create_connection(address)
+        client.sendall(subscribe)
+        client.setblocking(False)
+        selector.register(client, selectors.EVENT_READ)
+        clients.append(client)
+    lines = 0
+    while not stop_event.is_set():
+        for key, _ in selector.select(0.05):
+            try:
+                lines += key.fileobj.recv(65536).count(b"\n")
+            except BlockingIOError:
+                pass
+    received.value = lines
+    for client in clients:
+        client.close()
+
+
+class SubscriberLoad:
+    # A control server with `count` stats subscribers. The subscribers run in a
+    # child process so only the server side shares the engine's interpreter.
+    def __init__(self, count, stats_interval_ms=BENCH_STATS_INTERVAL_MS):
+        self.count = count
+        self.stats_interval_ms = stats_interval_ms
+        self.server = None
+        self.stop_event = multiprocessing.Event()
+        self.received = multiprocessing.Value("q", 0)
+        self.reader = None
+
+    def start(self, stats):
+        self.server = ControlServer(StatsController(stats), "127.0.0.1:0", stats_interval_ms=self.stats_interval_ms)
+        self.server.start()
+        address = self.server.wait_ready()
+        self.reader = multiprocessing.Process(
+            target=_drain_subscribers,
+            args=(address, self.count, self.stop_event, self.received),
+            daemon=True,
+        )
+        self.reader.start()
+        while len(self.server.subscribers) < self.count and self.reader.is_alive():
+            time.sleep(0.01)
+
+    def stop(self):
+        self.stop_event.set()
+        self.reader.join()
+        self.server.stop()
+        self.server.join()
+
+
+def _ui_load(stop_event):
+    # Stands in for Tk work on the main thread: pure-Python geometry passes
+    # that hold the GIL the way theme toggles and update_tab_geometry do.
+    while not stop_event.is_set():
+        rows = [(i, i * 3 % 17, i * 7 % 23) for i in range(UI_LOAD_WIDGETS)]
+        sorted(rows, key=lambda row: (row[1], row[2]))
+        sum(width * height for _, width, height in rows)
+
+
+class CountingMouse(NullMouse):
+    # Every position read or write stands for one display-server round trip.
+    def __init__(self):
+        self.pos = (0, 0)
+        self.round_trips = 0
+
+    @property
+    def position(self):
+        self.round_trips += 1
+        return self.pos
+
+    @position.setter
+    def position(self, value):
+        self.round_trips += 1
+        self.pos = value
+
+
+class StaticListener:
+    def __init__(self, on_move):
+        self.on_move = on_move
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def is_alive(self):
+        return True
+
+
+class FakeTkWidget:
+    # Counts the calls that would cross into Tcl.
+    calls = 0
+
+    def configure(self, **options):
+        FakeTkWidget.calls += 1
+
+    def grid(self):
+        FakeTkWidget.calls += 1
+
+    def grid_remove(self):
+        FakeTkWidget.calls += 1
+
+
+class IdleQueue:
+    def __init__(self, root=None):
+        self.root = root
+        self.callbacks = []
+
+    def after_idle(self, callback):
+        self.callbacks.append(callback)
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def _layout_widgets():
+    # Real ttk widgets when a display is available, call counters otherwise.
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+    except Exception:
+        groups = [([FakeTkWidget() for _ in range(entries)], [FakeTkWidget() for _ in range(rows)])
+                  for entries, rows in BENCH_LAYOUT_GROUPS]
+        return None, groups
+    groups = []
+    for entries, rows in BENCH_LAYOUT_GROUPS:
+        frames = []
+        for _ in range(rows):
+            frame = ttk.Frame(root)
+            frame.grid(sticky="ew")
+            frames.append(frame)
+        groups.append(([ttk.Entry(frames[i % rows]) for i in range(entries)], frames))
+    return root, groups
+
+
+def run_layout_bench(toggles=BENCH_LAYOUT_TOGGLES, burst=BENCH_LAYOUT_BURST):
+    root, groups = _layout_widgets()
+    passes = [0]
+
+    def geometry_pass():
+        passes[0] += 1
+        if root:
+            root.update_idletasks()
+            root.update_idletasks()
+
+    def toggle_old(enabled, idle):
+        # The previous update_human_settings: touch everything, queue a pass every time.
+        for flag, (entries, rows) in zip(enabled[1:], groups):
+            on = enabled[0] and flag
+            for entry in entries:
+                entry.configure(state="normal" if on else "disabled")
+            for row in rows:
+                row.grid() if on else row.grid_remove()
+        idle.after_idle(geometry_pass)
+
+    def toggle_new(enabled, layout):
+        rows_changed = False
+        for flag, (entries, rows) in zip(enabled[1:], groups):
+            on = enabled[0] and flag
+            layout.set_state(entries, on)
+            rows_changed = layout.apply_rows(rows, on) or rows_changed
+        if rows_changed:
+            layout.request_geometry()
+
+    print(f"Settings layout: {toggles} checkbox toggles, {burst} per idle cycle, "
+          f"{'real Tk widgets' if root else 'no display, counting Tk calls on stand-in widgets'}")
+    for label in ("touch all", "diff + coalesce"):
+        idle = IdleQueue()
+        layout = LayoutManager(idle, geometry_pass)
+        rng = random.Random(1)
+        enabled = [True] * 5
+        passes[0] = 0
+        FakeTkWidget.calls = 0
+        start = time.perf_counter()
+        for i in range(toggles):
+            enabled[rng.randrange(5)] ^= True
+            if label == "touch all":
+                toggle_old(enabled, idle)
+            else:
+                toggle_new(enabled, layout)
+            if (i + 1) % burst == 0:
+                idle.run()
+        idle.run()
+        per_toggle_us = (time.perf_counter() - start) / toggles * 1_000_000
+        calls = f" {FakeTkWidget.calls / toggles:>5.1f} Tk calls/toggle" if not root else ""
+        print(f"{label:<28} {per_toggle_us:>8.1f} us/toggle {passes[0] / toggles:>5.2f} geometry passes/toggle{calls}")
+    if root:
+        root.destroy()
+
+
+def run_theme_bench(runs=BENCH_THEME_RUNS):
+    project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+    sv_tcl = os.path.join(project_dir, "themes", "sun-valley", "sv.tcl")
+    print(f"Theme startup: {runs} fresh interpreters loading {sv_tcl}, median of each")
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", BENCH_THEME_SCRIPT, sv_tcl],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            error = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"Theme load failed (needs a display): {error}")
+            return
+        samples.append(json.loads(result.stdout))
+
+    def median(values):
+        return sorted(values)[len(values) // 2]
+
+    active_ms = median([steps[0][0] for steps in samples]) * 1000
+    both_ms = median([steps[1][0] for steps in samples]) * 1000
+    active_kb = median([steps[0][1] for steps in samples])
+    both_kb = median([steps[1][1] for steps in samples])
+    print(f"{'both themes (eager)':<28} {both_ms:>7.1f} ms {both_kb:>7} KB")
+    print(f"{'active theme only (lazy)':<28} {active_ms:>7.1f} ms {active_kb:>7} KB")
+    print(f"{'saved at startup':<28} {both_ms - active_ms:>7.1f} ms {both_kb - active_kb:>7} KB "
+          f"(paid on the first toggle instead, or at idle with theme_preload)")
+
+
+def run_profiles_bench():
+    print("Profile store: open the store and resolve one profile, vs reading every profile")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in BENCH_PROFILE_COUNTS:
+            directory = os.path.join(tmp, str(count))
+            store = ProfileStore(directory)
+            for i in range(count):
+                store.put(f"profile {i}", dict(BENCH_PROFILE_SETTINGS, interval_us=5000 + i))
+            start = time.perf_counter()
+            for entry in os.scandir(directory):
+                with open(entry.path) as handle:
+                    json.load(handle)
+            eager_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            ProfileStore(directory).get("profile 0")
+            lazy_ms = (time.perf_counter() - start) * 1000
+            print(f"{count:>5} profiles: read all {eager_ms:>8.2f} ms, lazy {lazy_ms:>6.2f} ms")
+
+        changes = BENCH_AUTOSAVE_BURSTS * BENCH_AUTOSAVE_BURST
+        print(f"Autosave: {changes} setting changes in bursts of {BENCH_AUTOSAVE_BURST}, "
+              f"caller-thread cost per change")
+        path = os.path.join(tmp, "config.json")
+        config = dict(BENCH_PROFILE_SETTINGS)
+        caller_sec = 0.0
+        for i in range(changes):
+            config["interval_us"] = i
+            start = time.perf_counter()
+            write_atomic(path, json.dumps(config))
+            caller_sec += time.perf_counter() - start
+        print(f"{'write on every change':<28} {caller_sec / changes * 1_000_000:>8.1f} us/change {changes:>5} writes")
+        saver = AutoSaver(delay_ms=BENCH_AUTOSAVE_DELAY_MS)
+        saver.start()
+        caller_sec = 0.0
+        for burst in range(BENCH_AUTOSAVE_BURSTS):
+            for i in range(BENCH_AUTOSAVE_BURST):
+                config["interval_us"] = burst
+                start = time.perf_counter()
+                saver.schedule(path, dict(config))
+                caller_sec += time.perf_counter() - start
+            time.sleep(BENCH_AUTOSAVE_DELAY_MS * 3 / MS_PER_SEC)
+        saver.stop()
+        print(f"{'debounced autosave':<28} {caller_sec / changes * 1_000_000:>8.1f} us/change {saver.writes:>5} writes")
+
+
+def run_preview_bench():
+    print(f"Settings preview: Tk-thread cost per edit over {len(BENCH_PREVIEW_EDITS)} edits of the mean interval")
+    base = {"timing_model": "Exponential", "human_like": True}
+    configs = [dict(base, exp_mean_interval_us=value * US_PER_MS) for value in BENCH_PREVIEW_EDITS]
+    start = time.perf_counter()
+    for config in configs:
+        simulate(preview_config(config))
+    print(f"{'inline simulation':<22} {(time.perf_counter() - start) / len(configs) * 1000:>8.3f} ms/edit")
+
+    finished = threading.Event()
+    worker = PreviewWorker(lambda key, result: finished.set())
+    worker.start()
+    for label in ("worker, cold cache", "worker, warm cache"):
+        caller_sec = 0.0
+        for config in configs:
+            finished.clear()
+            start = time.perf_counter()
+            queued = worker.request(preview_key(config), config) is None
+            caller_sec += time.perf_counter() - start
+            if queued:
+                finished.wait()
+        print(f"{label:<22} {caller_sec / len(configs) * 1000:>8.3f} ms/edit, {worker.runs} simulations")
+    worker.stop()
+
+
+def _wait_for(condition):
+    start = time.perf_counter()
+    while not condition():
+        time.sleep(BENCH_SWITCH_POLL_SEC)
+    return time.perf_counter() - start
+
+
+def run_switch_bench(switches=BENCH_SWITCHES, interval_ms=DEFAULT_BENCH_INTERVAL_MS):
+    config = dict(BENCH_PROFILE_SETTINGS, timing_model="Uniform", random_interval_us=0, human_like=False,
+                  interval_us=round(interval_ms * US_PER_MS), use_current_pos=False, pos_x=100, pos_y=100, cursor_cache=False,
+                  profiles={"A": {"pos_x": 200}, "B": {"pos_x": 300, "click_type": "Double"}})
+    print(f"Profile switch: {switches} switches at a {interval_ms} ms interval, request -> first click "
+          "with the new profile")
+
+    def restart(name):
+        # The old path: parse the settings, drop the engine, start a new one.
+        old = engines[0]
+        kwargs = engine_kwargs_from_config(resolve_profile(config, name))
+        old.exit()
+        engine = AutoClicker(**kwargs, mouse=NullMouse())
+        engine.daemon = True
+        engine.start()
+        engine.start_clicking()
+        engines[0] = engine
+        return lambda: engine.click_count > 0
+
+    def hot_switch(name):
+        engine = engines[0]
+        engine.switch_params(snapshots[name])
+        return lambda: engine.pending_params is None
+
+    snapshots = {name: profile_snapshot(config, name) for name in ("A", "B")}
+    for label, switch in (("restart engine", restart), ("hot switch", hot_switch)):
+        engines = [AutoClicker(**engine_kwargs_from_config(config), mouse=NullMouse())]
+        engines[0].daemon = True
+        engines[0].start()
+        engines[0].start_clicking()
+        latencies = []
+        for i in range(switches):
+            start = time.perf_counter()
+            done = switch("AB"[i % 2])
+            _wait_for(done)
+            latencies.append(time.perf_counter() - start)
+        engines[0].exit()
+        latencies.sort()
+        print(f"{label:<28} mean={sum(latencies) / len(latencies) * MS_PER_SEC:>7.3f} ms "
+              f"p50={latencies[len(latencies) // 2] * MS_PER_SEC:>7.3f} ms "
+              f"p99={latencies[int(len(latencies) * 0.99)] * MS_PER_SEC:>7.3f} ms")
+    print(f"A hot switch waits out the current interval (at most {interval_ms} ms); a restart also "
+          "parses the settings and spawns a thread")
+
+
+def run_verify_bench(clicks=BENCH_VERIFY_CLICKS, interval_ms=DEFAULT_BENCH_INTERVAL_MS):
+    print(f"Injection check: {clicks} clicks at {BENCH_BACKEND_POINT} through the default backend, matched by a "
+          "mouse listener; this sends real clicks, so run it under Xvfb or on a scratch desktop")
+    verifier = InjectionVerifier()
+    try:
+        engine = AutoClicker(interval_us=round(interval_ms * US_PER_MS), random_interval_us=0, click_type="single",
+                             button="left",
+                             interval_mode="Uniform", target_pos=BENCH_BACKEND_POINT, click_limit=clicks,
+                             verifier=verifier)
+    except Exception as exc:
+        print(f"Injection check failed: {exc!r}")
+        return
+    engine.daemon = True
+    engine.start()
+    engine.start_clicking()
+    deadline = time.perf_counter() + BENCH_VERIFY_TIMEOUT_SEC
+    # The engine prints the report once the session ends and the listener is released.
+    while (engine.running or verifier.listener is not None) and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    engine.exit()
+
+
+def bench_params(interval_ms):
+    return {
+        "interval_us": round(interval_ms * US_PER_MS),
+        "random_interval_us": 0,
+        "click_type": "single",
+        "button": "left",
+        "interval_mode": "Uniform",
+        "human_like": False,
+        "mouse": NullMouse(),
+    }
+
+
+def measure_jitter(mode, ui_load, duration_sec=DEFAULT_BENCH_DURATION_SEC,
+                   interval_ms=DEFAULT_BENCH_INTERVAL_MS, side_load=None, **engine_overrides):
+    params = bench_params(interval_ms)
+    params.update(engine_overrides)
+    if mode == "process":
+        clicker = ProcessClicker(**params)
+        stats = clicker.stats
+    else:
+        stats = SharedStats()
+        clicker = AutoClicker(**params, stats=stats)
+        clicker.daemon = True
+
+    stop_event = threading.Event()
+    load_thread = None
+    if ui_load:
+        load_thread = threading.Thread(target=_ui_load, args=(stop_event,), daemon=True)
+        load_thread.start()
+
+    if side_load:
+        side_load.start(stats)
+
+    clicker.start()
+    clicker.start_clicking()
+    time.sleep(duration_sec)
+    clicker.stop_clicking()
+    snapshot = stats.snapshot()
+
+    stop_event.set()
+    if load_thread:
+        load_thread.join()
+    if side_load:
+        side_load.stop()
+    clicker.exit()
+    if mode != "process":
+        clicker.join()
+        stats.close()
+        snapshot["tuning_status"] = clicker.tuning_status
+    snapshot["mode"] = mode
+    snapshot["ui_load"] = ui_load
+    return snapshot
+
+
+def format_jitter_row(label, snapshot):
+    return (
+        f"{label:<28} samples={snapshot['sleep_samples']:>6} "
+        f"mean={snapshot['oversleep_mean_us']:>8.1f}us "
+        f"p50<={snapshot['oversleep_p50_us']:>6}us "
+        f"p99<={snapshot['oversleep_p99_us']:>6}us "
+        f"max={snapshot['oversleep_max_us']:>7}us"
+    )
+
+
+def measure_sleep_resolution(sleep, target_us, samples=BENCH_RESOLUTION_SAMPLES):
+    # Achieved wait per call, in microseconds, timed on the nanosecond clock.
+    achieved = []
+    for _ in range(samples):
+        start = time.perf_counter_ns()
+        sleep(target_us / US_PER_SEC)
+        achieved.append((time.perf_counter_ns() - start) / 1000)
+    achieved.sort()
+    return achieved[len(achieved) // 2], achieved[int(len(achieved) * 0.99)]
+
+
+def run_resolution_bench():
+    clock = time.get_clock_info("perf_counter")
+    print(f"Sleep resolution on {platform.system()} {platform.release()}: perf_counter ({clock.implementation}) "
+          f"resolution {clock.resolution * 1e9:.0f} ns, {BENCH_RESOLUTION_SAMPLES} waits per row")
+    spin_sleep = spin_sleeper(BENCH_SPIN_US)
+    for target_us in BENCH_RESOLUTION_TARGETS_US:
+        sleep_p50, sleep_p99 = measure_sleep_resolution(time.sleep, target_us)
+        spin_p50, spin_p99 = measure_sleep_resolution(spin_sleep, target_us)
+        print(f"{target_us:>6} us requested  time.sleep p50={sleep_p50:>8.1f}us p99={sleep_p99:>8.1f}us  "
+              f"spin_us={BENCH_SPIN_US} p50={spin_p50:>8.1f}us p99={spin_p99:>8.1f}us")
+
+
+def run_timing_bench(duration_sec, interval_ms):
+    run_resolution_bench()
+    print(f"Timing fidelity: interval {interval_ms} ms, {duration_sec:.1f} s per run (oversleep per interval)")
+    for mode in ("thread", "process"):
+        for ui_load in (False, True):
+            snapshot = measure_jitter(mode, ui_load, duration_sec=duration_sec, interval_ms=interval_ms)
+            label = f"{mode} / {'ui load' if ui_load else 'idle'}"
+            print(format_jitter_row(label, snapshot))
+
+
+def tuning_settings():
+    settings = [("default", {})]
+    if hasattr(os, "sched_getaffinity"):
+        last_cpu = max(os.sched_getaffinity(0))
+        settings.append((f"affinity cpu{last_cpu}", {"cpu_affinity": [last_cpu]}))
+    settings.append(("priority high", {"sched_priority": SCHED_PRIORITY_HIGH}))
+    settings.append(("priority realtime", {"sched_priority": SCHED_PRIORITY_REALTIME}))
+    settings.append((f"timer slack {BENCH_TIMER_SLACK_NS}ns", {"timer_slack_ns": BENCH_TIMER_SLACK_NS}))
+    combined = {}
+    for _, overrides in settings[1:]:
+        combined.update(overrides)
+    settings.append(("all", combined))
+    return settings
+
+
+def run_tuning_bench(duration_sec, interval_ms):
+    print(f"Thread tuning: interval {interval_ms} ms, {duration_sec:.1f} s per run (oversleep per interval)")
+    for label, overrides in tuning_settings():
+        snapshot = measure_jitter("thread", False, duration_sec=duration_sec, interval_ms=interval_ms, **overrides)
+        applied = ", ".join(f"{key}={value}" for key, value in snapshot["tuning_status"].items()) or "-"
+        print(f"{format_jitter_row(label, snapshot)} applied: {applied}")
+
+
+def run_pixel_bench(duration_sec, interval_ms):
+    print(f"Pixel gate: interval {interval_ms} ms, {duration_sec:.1f} s per run, "
+          f"{BENCH_CAPTURE_COST_SEC * 1000:.0f} ms per capture")
+    for label, sample_interval_ms in (("no gate", None), ("gate @ 50 ms", 50), ("gate @ 5 ms", 5)):
+        overrides = {}
+        source = None
+        if sample_interval_ms:
+            source = SlowFrameSource((0, 0, 0))
+            overrides["pixel_condition"] = PixelCondition(
+                BENCH_PIXEL_REGION, (0, 0, 0), sample_interval_ms=sample_interval_ms, frame_source=source,
+            )
+        snapshot = measure_jitter("thread", False, duration_sec=duration_sec, interval_ms=interval_ms, **overrides)
+        cps = snapshot["click_count"] / duration_sec
+        grabs = source.grabs if source else 0
+        print(f"{label:<28} cps={cps:>7.1f} captures={grabs:>5} mean oversleep={snapshot['oversleep_mean_us']:.1f}us")
+
+
+def run_control_bench(duration_sec, interval_ms):
+    print(f"Control server: interval {interval_ms} ms, {duration_sec:.1f} s per run, "
+          f"stats pushed every {BENCH_STATS_INTERVAL_MS} ms (oversleep per interval)")
+    for count in BENCH_SUBSCRIBER_COUNTS:
+        load = SubscriberLoad(count)
+        snapshot = measure_jitter("thread", False, duration_sec=duration_sec, interval_ms=interval_ms, side_load=load)
+        server = load.server
+        tick_us = server.broadcast_sec / server.broadcasts * 1_000_000 if server.broadcasts else 0.0
+        print(f"{format_jitter_row(f'{count} subscribers', snapshot)} "
+              f"events={load.received.value} push={tick_us:.0f}us/tick")
+
+
+def _time_locate(locator, rounds, before_each=None):
+    total = 0.0
+    for i in range(rounds):
+        if before_each:
+            before_each(i)
+        start = time.perf_counter()
+        locator.locate()
+        total += time.perf_counter() - start
+    return total / rounds * 1000
+
+
+def run_locate_bench(rounds=BENCH_LOCATE_ROUNDS):
+    template = Image.effect_noise(BENCH_TEMPLATE_SIZE, 100).filter(ImageFilter.GaussianBlur(2))
+    template = template.point(lambda value: max(0, min(255, (value - 128) * 8 + 128)))
+    background = Image.effect_noise(BENCH_SCREEN_SIZE, 40)
+    screens = []
+    for i in range(rounds):
+        screen = background.copy()
+        screen.paste(template, (97 * i % 1800, 53 * i % 1000))
+        screens.append(screen)
+    source = StillFrameSource(screens[0])
+    locator = TemplateLocator(template, frame_source=source)
+
+    def move_target(i):
+        source.image = screens[i]
+        locator.last_hit = None
+
+    def clear_target(_):
+        source.image = background
+
+    width, height = BENCH_SCREEN_SIZE
+    print(f"Template locate: {width}x{height} frame, {BENCH_TEMPLATE_SIZE[0]}x{BENCH_TEMPLATE_SIZE[1]} template, "
+          f"pyramid factor {locator.factor} (grab cost excluded)")
+    print(f"{'full search':<28} {_time_locate(locator, rounds, move_target):>7.2f} ms")
+    print(f"{'roi hit':<28} {_time_locate(locator, rounds):>7.2f} ms")
+    locator.last_hit = None
+    print(f"{'unchanged frame (hash)':<28} {_time_locate(locator, rounds, clear_target):>7.2f} ms")
+
+
+def _steps_per_iteration(program):
+    code = program.code
+    start = code[::STRIDE].index(OP_LOOP) + 1
+    end = code[::STRIDE].index(OP_NEXT)
+    return end - start + 1
+
+
+def _time_engine_run(iterations, **overrides):
+    params = bench_params(1)
+    params.update(overrides)
+    app = StopWhenIdleApp()
+    clicker = AutoClicker(**params, sleep_fn=lambda seconds: None, app=app)
+    app.clicker = clicker
+    clicker.start_clicking()
+    start = time.perf_counter()
+    clicker.run()
+    elapsed = time.perf_counter() - start
+    return clicker, elapsed / iterations * 1_000_000
+
+
+def run_script_bench(iterations=BENCH_SCRIPT_ITERATIONS):
+    print(f"Click script dispatch: {iterations} iterations, sleeps and mouse calls stubbed out")
+    _, per_click_us = _time_engine_run(iterations, click_limit=iterations, target_pos=(100, 100))
+    print(f"{'engine loop (per click)':<28} {per_click_us:>7.2f} us")
+    scripts = (
+        ("click, wait", f"point A 100 100\nrepeat {iterations}\n click A\n wait 1 ms\nend", {}),
+        ("click, ranged wait", f"point A 100 100\nrepeat {iterations}\n click A\n wait 1-3 ms\nend", {}),
+        ("humanized (hold + drift)", f"point A 100 100\nrepeat {iterations}\n click A\n wait 1-3 ms\nend",
+         {"human_like": True, "hold_time_enabled": True, "random_pos_offset": (5, 5)}),
+    )
+    for label, source, overrides in scripts:
+        clicker, per_iteration_us = _time_engine_run(iterations, script=source, **overrides)
+        steps = _steps_per_iteration(clicker.program)
+        print(f"{label:<28} {per_iteration_us / steps:>7.2f} us/step ({steps} steps per iteration)")
+
+
+def run_metrics_bench(iterations=BENCH_SCRIPT_ITERATIONS, rounds=BENCH_METRICS_ROUNDS):
+    print(f"Metrics overhead: {iterations} clicks per run, best of {rounds}, sleeps and mouse calls stubbed out")
+    variants = (
+        ("plain", {}),
+        ("humanized", {"human_like": True, "hold_time_enabled": True, "random_pos_offset": (5, 5),
+                       "thinking_pause_enabled": True, "fatigue_enabled": True}),
+    )
+    for label, overrides in variants:
+        results = []
+        for with_metrics in (False, True):
+            best = None
+            for _ in range(rounds):
+                metrics = EngineMetrics() if with_metrics else None
+                _, per_click_us = _time_engine_run(iterations, click_limit=iterations, target_pos=(100, 100),
+                                                   metrics=metrics, **overrides)
+                if metrics:
+                    metrics.close()
+                best = per_click_us if best is None else min(best, per_click_us)
+            results.append(best)
+        off_us, on_us = results
+        print(f"{label:<28} off={off_us:>6.2f} us/click on={on_us:>6.2f} us/click "
+              f"({MS_PER_SEC * MS_PER_SEC / off_us:>9.0f} -> {MS_PER_SEC * MS_PER_SEC / on_us:>9.0f} clicks/s)")
+
+
+def run_trace_bench(iterations=BENCH_SCRIPT_ITERATIONS, rounds=BENCH_METRICS_ROUNDS):
+    print(f"Tracer overhead: {iterations} clicks per run, best of {rounds}, sleeps and mouse calls stubbed out")
+    variants = (
+        ("plain", {}),
+        ("humanized", {"human_like": True, "hold_time_enabled": True, "random_pos_offset": (5, 5),
+                       "thinking_pause_enabled": True, "fatigue_enabled": True}),
+    )
+    for label, overrides in variants:
+        results = []
+        for with_tracer in (False, True):
+            best = None
+            for _ in range(rounds):
+                # Sized so the ring never wraps; nothing is written to disk.
+                tracer = Tracer(capacity=iterations * BENCH_TRACE_SPANS_PER_CLICK) if with_tracer else None
+                _, per_click_us = _time_engine_run(iterations, click_limit=iterations, target_pos=(100, 100),
+                                                   tracer=tracer, **overrides)
+                best = per_click_us if best is None else min(best, per_click_us)
+            results.append(best)
+        off_us, on_us = results
+        print(f"{label:<28} off={off_us:>6.2f} us/click on={on_us:>6.2f} us/click "
+              f"(+{on_us - off_us:.2f} us, {round(tracer.count / iterations)} spans per click)")
+
+
+def _time_backend(backend, events):
+    x, y = BENCH_BACKEND_POINT
+    if CAP_MOVE in backend.capabilities:
+        backend.move(x, y)
+        backend.flush()
+    now = time.perf_counter
+    latencies = []
+    for _ in range(events // 2):
+        start = now()
+        backend.press(Button.left, x, y)
+        backend.flush()
+        middle = now()
+        backend.release(Button.left, x, y)
+        backend.flush()
+        end = now()
+        latencies.append(middle - start)
+        latencies.append(end - middle)
+    start = now()
+    for _ in range(events // 2):
+        backend.click(Button.left, x, y, 1)
+    backend.flush()
+    throughput = (events // 2 * 2) / (now() - start)
+    latencies.sort()
+    return latencies, throughput
+
+
+def run_backend_bench(events=BENCH_BACKEND_EVENTS):
+    print(f"Input backends: {events} button events each at {BENCH_BACKEND_POINT}; "
+          "this sends real clicks, so run it under Xvfb or on a scratch desktop")
+    names = available_backends()
+    print(f"available: {', '.join(names) or 'none'}")
+    candidates = [("stub (no-op mouse)", lambda: PynputBackend(NullMouse()))]
+    candidates += [(name, lambda name=name: create_backend(name)) for name in names]
+    results = {}
+    for label, factory in candidates:
+        try:
+            backend = factory()
+            try:
+                latencies, throughput = _time_backend(backend, events)
+            finally:
+                backend.close()
+        except Exception as exc:
+            print(f"{label:<28} failed: {exc!r}")
+            continue
+        mean_us = sum(latencies) / len(latencies) * 1_000_000
+        p50_us = latencies[len(latencies) // 2] * 1_000_000
+        p99_us = latencies[int(len(latencies) * 0.99)] * 1_000_000
+        print(f"{label:<28} mean={mean_us:>7.2f} us p50={p50_us:>7.2f} us p99={p99_us:>7.2f} us "
+              f"max={throughput:>9.0f} events/s")
+        if label in names:
+            results[label] = {"p50_us": p50_us, "events_per_sec": throughput}
+    if results:
+        write_backend_results(results)
+        print(f"saved to {get_backend_results_path()}; auto now picks {auto_backend_name()}")
+
+
+def run_cursor_bench(iterations=BENCH_SCRIPT_ITERATIONS):
+    print(f"Cursor cache: {iterations} clicks per run, display round trips counted on a stub mouse")
+    modes = (
+        ("current position", {}),
+        ("fixed target", {"target_pos": (100, 100)}),
+        ("target + offset", {"target_pos": (100, 100), "random_pos_offset": (2, 2)}),
+    )
+    for label, overrides in modes:
+        results = []
+        for cache in (False, True):
+            mouse = CountingMouse()
+            params = bench_params(1)
+            params.update(overrides, mouse=mouse, cursor_cache=cache, click_limit=iterations)
+            app = StopWhenIdleApp()
+            clicker = AutoClicker(**params, sleep_fn=lambda seconds: None, app=app)
+            app.clicker = clicker
+            if clicker.cursor:
+                clicker.cursor.listener_factory = StaticListener
+            clicker.start_clicking()
+            start = time.perf_counter()
+            clicker.run()
+            per_click_us = (time.perf_counter() - start) / iterations * 1_000_000
+            results.append((mouse.round_trips / iterations, per_click_us))
+        (off_trips, off_us), (on_trips, on_us) = results
+        print(f"{label:<28} off={off_trips:>5.2f} trips/click {off_us:>6.2f} us  "
+              f"on={on_trips:>5.2f} trips/click {on_us:>6.2f} us")
+
+
+def run_specialize_bench(iterations=BENCH_SCRIPT_ITERATIONS, rounds=BENCH_METRICS_ROUNDS):
+    print(f"Specialized click loop: {iterations} clicks per run, best of {rounds}, sleeps and mouse calls stubbed out")
+    variants = (
+        ("current position", {}),
+        ("fixed target", {"target_pos": (100, 100)}),
+        ("random interval + offset", {"target_pos": (100, 100), "random_pos_offset": (5, 5), "random_interval_us": 3000}),
+        ("humanized", {"human_like": True, "hold_time_enabled": True, "random_pos_offset": (5, 5),
+                       "thinking_pause_enabled": True, "fatigue_enabled": True}),
+    )
+    for label, overrides in variants:
+        results = []
+        for specialize in (False, True):
+            best = None
+            for _ in range(rounds):
+                _, per_click_us = _time_engine_run(iterations, click_limit=iterations, specialize=specialize,
+                                                   **overrides)
+                best = per_click_us if best is None else min(best, per_click_us)
+            results.append(best)
+        generic_us, specialized_us = results
+        print(f"{label:<28} generic={generic_us:>6.2f} us/click specialized={specialized_us:>6.2f} us/click "
+              f"({generic_us / specialized_us:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m autoclicker.bench")
+    parser.add_argument("suite", nargs="?", default="timing", choices=sorted(SUITES))
+    parser.add_argument("--duration", type=float, default=DEFAULT_BENCH_DURATION_SEC)
+    parser.add_argument("--interval-ms", type=float, default=DEFAULT_BENCH_INTERVAL_MS)
+    args = parser.parse_args(argv)
+    SUITES[args.suite](args)
+
+
+SUITES = {
+    "backends": lambda args: run_backend_bench(),
+    "control": lambda args: run_control_bench(args.duration, args.interval_ms),
+    "cursor": lambda args: run_cursor_bench(),
+    "timing": lambda args: run_timing_bench(args.duration, args.interval_ms),
+    "layout": lambda args: run_layout_bench(),
+    "locate": lambda args: run_locate_bench(),
+    "metrics": lambda args: run_metrics_bench(),
+    "pixel": lambda args: run_pixel_bench(args.duration, args.interval_ms),
+    "preview": lambda args: run_preview_bench(),
+    "profiles": lambda args: run_profiles_bench(),
+    "script": lambda args: run_script_bench(),
+    "specialize": lambda args: run_specialize_bench(),
+    "trace": lambda args: run_trace_bench(),
+    "switch": lambda args: run_switch_bench(interval_ms=args.interval_ms),
+    "theme": lambda args: run_theme_bench(),
+    "tuning": lambda args: run_tuning_bench(args.duration, args.interval_ms),
+    "verify": lambda args: run_verify_bench(interval_ms=args.interval_ms),
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,22 @@
 import json
 import os
+import stat
+import tempfile
+import threading
+import time
 
 CONFIG_FILENAME = "autoclicker_config.json"
+AUTOSAVE_DELAY_MS = 500
+US_PER_MS = 1000
+US_PER_SEC = 1_000_000
+# Durations stored as NAME_us integer microseconds; NAME_ms is the old form.
+DURATION_KEYS = (
+    "interval", "random_interval", "exp_mean_interval", "hold_time_mean", "hold_time_std",
+    "thinking_pause_mean", "thinking_pause_std", "fatigue_threshold_interval", "fatigue_duration",
+    "fatigue_cooldown_duration", "fatigue_cooldown_min_interval",
+)
+# Pre-millisecond keys, in seconds.
+LEGACY_SECOND_KEYS = {"interval": "interval_us", "random_interval": "random_interval_us"}
 
 
 def get_config_path(base_dir=None):
@@ -10,21 +25,147 @@ def get_config_path(base_dir=None):
     return CONFIG_FILENAME
 
 
+def _scaled(value, scale):
+    try:
+        return round(float(value) * scale)
+    except (TypeError, ValueError, OverflowError):
+        # Left for the reader's validation to replace with the default.
+        return value
+
+
+def migrate_config(config):
+    # Returns a copy with millisecond (and older seconds/rate) durations
+    # converted to integer microseconds. A key already in the new form wins.
+    if not isinstance(config, dict):
+        return config
+    config = dict(config)
+    for name in DURATION_KEYS:
+        value = config.pop(f"{name}_ms", None)
+        if value is not None and f"{name}_us" not in config:
+            config[f"{name}_us"] = _scaled(value, US_PER_MS)
+    for key, new_key in LEGACY_SECOND_KEYS.items():
+        value = config.pop(key, None)
+        if value is not None and new_key not in config:
+            config[new_key] = _scaled(value, US_PER_SEC)
+    rate = config.pop("lambda_rate", None)
+    if rate is not None and "exp_mean_interval_us" not in config:
+        try:
+            if float(rate) > 0:
+                config["exp_mean_interval_us"] = round(US_PER_SEC / float(rate))
+        except (TypeError, ValueError):
+            pass
+    if isinstance(config.get("profiles"), dict):
+        config["profiles"] = {name: migrate_config(overrides) for name, overrides in config["profiles"].items()}
+    return config
+
+
 def read_config():
     path = get_config_path()
     if not os.path.exists(path):
         return {}
     try:
         with open(path, "r") as handle:
-            return json.load(handle)
+            return migrate_config(json.load(handle))
     except Exception as exc:
         print(f"Failed to load config: {exc}")
         return {}
 
 
-def write_config(config):
+def write_atomic(path, text):
+    # Readers see the old file or the new one, never a torn write, and the
+    # new one survives a crash. Every file the app writes goes through here.
+    # Each write gets its own temp file, so two instances saving the same
+    # path can't clobber each other's half-written copy.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=directory)
     try:
-        with open(get_config_path(), "w") as handle:
-            json.dump(config, handle)
-    except Exception as exc:
-        print(f"Failed to save config: {exc}")
+        with os.fdopen(fd, "w") as handle:
+            # mkstemp creates the file 0600; keep the mode the target had.
+            try:
+                os.fchmod(handle.fileno(), stat.S_IMODE(os.stat(path).st_mode))
+            except (FileNotFoundError, AttributeError):
+                pass
+            handle.write(text)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class AutoSaver(threading.Thread):
+    # Writes JSON files off the caller's thread once changes have been quiet
+    # for delay_ms, and only when the serialized content differs from what
+    # is already on disk. Scheduling None removes the file.
+    def __init__(self, delay_ms=AUTOSAVE_DELAY_MS):
+        super().__init__(name="autosave", daemon=True)
+        self.delay_sec = delay_ms / 1000
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.deadline = 0.0
+        self.stopping = False
+        self.written = {}
+        self.writes = 0
+
+    def remember(self, path, data):
+        # Marks data as what the file already holds, e.g. right after reading it.
+        with self.cond:
+            self.written[path] = None if data is None else json.dumps(data)
+
+    def schedule(self, path, data):
+        with self.cond:
+            self.pending[path] = data
+            self.deadline = time.monotonic() + self.delay_sec
+            self.cond.notify()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.stopping:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                remaining = self.deadline - time.monotonic()
+                if remaining > 0 and not self.stopping:
+                    self.cond.wait(remaining)
+                    continue
+                pending, self.pending = self.pending, {}
+            self._write_all(pending)
+
+    def flush(self):
+        with self.cond:
+            pending, self.pending = self.pending, {}
+        self._write_all(pending)
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        if self.is_alive():
+            self.join()
+        self.flush()
+
+    def _write_all(self, pending):
+        for path, data in pending.items():
+            text = None if data is None else json.dumps(data)
+            if path in self.written and self.written[path] == text:
+                continue
+            try:
+                if text is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    write_atomic(path, text)
+            except OSError as exc:
+                print(f"Failed to save {path}: {exc}")
+                continue
+            self.written[path] = text
+            self.writes += 1
@@ -0,0 +1,245 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import stat
+import threading
+import time
+
+DEFAULT_CONTROL_PORT = 47654
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+DEFAULT_STATS_INTERVAL_MS = 100
+SUBSCRIBER_BUFFER_LIMIT = 64 * 1024
+APP_CALL_TIMEOUT_SEC = 5.0
+SERVER_READY_TIMEOUT_SEC = 5.0
+
+
+def parse_control_address(value):
+    # "/run/clicker.sock" -> unix socket; "8765" or "127.0.0.1:8765" -> loopback TCP.
+    text = str(value).strip()
+    if "/" in text or text.endswith(".sock"):
+        return ("unix", text)
+    host, _, port = text.rpartition(":")
+    host = host.strip("[]") or LOOPBACK_HOSTS[0]
+    if host not in LOOPBACK_HOSTS:
+        raise ValueError(f"control server only binds to loopback, not {host}")
+    return ("tcp", host, int(port) if port else DEFAULT_CONTROL_PORT)
+
+
+class AppController:
+    # Runs commands on the Tk thread; stats are read directly so the
+    # broadcaster never queues work behind the UI.
+    def __init__(self, app):
+        self.app = app
+
+    def _call(self, fn, *args):
+        future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+
+        self.app.after(0, run)
+        return future.result(APP_CALL_TIMEOUT_SEC)
+
+    def start(self, profile=None, cps=None):
+        self._call(self.app.start_session, profile, cps)
+
+    def stop(self):
+        self._call(self.app.stop_clicking_ui)
+
+    def configure(self, updates):
+        self._call(self.app.apply_config_updates, updates)
+
+    def save_profile(self, name, settings=None):
+        self._call(self.app.save_profile, name, settings)
+
+    def stats(self):
+        engine = self.app.click_thread
+        if not engine:
+            return {"running": False, "paused": False, "click_count": 0, "click_limit": 0, "label": None,
+                    "seed": None}
+        return {
+            "running": bool(engine.running),
+            "paused": bool(engine.paused),
+            "click_count": engine.click_count,
+            "click_limit": engine.click_limit,
+            "label": self.app.scheduled_session,
+            "seed": getattr(engine, "seed", None),
+        }
+
+
+def _encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def _remove_stale_socket(path):
+    # Only ever removes a socket: a mistyped address must not delete a file.
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    os.unlink(path)
+
+
+class ControlServer(threading.Thread):
+    def __init__(self, controller, address=DEFAULT_CONTROL_PORT, stats_interval_ms=DEFAULT_STATS_INTERVAL_MS):
+        super().__init__(daemon=True)
+        self.controller = controller
+        self.address = parse_control_address(address)
+        self.stats_interval_sec = stats_interval_ms / 1000
+        self.bound_address = None
+        self.subscribers = set()
+        self.connections = {}
+        self.last_payload = None
+        self.broadcasts = 0
+        self.broadcast_sec = 0.0
+        self.ready = threading.Event()
+        self.error = None
+        self.loop = None
+        self.stopping = None
+        # One worker keeps commands ordered and off both the event loop and the click thread.
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def run(self):
+        try:
+            asyncio.run(self._serve())
+        except OSError as exc:
+            self.error = exc
+            print(f"Control server failed: {exc}")
+        finally:
+            self.ready.set()
+            self.executor.shutdown(wait=False)
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        if self.address[0] == "unix":
+            path = self.address[1]
+            _remove_stale_socket(path)
+            server = await asyncio.start_unix_server(self._handle, path=path)
+            self.bound_address = path
+        else:
+            server = await asyncio.start_server(self._handle, self.address[1], self.address[2])
+            self.bound_address = server.sockets[0].getsockname()[:2]
+        self.ready.set()
+        broadcaster = asyncio.create_task(self._broadcast())
+        async with server:
+            await self.stopping.wait()
+        broadcaster.cancel()
+        # Close connections so their handlers see EOF and finish before the loop shuts down.
+        for writer in list(self.connections):
+            writer.close()
+        await asyncio.gather(*self.connections.values(), return_exceptions=True)
+        if self.address[0] == "unix":
+            # The socket this server bound; anything since put at the path stays.
+            try:
+                _remove_stale_socket(self.bound_address)
+            except OSError:
+                pass
+
+    def wait_ready(self, timeout=SERVER_READY_TIMEOUT_SEC):
+        self.ready.wait(timeout)
+        return self.bound_address
+
+    def stop(self):
+        if self.loop and self.stopping:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+    async def _broadcast(self):
+        while True:
+            await asyncio.sleep(self.stats_interval_sec)
+            if not self.subscribers:
+                continue
+            # One snapshot and one encoding per tick, shared by every subscriber;
+            # nothing is sent while the stats are unchanged.
+            started = time.perf_counter()
+            payload = _encode(dict(self.controller.stats(), event="stats"))
+            if payload == self.last_payload:
+                continue
+            self.last_payload = payload
+            for writer in list(self.subscribers):
+                transport = writer.transport
+                if transport.is_closing() or transport.get_write_buffer_size() > SUBSCRIBER_BUFFER_LIMIT:
+                    # Drop readers that fall behind instead of buffering for them.
+                    self.subscribers.discard(writer)
+                    writer.close()
+                    continue
+                transport.write(payload)
+            self.broadcasts += 1
+            self.broadcast_sec += time.perf_counter() - started
+
+    async def _run_command(self, fn, *args):
+        return await self.loop.run_in_executor(self.executor, fn, *args)
+
+    async def _dispatch(self, request, writer):
+        command = request.get("cmd")
+        if command == "start":
+            await self._run_command(self.controller.start, request.get("profile"), request.get("cps"))
+        elif command == "stop":
+            await self._run_command(self.controller.stop)
+        elif command == "configure":
+            updates = request.get("config")
+            if not isinstance(updates, dict):
+                raise ValueError("configure needs a 'config' object")
+            await self._run_command(self.controller.configure, updates)
+        elif command == "save_profile":
+            name = request.get("name")
+            settings = request.get("config")
+            if not isinstance(name, str) or not name:
+                raise ValueError("save_profile needs a 'name'")
+            if settings is not None and not isinstance(settings, dict):
+                raise ValueError("save_profile 'config' must be an object")
+            await self._run_command(self.controller.save_profile, name, settings)
+        elif command == "stats":
+            return {"ok": True, "stats": self.controller.stats()}
+        elif command == "subscribe":
+            # The reply carries the current stats; events follow on change.
+            self.subscribers.add(writer)
+            return {"ok": True, "stats": self.controller.stats()}
+        elif command == "unsubscribe":
+            self.subscribers.discard(writer)
+        else:
+            raise ValueError(f"unknown command: {command}")
+        return {"ok": True}
+
+    async def _handle(self, reader, writer):
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(_encode({"ok": False, "error": "request too long"}))
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                    reply = await self._dispatch(request, writer)
+                except Exception as exc:
+                    reply = {"ok": False, "error": str(exc)}
+                writer.write(_encode(reply))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            self.connections.pop(writer, None)
+            writer.close()
+
+
+def start_control_server(controller, address, **kwargs):
+    server = ControlServer(controller, address, **kwargs)
+    server.start()
+    server.wait_ready()
+    if server.error:
+        return None
+    print(f"Control server listening on {server.bound_address}")
+    return server
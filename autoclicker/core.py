@@ -1,40 +1,66 @@
 import time
-import random
 import threading
 import math
 import sys
 from pynput.mouse import Button, Controller
+from pynput.keyboard import Controller as KeyboardController
+
+from .backends import CAP_MOVE, BackgroundBackend, PynputBackend, create_backend
+from .cursor import CursorCache
+from .keys import parse_key_sequence
+from .metrics import click_slot
+from .pixel import PixelWatcher
+from .script import compile_script, interval_wait, run_program
+from .specialize import run_specialized
+from .streams import RandomStreams
+from .trace import (STAGE_CLICK, STAGE_FATIGUE, STAGE_GAP, STAGE_HOLD, STAGE_INTERVAL_SLEEP, STAGE_MOVE,
+                    STAGE_POSITION, STAGE_PRESS, STAGE_RELEASE, STAGE_SCHEDULE)
+from .tuning import apply_thread_tuning, spin_sleeper
 
 MS_PER_SEC = 1000
+US_PER_MS = 1000
+US_PER_SEC = 1_000_000
 
-DEFAULT_INTERVAL_MS = 100
-DEFAULT_RANDOM_INTERVAL_MS = 0
-DEFAULT_EXP_MEAN_INTERVAL_MS = 80
+# Durations are integer microseconds.
+DEFAULT_INTERVAL_US = 100_000
+DEFAULT_RANDOM_INTERVAL_US = 0
+DEFAULT_EXP_MEAN_INTERVAL_US = 80_000
 DEFAULT_HOLD_TIME_ENABLED = False
-DEFAULT_HOLD_TIME_MEAN_MS = 133
-DEFAULT_HOLD_TIME_STD_MS = 83
-DOUBLE_CLICK_GAP_MIN_MS = 5
-DOUBLE_CLICK_GAP_MAX_MS = 15
+DEFAULT_HOLD_TIME_MEAN_US = 133_000
+DEFAULT_HOLD_TIME_STD_US = 83_000
+DOUBLE_CLICK_GAP_MIN_US = 5_000
+DOUBLE_CLICK_GAP_MAX_US = 15_000
 DEFAULT_DRIFT_ENABLED = True
 DEFAULT_DRIFT_STEP_MIN = -2
 DEFAULT_DRIFT_STEP_MAX = 1
 DEFAULT_DRIFT_RESET_MIN = -2
 DEFAULT_DRIFT_RESET_MAX = 2
 DEFAULT_THINKING_PAUSE_ENABLED = True
-DEFAULT_THINKING_PAUSE_MEAN_MS = 1500
-DEFAULT_THINKING_PAUSE_STD_MS = 800
+DEFAULT_THINKING_PAUSE_MEAN_US = 1_500_000
+DEFAULT_THINKING_PAUSE_STD_US = 800_000
 DEFAULT_THINKING_PAUSE_MIN_CLICKS = 120
 DEFAULT_THINKING_PAUSE_MAX_CLICKS = 150
 DEFAULT_FATIGUE_ENABLED = True
-DEFAULT_FATIGUE_THRESHOLD_INTERVAL_MS = 100
-DEFAULT_FATIGUE_DURATION_MS = 3000
-DEFAULT_FATIGUE_COOLDOWN_DURATION_MS = 1000
-DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_MS = 500
-MIN_SLEEP_MS = 1
+DEFAULT_FATIGUE_THRESHOLD_INTERVAL_US = 100_000
+DEFAULT_FATIGUE_DURATION_US = 3_000_000
+DEFAULT_FATIGUE_COOLDOWN_DURATION_US = 1_000_000
+DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_US = 500_000
+MIN_SLEEP_US = 1
 IDLE_SLEEP_MS = 100
-
-HOLD_TIME_MEAN_MS = DEFAULT_HOLD_TIME_MEAN_MS
-HOLD_TIME_STD_MS = DEFAULT_HOLD_TIME_STD_MS
+# Plain-value parameters a running session can switch between clicks.
+SWITCHABLE_PARAMS = (
+    "interval_us", "random_interval_us", "click_type", "button", "interval_mode", "exp_mean_interval_us",
+    "target_pos", "random_pos_offset", "click_limit", "human_like",
+    "hold_time_enabled", "hold_time_mean_us", "hold_time_std_us",
+    "drift_enabled", "drift_step_min", "drift_step_max", "drift_reset_min", "drift_reset_max",
+    "thinking_pause_enabled", "thinking_pause_mean_us", "thinking_pause_std_us",
+    "thinking_pause_min_clicks", "thinking_pause_max_clicks",
+    "fatigue_enabled", "fatigue_threshold_interval_us", "fatigue_duration_us",
+    "fatigue_cooldown_duration_us", "fatigue_cooldown_min_interval_us",
+)
+
+HOLD_TIME_MEAN_US = DEFAULT_HOLD_TIME_MEAN_US
+HOLD_TIME_STD_US = DEFAULT_HOLD_TIME_STD_US
 DRIFT_STEP_MIN = DEFAULT_DRIFT_STEP_MIN
 DRIFT_STEP_MAX = DEFAULT_DRIFT_STEP_MAX
 DRIFT_RESET_MIN = DEFAULT_DRIFT_RESET_MIN
@@ -132,6 +158,10 @@ def ms_to_sec(ms):
     return ms / MS_PER_SEC
 
 
+def us_to_sec(us):
+    return us / US_PER_SEC
+
+
 def coerce_bool(value):
     if isinstance(value, bool):
         return value
@@ -145,56 +175,110 @@ def coerce_bool(value):
 def safe_int(value, default):
     try:
         return int(round(float(value)))
-    except (TypeError, ValueError):
+    except (TypeError, ValueError, OverflowError):
         return default
 
 
 class AutoClicker(threading.Thread):
-    def __init__(self, interval_ms, random_interval_ms, click_type, button,
-                 interval_mode="Exponential", exp_mean_interval_ms=DEFAULT_EXP_MEAN_INTERVAL_MS,
+    def __init__(self, interval_us, random_interval_us, click_type, button,
+                 interval_mode="Exponential", exp_mean_interval_us=DEFAULT_EXP_MEAN_INTERVAL_US,
                  target_pos=None, random_pos_offset=(0, 0), click_limit=0,
                  human_like=False,
                  hold_time_enabled=DEFAULT_HOLD_TIME_ENABLED,
-                 hold_time_mean_ms=DEFAULT_HOLD_TIME_MEAN_MS,
-                 hold_time_std_ms=DEFAULT_HOLD_TIME_STD_MS,
+                 hold_time_mean_us=DEFAULT_HOLD_TIME_MEAN_US,
+                 hold_time_std_us=DEFAULT_HOLD_TIME_STD_US,
                  drift_enabled=DEFAULT_DRIFT_ENABLED,
                  drift_step_min=DEFAULT_DRIFT_STEP_MIN,
                  drift_step_max=DEFAULT_DRIFT_STEP_MAX,
                  drift_reset_min=DEFAULT_DRIFT_RESET_MIN,
                  drift_reset_max=DEFAULT_DRIFT_RESET_MAX,
                  thinking_pause_enabled=DEFAULT_THINKING_PAUSE_ENABLED,
-                 thinking_pause_mean_ms=DEFAULT_THINKING_PAUSE_MEAN_MS,
-                 thinking_pause_std_ms=DEFAULT_THINKING_PAUSE_STD_MS,
+                 thinking_pause_mean_us=DEFAULT_THINKING_PAUSE_MEAN_US,
+                 thinking_pause_std_us=DEFAULT_THINKING_PAUSE_STD_US,
                  thinking_pause_min_clicks=DEFAULT_THINKING_PAUSE_MIN_CLICKS,
                  thinking_pause_max_clicks=DEFAULT_THINKING_PAUSE_MAX_CLICKS,
                  fatigue_enabled=DEFAULT_FATIGUE_ENABLED,
-                 fatigue_threshold_interval_ms=DEFAULT_FATIGUE_THRESHOLD_INTERVAL_MS,
-                 fatigue_duration_ms=DEFAULT_FATIGUE_DURATION_MS,
-                 fatigue_cooldown_duration_ms=DEFAULT_FATIGUE_COOLDOWN_DURATION_MS,
-                 fatigue_cooldown_min_interval_ms=DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_MS,
+                 fatigue_threshold_interval_us=DEFAULT_FATIGUE_THRESHOLD_INTERVAL_US,
+                 fatigue_duration_us=DEFAULT_FATIGUE_DURATION_US,
+                 fatigue_cooldown_duration_us=DEFAULT_FATIGUE_COOLDOWN_DURATION_US,
+                 fatigue_cooldown_min_interval_us=DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_US,
                  rand=None,
+                 seed=None,
                  time_provider=None,
                  sleep_fn=None,
                  mouse=None,
                  background_click_enabled=False,
                  background_click_handle=None,
                  background_clicker=None,
+                 stats=None,
+                 cpu_affinity=None,
+                 sched_priority=None,
+                 timer_slack_ns=None,
+                 spin_us=None,
+                 pixel_condition=None,
+                 target_locator=None,
+                 script=None,
+                 keys=None,
+                 keyboard=None,
+                 metrics=None,
+                 tracer=None,
+                 backend=None,
+                 cursor_cache=False,
+                 specialize=True,
+                 verifier=None,
+                 takeover=None,
                  app=None):
-        super().__init__()
-        self.rand = rand if rand else random
+        super().__init__(name="click engine")
+        # One seeded stream per subsystem; an explicit rand drives them all.
+        self.streams = RandomStreams.shared(rand) if rand else RandomStreams(seed)
+        self.seed = self.streams.seed
         self.now = time_provider if time_provider else time.perf_counter
-        self.sleep = sleep_fn if sleep_fn else time.sleep
+        if sleep_fn:
+            self.sleep = sleep_fn
+        else:
+            self.sleep = spin_sleeper(spin_us) if spin_us else time.sleep
         self.mouse = mouse if mouse else Controller()
+        self.key_sequence = parse_key_sequence(keys) if keys else []
+        self.key_index = 0
+        self.keyboard = keyboard
+        if self.keyboard is None and (self.key_sequence or script):
+            self.keyboard = KeyboardController()
         self.background_click_enabled = background_click_enabled
         self.background_click_handle = background_click_handle
         self.background_clicker = background_clicker
         if self.background_click_enabled and self.background_clicker is None and Win32BackgroundClicker:
             self.background_clicker = Win32BackgroundClicker(self.background_click_handle)
+        if self.background_click_enabled:
+            backend = BackgroundBackend(self.background_clicker, self.sleep, us_to_sec(DOUBLE_CLICK_GAP_MIN_US))
+        elif (backend is None and mouse) or backend == "pynput":
+            # An explicit mouse (tests, benches) is driven through pynput.
+            backend = PynputBackend(self.mouse)
+        elif backend is None or isinstance(backend, str):
+            backend = create_backend(backend)
+        self.backend = backend
+        self._press_button = backend.press
+        self._release_button = backend.release
+        self._flush_input = backend.flush
+        self._click_button = backend.click
+        self._move_cursor = backend.move
+        self.cursor = None
+        if cursor_cache and CAP_MOVE in backend.capabilities:
+            self.cursor = CursorCache(self.mouse, backend.move)
+            self._move_cursor = self.cursor.move
+        self.stats = stats
+        self.cpu_affinity = cpu_affinity
+        self.sched_priority = sched_priority
+        self.timer_slack_ns = timer_slack_ns
+        self.spin_us = spin_us
+        self.tuning_status = {}
+        self.pixel_condition = pixel_condition
+        self.pixel_watcher = None
+        self.target_locator = target_locator
         self.app = app
-        self.interval_ms = interval_ms
-        self.random_interval_ms = random_interval_ms
+        self.interval_us = interval_us
+        self.random_interval_us = random_interval_us
         self.interval_mode = interval_mode
-        self.exp_mean_interval_ms = exp_mean_interval_ms
+        self.exp_mean_interval_us = exp_mean_interval_us
         self.click_type = click_type.lower()
         self.button_key = button
         self.button = Button.left if button.lower() == "left" else Button.right
@@ -203,59 +287,182 @@ class AutoClicker(threading.Thread):
         self.random_pos_offset = random_pos_offset
         self.human_like = human_like
         self.hold_time_enabled = hold_time_enabled
-        self.hold_time_mean_ms = hold_time_mean_ms
-        self.hold_time_std_ms = hold_time_std_ms
+        self.hold_time_mean_us = hold_time_mean_us
+        self.hold_time_std_us = hold_time_std_us
         self.drift_enabled = drift_enabled
         self.drift_step_min = drift_step_min
         self.drift_step_max = drift_step_max
         self.drift_reset_min = drift_reset_min
         self.drift_reset_max = drift_reset_max
         self.thinking_pause_enabled = thinking_pause_enabled
-        self.thinking_pause_mean_ms = thinking_pause_mean_ms
-        self.thinking_pause_std_ms = thinking_pause_std_ms
+        self.thinking_pause_mean_us = thinking_pause_mean_us
+        self.thinking_pause_std_us = thinking_pause_std_us
         self.thinking_pause_min_clicks = thinking_pause_min_clicks
         self.thinking_pause_max_clicks = thinking_pause_max_clicks
         self.fatigue_enabled = fatigue_enabled
-        self.fatigue_threshold_interval_ms = fatigue_threshold_interval_ms
-        self.fatigue_duration_ms = fatigue_duration_ms
-        self.fatigue_cooldown_duration_ms = fatigue_cooldown_duration_ms
-        self.fatigue_cooldown_min_interval_ms = fatigue_cooldown_min_interval_ms
+        self.fatigue_threshold_interval_us = fatigue_threshold_interval_us
+        self.fatigue_duration_us = fatigue_duration_us
+        self.fatigue_cooldown_duration_us = fatigue_cooldown_duration_us
+        self.fatigue_cooldown_min_interval_us = fatigue_cooldown_min_interval_us
+        self.script = script
+        self.program = self._compile_program() if script else None
+        self.program_state = None
+        self.metrics = metrics
+        if self.metrics:
+            self.metrics_click_slot = self._metrics_slot()
+            # Wrapping on the instance keeps the unmetered path untouched.
+            for name in ("_press_button", "_release_button", "_click_button", "_press_keys", "_release_keys"):
+                setattr(self, name, self._timed_backend(getattr(self, name)))
+        self.verifier = verifier
+        if self.verifier:
+            for name in ("_press_button", "_release_button", "_click_button"):
+                setattr(self, name, self.verifier.wrap(name, getattr(self, name)))
+        self.takeover = takeover
+        self.tracer = tracer
+        self.specialize = specialize
+        if self.tracer and self.tracer.clock is None:
+            self.tracer.clock = self.now
+        if self.tracer:
+            self.tracer.seed = self.seed
         self.running = False
+        self.paused = False
+        self.pause_lock = threading.Lock()
         self.program_running = True
         self.click_count = 0
+        self.pending_params = None
+        self.switch_requested_at = 0.0
+        self.switch_latency_sec = None
 
         self.drift_x = 0
         self.drift_y = 0
         self.last_action_time = None
         self.jitter_duration = 0
         self.cooldown_end_time = 0
-        self.next_thinking_click = self.rand.randint(self.thinking_pause_min_clicks, self.thinking_pause_max_clicks)
+        self.next_thinking_click = self.streams.thinking.randint(self.thinking_pause_min_clicks, self.thinking_pause_max_clicks)
 
     def start_clicking(self):
         self.running = True
+        self.paused = False
         self.click_count = 0
         self.drift_x = 0
         self.drift_y = 0
         self.last_action_time = None
         self.jitter_duration = 0
         self.cooldown_end_time = 0
-        self.next_thinking_click = self.rand.randint(self.thinking_pause_min_clicks, self.thinking_pause_max_clicks)
+        # Each session replays from the start of its seed's streams.
+        self.streams.rewind()
+        self.next_thinking_click = self.streams.thinking.randint(self.thinking_pause_min_clicks, self.thinking_pause_max_clicks)
+        self.key_index = 0
+        self.program_state = None
+        if self.tracer:
+            # A reused engine's trace holds only the current session.
+            self.tracer.reset()
+        if self.cursor:
+            self.cursor.start()
+        if self.verifier:
+            self.verifier.start()
+        if self.takeover:
+            self.takeover.start(self)
+        if self.pixel_condition:
+            self._stop_pixel_watcher()
+            self.pixel_watcher = PixelWatcher(self.pixel_condition)
+            self.pixel_watcher.start()
+        if self.stats:
+            self.stats.set_running(True)
+            self.stats.record_click_count(0)
 
     def stop_clicking(self):
-        self.running = False
+        with self.pause_lock:
+            self.running = False
+            self.paused = False
+        if self.takeover:
+            self.takeover.stop()
+        if self.stats:
+            self.stats.set_paused(False)
+        self._stop_pixel_watcher()
+        if self.cursor:
+            self.cursor.stop()
+        if self.stats:
+            self.stats.set_running(False)
+
+    def pause(self):
+        # Safe from any thread: the loops see running drop at their next check,
+        # and the session keeps its state until resume(). False if not running.
+        with self.pause_lock:
+            if not self.running:
+                return False
+            self.running = False
+            self.paused = True
+            if self.stats:
+                self.stats.set_paused(True)
+            return True
+
+    def resume(self):
+        # Picked up by run()'s idle loop.
+        with self.pause_lock:
+            if self.paused:
+                self.paused = False
+                self.running = True
+                if self.stats:
+                    self.stats.set_paused(False)
+
+    def switch_params(self, params):
+        # Safe from any thread: the click thread applies the latest snapshot
+        # at its next click boundary, without restarting the session.
+        self.switch_requested_at = self.now()
+        self.pending_params = params
+
+    def _take_pending_params(self):
+        params, self.pending_params = self.pending_params, None
+        for name, value in params.items():
+            if name == "button":
+                self.button_key = value
+                value = Button.left if value.lower() == "left" else Button.right
+            elif name == "click_type":
+                value = value.lower()
+            setattr(self, name, value)
+        if self.metrics:
+            self.metrics_click_slot = self._metrics_slot()
+        if self.program:
+            # Same layout, new waits, hold and offset; program_state stays valid.
+            self.program = self._compile_program()
+        self.switch_latency_sec = self.now() - self.switch_requested_at
+
+    def _compile_program(self):
+        return compile_script(
+            self.script,
+            interval=interval_wait(self.interval_mode, self.interval_us, self.random_interval_us,
+                                   self.exp_mean_interval_us),
+            hold=self.human_like and self.hold_time_enabled,
+            offset=bool(self.random_pos_offset) and (self.random_pos_offset[0] > 0 or self.random_pos_offset[1] > 0),
+        )
+
+    def _metrics_slot(self):
+        return click_slot(
+            "key" if self.key_sequence else self.button_key.lower(),
+            "double" if self.click_type == "double" and not self.key_sequence else "single",
+        )
+
+    def _stop_pixel_watcher(self):
+        if self.pixel_watcher:
+            self.pixel_watcher.stop()
+            self.pixel_watcher = None
 
     def exit(self):
         self.stop_clicking()
         self.program_running = False
 
-    def _sample_positive_gauss_ms(self, mean_ms, std_ms, min_value_ms=MIN_SLEEP_MS):
-        value = self.rand.gauss(mean_ms, std_ms)
-        while value < min_value_ms:
-            value = self.rand.gauss(mean_ms, std_ms)
+    def _sample_positive_gauss_us(self, rand, mean_us, std_us, min_value_us=MIN_SLEEP_US):
+        value = rand.gauss(mean_us, std_us)
+        while value < min_value_us:
+            value = rand.gauss(mean_us, std_us)
         return value
 
     def _sample_hold_time(self):
-        return ms_to_sec(self._sample_positive_gauss_ms(self.hold_time_mean_ms, self.hold_time_std_ms))
+        return us_to_sec(self._sample_positive_gauss_us(self.streams.hold, self.hold_time_mean_us, self.hold_time_std_us))
+
+    def _cursor_position(self):
+        return self.cursor.read() if self.cursor else self.mouse.position
 
     def _use_background_clicker(self):
         if not self.background_click_enabled or not self.background_clicker:
@@ -263,94 +470,193 @@ class AutoClicker(threading.Thread):
         is_valid = getattr(self.background_clicker, "is_valid", None)
         return is_valid() if callable(is_valid) else True
 
-    def _press_button(self, button, x, y):
-        if self.background_click_enabled:
-            if self._use_background_clicker():
-                self.background_clicker.press(x, y, button)
-            return
-        self.mouse.press(button)
-
-    def _release_button(self, button, x, y):
-        if self.background_click_enabled:
-            if self._use_background_clicker():
-                self.background_clicker.release(x, y, button)
-            return
-        self.mouse.release(button)
-
-    def _click_button(self, button, x, y, count):
-        if self.background_click_enabled:
-            if not self._use_background_clicker():
-                return
-            for i in range(count):
-                self.background_clicker.press(x, y, button)
-                self.background_clicker.release(x, y, button)
-                if count == 2 and i == 0:
-                    self.sleep(ms_to_sec(DOUBLE_CLICK_GAP_MIN_MS))
-            return
-        self.mouse.click(button, count)
+    def _hold_click(self, button, x, y, count):
+        tracer = self.tracer
+        for i in range(count):
+            # Batching backends queue press and release; each must be out
+            # before the wait that follows it.
+            self._press_button(button, x, y)
+            self._flush_input()
+            if tracer:
+                tracer.mark(STAGE_PRESS)
+            self.sleep(self._sample_hold_time())
+            if tracer:
+                tracer.mark(STAGE_HOLD)
+            self._release_button(button, x, y)
+            self._flush_input()
+            if tracer:
+                tracer.mark(STAGE_RELEASE)
+            if count == 2 and i == 0:
+                self.sleep(us_to_sec(self.streams.gap.uniform(DOUBLE_CLICK_GAP_MIN_US, DOUBLE_CLICK_GAP_MAX_US)))
+                if tracer:
+                    tracer.mark(STAGE_GAP)
+
+    def _press_keys(self, combo):
+        for key in combo:
+            self.keyboard.press(key)
+
+    def _release_keys(self, combo):
+        for key in reversed(combo):
+            self.keyboard.release(key)
+
+    def _tap_key(self, combo):
+        self._press_keys(combo)
+        self._release_keys(combo)
+
+    def _hold_key(self, combo):
+        tracer = self.tracer
+        self._press_keys(combo)
+        if tracer:
+            tracer.mark(STAGE_PRESS)
+        self.sleep(self._sample_hold_time())
+        if tracer:
+            tracer.mark(STAGE_HOLD)
+        self._release_keys(combo)
+        if tracer:
+            tracer.mark(STAGE_RELEASE)
+
+    def _timed_backend(self, call):
+        now = self.now
+        observe = self.metrics.observe_backend
+
+        def timed(*args):
+            start = now()
+            result = call(*args)
+            observe(now() - start)
+            return result
+
+        return timed
+
+    def _offset_position(self, x, y):
+        range_x, range_y = self.random_pos_offset
+        rand = self.streams.position
+        if self.human_like and self.drift_enabled:
+            drift_step_x = rand.uniform(self.drift_step_min, self.drift_step_max)
+            drift_step_y = rand.uniform(self.drift_step_min, self.drift_step_max)
+            self.drift_x += drift_step_x
+            self.drift_y += drift_step_y
+            if (abs(self.drift_x) > range_x) or (abs(self.drift_y) > range_y):
+                self.drift_x = rand.uniform(self.drift_reset_min, self.drift_reset_max)
+                self.drift_y = rand.uniform(self.drift_reset_min, self.drift_reset_max)
+            return x + int(self.drift_x), y + int(self.drift_y)
+        x += rand.randint(-range_x, range_x) if range_x > 0 else 0
+        y += rand.randint(-range_y, range_y) if range_y > 0 else 0
+        return x, y
 
     def run(self):
+        self.tuning_status = apply_thread_tuning(self.cpu_affinity, self.sched_priority, self.timer_slack_ns)
+        tracer = self.tracer
         while self.program_running:
+            pixel_watcher = self.pixel_watcher
+            if self.running and pixel_watcher:
+                pixel_watcher.first_sample.wait()
+            if self.running and self.specialize and not self.program:
+                if self.pending_params is not None:
+                    self._take_pending_params()
+                # A loop compiled for this session's feature set; the generic loop below is the fallback.
+                if run_specialized(self):
+                    self.stop_clicking()
+                    if self.app:
+                        self.app.after(0, self.app.stop_clicking_ui)
+                if self.pending_params is not None:
+                    # Switched parameters: build the loop for the new feature set.
+                    continue
             while self.running:
+                if self.pending_params is not None:
+                    self._take_pending_params()
                 if self.background_click_enabled and not self._use_background_clicker():
                     self.stop_clicking()
                     if self.app:
                         self.app.after(0, self.app.stop_clicking_ui)
                     break
+                if self.program:
+                    # Scripts carry their own waits; the script stops clicking when it ends.
+                    if run_program(self.program, self):
+                        self.stop_clicking()
+                        if self.app:
+                            self.app.after(0, self.app.stop_clicking_ui)
+                    elif self.pending_params is not None:
+                        continue
+                    break
+                pixel_watcher = self.pixel_watcher
+                if pixel_watcher and not pixel_watcher.satisfied:
+                    if self.pixel_condition.stop_when_unsatisfied:
+                        self.stop_clicking()
+                        if self.app:
+                            self.app.after(0, self.app.stop_clicking_ui)
+                        break
+                    self.sleep(pixel_watcher.interval_sec)
+                    continue
+                if tracer:
+                    tracer.begin()
                 if self.human_like and self.fatigue_enabled:
                     now = self.now()
                     if self.last_action_time is not None:
-                        delta_ms = (now - self.last_action_time) * MS_PER_SEC
-                        if delta_ms < self.fatigue_threshold_interval_ms:
-                            self.jitter_duration += delta_ms
+                        delta_us = (now - self.last_action_time) * US_PER_SEC
+                        if delta_us < self.fatigue_threshold_interval_us:
+                            self.jitter_duration += delta_us
                         else:
                             self.jitter_duration = 0
                     self.last_action_time = now
 
-                    if self.jitter_duration >= self.fatigue_duration_ms:
-                        self.cooldown_end_time = now + ms_to_sec(self.fatigue_cooldown_duration_ms)
+                    if self.jitter_duration >= self.fatigue_duration_us:
+                        self.cooldown_end_time = now + us_to_sec(self.fatigue_cooldown_duration_us)
                         self.jitter_duration = 0
-
-                target_x, target_y = self.target_pos if self.target_pos else self.mouse.position
-                current_button = self.button
-                current_click_type = self.click_type
-
-                final_x, final_y = target_x, target_y
-
-                if self.random_pos_offset:
-                    range_x, range_y = self.random_pos_offset
-                    if range_x > 0 or range_y > 0:
-                        if self.human_like and self.drift_enabled:
-                            drift_step_x = self.rand.uniform(self.drift_step_min, self.drift_step_max)
-                            drift_step_y = self.rand.uniform(self.drift_step_min, self.drift_step_max)
-                            self.drift_x += drift_step_x
-                            self.drift_y += drift_step_y
-                            if (abs(self.drift_x) > range_x) or (abs(self.drift_y) > range_y):
-                                self.drift_x = self.rand.uniform(self.drift_reset_min, self.drift_reset_max)
-                                self.drift_y = self.rand.uniform(self.drift_reset_min, self.drift_reset_max)
-                            final_x += int(self.drift_x)
-                            final_y += int(self.drift_y)
-                        else:
-                            final_x += self.rand.randint(-range_x, range_x) if range_x > 0 else 0
-                            final_y += self.rand.randint(-range_y, range_y) if range_y > 0 else 0
-
-                if self.target_pos or (self.random_pos_offset and (self.random_pos_offset[0] > 0 or self.random_pos_offset[1] > 0)):
-                    if not self._use_background_clicker():
-                        self.mouse.position = (final_x, final_y)
-
-                click_count = 2 if current_click_type.lower() == "double" else 1
-
-                if self.human_like and self.hold_time_enabled:
-                    for i in range(click_count):
-                        self._press_button(current_button, final_x, final_y)
-                        self.sleep(self._sample_hold_time())
-                        self._release_button(current_button, final_x, final_y)
-                        if click_count == 2 and i == 0:
-                            self.sleep(ms_to_sec(self.rand.uniform(DOUBLE_CLICK_GAP_MIN_MS, DOUBLE_CLICK_GAP_MAX_MS)))
+                        if self.metrics:
+                            self.metrics.record_fatigue_cooldown()
+                if tracer:
+                    tracer.mark(STAGE_FATIGUE)
+
+                if self.key_sequence:
+                    combo = self.key_sequence[self.key_index]
+                    self.key_index = (self.key_index + 1) % len(self.key_sequence)
+                    if self.human_like and self.hold_time_enabled:
+                        self._hold_key(combo)
+                    else:
+                        self._tap_key(combo)
+                        if tracer:
+                            tracer.mark(STAGE_CLICK)
+                    click_count = 1
                 else:
-                    self._click_button(current_button, final_x, final_y, click_count)
+                    if self.target_locator:
+                        located = self.target_locator.locate()
+                        if located is None:
+                            self.sleep(ms_to_sec(IDLE_SLEEP_MS))
+                            continue
+                        target_x, target_y = located
+                    else:
+                        target_x, target_y = self.target_pos if self.target_pos else self._cursor_position()
+                    current_button = self.button
+                    current_click_type = self.click_type
+
+                    final_x, final_y = target_x, target_y
+
+                    if self.random_pos_offset:
+                        range_x, range_y = self.random_pos_offset
+                        if range_x > 0 or range_y > 0:
+                            final_x, final_y = self._offset_position(final_x, final_y)
+                    if tracer:
+                        tracer.mark(STAGE_POSITION)
+
+                    if self.target_pos or self.target_locator or (self.random_pos_offset and (self.random_pos_offset[0] > 0 or self.random_pos_offset[1] > 0)):
+                        self._move_cursor(final_x, final_y)
+                        if tracer:
+                            tracer.mark(STAGE_MOVE)
+
+                    click_count = 2 if current_click_type.lower() == "double" else 1
+
+                    if self.human_like and self.hold_time_enabled:
+                        self._hold_click(current_button, final_x, final_y, click_count)
+                    else:
+                        self._click_button(current_button, final_x, final_y, click_count)
+                        if tracer:
+                            tracer.mark(STAGE_CLICK)
 
                 self.click_count += click_count
+                if self.stats:
+                    self.stats.record_click_count(self.click_count)
+                if self.metrics:
+                    self.metrics.record_click(self.metrics_click_slot)
 
                 if self.click_limit > 0 and self.click_count >= self.click_limit:
                     self.stop_clicking()
@@ -358,24 +664,50 @@ class AutoClicker(threading.Thread):
                         self.app.after(0, self.app.stop_clicking_ui)
                     break
 
-                thinking_pause_ms = 0
+                thinking_pause_us = 0
                 if self.human_like and self.thinking_pause_enabled and self.click_count >= self.next_thinking_click:
-                    thinking_pause_ms = self._sample_positive_gauss_ms(self.thinking_pause_mean_ms, self.thinking_pause_std_ms)
-                    self.next_thinking_click = self.click_count + self.rand.randint(self.thinking_pause_min_clicks, self.thinking_pause_max_clicks)
+                    thinking = self.streams.thinking
+                    thinking_pause_us = self._sample_positive_gauss_us(thinking, self.thinking_pause_mean_us, self.thinking_pause_std_us)
+                    self.next_thinking_click = self.click_count + thinking.randint(self.thinking_pause_min_clicks, self.thinking_pause_max_clicks)
+                    if self.metrics:
+                        self.metrics.record_thinking_pause()
 
                 if self.interval_mode == "Exponential":
-                    mean_interval_ms = max(MIN_SLEEP_MS, self.exp_mean_interval_ms)
-                    p_delay_ms = -math.log(1.0 - self.rand.random()) * mean_interval_ms
+                    mean_interval_us = max(MIN_SLEEP_US, self.exp_mean_interval_us)
+                    p_delay_us = -math.log(1.0 - self.streams.interval.random()) * mean_interval_us
                 else:
-                    p_delay_ms = self.interval_ms
-                    if self.random_interval_ms > 0:
-                        p_delay_ms += self.rand.uniform(0, self.random_interval_ms)
+                    p_delay_us = self.interval_us
+                    if self.random_interval_us > 0:
+                        p_delay_us += self.streams.interval.uniform(0, self.random_interval_us)
 
                 if self.human_like and self.thinking_pause_enabled:
-                    p_delay_ms += thinking_pause_ms
+                    p_delay_us += thinking_pause_us
                 if self.human_like and self.fatigue_enabled and self.now() < self.cooldown_end_time:
-                    p_delay_ms = max(p_delay_ms, self.fatigue_cooldown_min_interval_ms)
-
-                self.sleep(ms_to_sec(max(MIN_SLEEP_MS, p_delay_ms)))
-
+                    p_delay_us = max(p_delay_us, self.fatigue_cooldown_min_interval_us)
+
+                delay_sec = us_to_sec(max(MIN_SLEEP_US, p_delay_us))
+                if tracer:
+                    tracer.mark(STAGE_SCHEDULE)
+                if self.stats or self.metrics:
+                    sleep_start = self.now()
+                    self.sleep(delay_sec)
+                    slept_sec = self.now() - sleep_start
+                    if self.stats:
+                        self.stats.record_sleep(delay_sec, slept_sec)
+                    if self.metrics:
+                        self.metrics.observe_overshoot(slept_sec - delay_sec)
+                else:
+                    self.sleep(delay_sec)
+                if tracer:
+                    tracer.mark(STAGE_INTERVAL_SLEEP)
+
+            if self.paused:
+                # The session goes on after the user lets go.
+                self.sleep(ms_to_sec(IDLE_SLEEP_MS))
+                continue
+            if tracer:
+                tracer.flush()
+            if self.verifier:
+                self.verifier.finish()
             self.sleep(ms_to_sec(IDLE_SLEEP_MS))
+        self.backend.close()
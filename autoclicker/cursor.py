@@ -0,0 +1,48 @@
+from pynput.mouse import Listener
+
+
+class CursorCache:
+    # Keeps the cursor position current from a mouse listener, so the engine
+    # neither queries the display for it nor re-sends a move to where the
+    # cursor already is. Without a live listener it reads and moves as before.
+    def __init__(self, mouse, move, listener_factory=Listener):
+        self.mouse = mouse
+        self.send_move = move
+        self.listener_factory = listener_factory
+        self.listener = None
+        self.position = None
+
+    def start(self):
+        self.stop()
+        self.position = self.mouse.position
+        try:
+            self.listener = self.listener_factory(on_move=self.on_move)
+            self.listener.start()
+        except Exception as exc:
+            print(f"Cursor listener unavailable: {exc}")
+            self.listener = None
+
+    def stop(self):
+        if self.listener:
+            try:
+                self.listener.stop()
+            except Exception:
+                pass
+            self.listener = None
+
+    def on_move(self, x, y):
+        self.position = (x, y)
+
+    def live(self):
+        return self.listener is not None and self.listener.is_alive()
+
+    def read(self):
+        if not self.live():
+            self.position = self.mouse.position
+        return self.position
+
+    def move(self, x, y):
+        if (x, y) == self.position and self.live():
+            return
+        self.send_move(x, y)
+        self.position = (x, y)
@@ -0,0 +1,61 @@
+from pynput.keyboard import Key, KeyCode
+
+KEY_ALIASES = {
+    "control": "ctrl",
+    "return": "enter",
+    "escape": "esc",
+    "del": "delete",
+    "win": "cmd",
+    "super": "cmd",
+    "pgup": "page_up",
+    "pgdn": "page_down",
+}
+
+
+def key_name(key):
+    # The name hotkeys are stored under: "A", "F6", "CTRL_L".
+    char = getattr(key, "char", None)
+    if char:
+        return char.upper()
+    return str(key).replace("Key.", "").upper()
+
+
+def parse_key(name):
+    text = name.strip()
+    if len(text) == 1:
+        return KeyCode.from_char(text)
+    lowered = text.lower().replace("-", "_")
+    key = Key.__members__.get(KEY_ALIASES.get(lowered, lowered))
+    if key is None:
+        raise ValueError(f"unknown key: {name}")
+    return key
+
+
+def parse_key_combo(text):
+    # "ctrl+shift+s" -> modifiers pressed in order, released in reverse.
+    text = str(text).strip()
+    if not text:
+        raise ValueError("empty key")
+    if text == "+" or text.endswith("++"):
+        parts = text[:-1].split("+")[:-1] + ["+"]
+    else:
+        parts = text.split("+")
+    if any(not part.strip() for part in parts):
+        raise ValueError(f"invalid key combination: {text}")
+    return tuple(parse_key(part) for part in parts)
+
+
+def parse_key_sequence(keys):
+    if isinstance(keys, str):
+        keys = keys.split()
+    return [key if isinstance(key, tuple) else parse_key_combo(key) for key in keys]
+
+
+def key_sequence_from_config(value):
+    if not value:
+        return None
+    try:
+        return parse_key_sequence(value)
+    except (TypeError, ValueError) as exc:
+        print(f"Invalid key sequence: {exc}")
+        return None
@@ -0,0 +1,51 @@
+class LayoutManager:
+    # Remembers what was last applied to each widget so only changes reach Tk,
+    # and folds every geometry request made in one idle cycle into one pass.
+    def __init__(self, root, geometry_pass):
+        self.root = root
+        self.geometry_pass = geometry_pass
+        self.options = {}
+        self.visible = {}
+        self.geometry_pending = False
+
+    def set_option(self, widget, option, value):
+        key = (widget, option)
+        if self.options.get(key) == value:
+            return False
+        widget.configure(**{option: value})
+        self.options[key] = value
+        return True
+
+    def set_state(self, widgets, enabled):
+        state = "normal" if enabled else "disabled"
+        changed = False
+        for widget in widgets:
+            changed = self.set_option(widget, "state", state) or changed
+        return changed
+
+    def set_visible(self, frame, visible):
+        if not frame or self.visible.get(frame) == visible:
+            return False
+        if visible:
+            frame.grid()
+        else:
+            frame.grid_remove()
+        self.visible[frame] = visible
+        return True
+
+    def apply_rows(self, rows, visible):
+        # Returns True when any row was shown or hidden, i.e. geometry changed.
+        changed = False
+        for row in rows:
+            changed = self.set_visible(row, visible) or changed
+        return changed
+
+    def request_geometry(self, _event=None):
+        if self.geometry_pending:
+            return
+        self.geometry_pending = True
+        self.root.after_idle(self._run_geometry)
+
+    def _run_geometry(self):
+        self.geometry_pending = False
+        self.geometry_pass()
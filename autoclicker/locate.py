@@ -0,0 +1,174 @@
+import zlib
+
+from PIL import Image, ImageChops, ImageMath, ImageStat
+
+from .pixel import ScreenFrameSource
+
+DEFAULT_MATCH_THRESHOLD = 12
+DEFAULT_ROI_MARGIN_PX = 32
+MAX_PYRAMID_FACTOR = 8
+MIN_COARSE_TEMPLATE_SIDE = 4
+REFINE_RADIUS = 2
+
+
+def _coarse_factor(size):
+    factor = 1
+    while factor < MAX_PYRAMID_FACTOR and min(size) // (factor * 2) >= MIN_COARSE_TEMPLATE_SIDE:
+        factor *= 2
+    return factor
+
+
+def _sad_map(haystack, template):
+    # Sum of absolute differences for every placement, accumulated one
+    # template pixel at a time so each step is a whole-image C operation.
+    width, height = haystack.size
+    t_width, t_height = template.size
+    out_w, out_h = width - t_width + 1, height - t_height + 1
+    if out_w < 1 or out_h < 1:
+        return None
+    acc = Image.new("I", (out_w, out_h), 0)
+    pixels = template.load()
+    for dy in range(t_height):
+        for dx in range(t_width):
+            shifted = haystack.crop((dx, dy, dx + out_w, dy + out_h))
+            diff = ImageChops.difference(shifted, Image.new("L", (out_w, out_h), pixels[dx, dy]))
+            acc = ImageMath.lambda_eval(lambda args: args["acc"] + args["diff"], acc=acc, diff=diff.convert("I"))
+    return acc
+
+
+def _argmin(score_map):
+    low, _ = score_map.getextrema()
+    mask = ImageMath.lambda_eval(lambda args: args["m"] == low, m=score_map).convert("L")
+    # The bbox corner need not be a minimum when scores tie; its top row
+    # always holds one, so take the first in that row.
+    left, top, right, _ = mask.getbbox()
+    row_left = mask.crop((left, top, right, top + 1)).getbbox()[0]
+    return left + row_left, top, low
+
+
+def _mean_diff(haystack, template, x, y):
+    width, height = template.size
+    crop = haystack.crop((x, y, x + width, y + height))
+    return ImageStat.Stat(ImageChops.difference(crop, template)).mean[0]
+
+
+class TemplateLocator:
+    def __init__(self, template, threshold=DEFAULT_MATCH_THRESHOLD, roi_margin=DEFAULT_ROI_MARGIN_PX,
+                 frame_source=None):
+        if isinstance(template, str):
+            template = Image.open(template)
+        self.template = template.convert("L")
+        self.threshold = threshold
+        self.roi_margin = roi_margin
+        self.frame_source = frame_source if frame_source else ScreenFrameSource()
+        self.factor = _coarse_factor(self.template.size)
+        self.pyramid = {}
+        factor = 1
+        while factor <= self.factor:
+            self.pyramid[factor] = self.template.reduce(factor) if factor > 1 else self.template
+            factor *= 2
+        self.last_hit = None
+        self.last_frame_hash = None
+        self.full_searches = 0
+        self.roi_hits = 0
+        self.hash_skips = 0
+
+    def _search(self, haystack, coarse=None):
+        factor = self.factor
+        if coarse is None:
+            coarse = haystack.reduce(factor) if factor > 1 else haystack
+        score_map = _sad_map(coarse, self.pyramid[factor])
+        if score_map is None:
+            return None
+        x, y, _ = _argmin(score_map)
+        # Refine one pyramid level at a time inside a small window.
+        while factor > 1:
+            factor //= 2
+            x, y = x * 2, y * 2
+            level_template = self.pyramid[factor]
+            left = max(0, (x - REFINE_RADIUS) * factor)
+            top = max(0, (y - REFINE_RADIUS) * factor)
+            right = min(haystack.width, (x + REFINE_RADIUS) * factor + self.template.width + factor)
+            bottom = min(haystack.height, (y + REFINE_RADIUS) * factor + self.template.height + factor)
+            window = haystack.crop((left, top, right, bottom))
+            if factor > 1:
+                window = window.reduce(factor)
+            best = None
+            max_x = window.width - level_template.width
+            max_y = window.height - level_template.height
+            for cy in range(max(0, y - top // factor - REFINE_RADIUS), min(max_y, y - top // factor + REFINE_RADIUS) + 1):
+                for cx in range(max(0, x - left // factor - REFINE_RADIUS), min(max_x, x - left // factor + REFINE_RADIUS) + 1):
+                    score = _mean_diff(window, level_template, cx, cy)
+                    if best is None or score < best[0]:
+                        best = (score, cx + left // factor, cy + top // factor)
+            if best is None:
+                return None
+            _, x, y = best
+        if _mean_diff(haystack, self.template, x, y) > self.threshold:
+            return None
+        return x, y
+
+    def _grab(self, bbox):
+        frame = self.frame_source.grab(bbox)
+        return frame if frame.mode == "L" else frame.convert("L")
+
+    def _roi_bbox(self):
+        x, y = self.last_hit
+        margin = self.roi_margin
+        return (
+            max(0, x - margin),
+            max(0, y - margin),
+            x + self.template.width + margin,
+            y + self.template.height + margin,
+        )
+
+    def _center(self, hit):
+        x, y = hit
+        return x + self.template.width // 2, y + self.template.height // 2
+
+    def locate(self):
+        if self.last_hit:
+            roi = self._roi_bbox()
+            roi_frame = self._grab(roi)
+            hit = None
+            anchor = (self.last_hit[0] - roi[0], self.last_hit[1] - roi[1])
+            if _mean_diff(roi_frame, self.template, *anchor) <= self.threshold:
+                hit = anchor
+            else:
+                hit = self._search(roi_frame)
+            if hit:
+                self.roi_hits += 1
+                self.last_hit = (roi[0] + hit[0], roi[1] + hit[1])
+                return self._center(self.last_hit)
+        frame = self._grab(None)
+        coarse = frame.reduce(self.factor) if self.factor > 1 else frame
+        frame_hash = zlib.crc32(coarse.tobytes())
+        if frame_hash == self.last_frame_hash:
+            # The screen hasn't changed since the last full search missed.
+            self.hash_skips += 1
+            return None
+        self.last_frame_hash = frame_hash
+        self.full_searches += 1
+        hit = self._search(frame, coarse)
+        self.last_hit = hit
+        return self._center(hit) if hit else None
+
+
+def template_locator_from_config(config, frame_source=None):
+    if not config:
+        return None
+    if not isinstance(config, dict):
+        print("Invalid template target: expected an object with an image")
+        return None
+    if not config.get("enabled", True):
+        return None
+    try:
+        return TemplateLocator(
+            config["image"],
+            threshold=config.get("threshold", DEFAULT_MATCH_THRESHOLD),
+            roi_margin=config.get("roi_margin", DEFAULT_ROI_MARGIN_PX),
+            frame_source=frame_source,
+        )
+    except (KeyError, OSError, ValueError) as exc:
+        print(f"Invalid template target: {exc}")
+        return None
@@ -0,0 +1,228 @@
+from bisect import bisect_left
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import shared_memory
+
+from .config import write_atomic
+
+CLICK_BUTTONS = ("left", "right", "key")
+CLICK_TYPES = ("single", "double")
+BACKEND_LATENCY_BUCKETS_SEC = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+OVERSHOOT_BUCKETS_SEC = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05)
+
+METRIC_SLOT_CLICKS = 0
+METRIC_SLOT_THINKING_PAUSES = METRIC_SLOT_CLICKS + len(CLICK_BUTTONS) * len(CLICK_TYPES)
+METRIC_SLOT_FATIGUE_COOLDOWNS = METRIC_SLOT_THINKING_PAUSES + 1
+METRIC_SLOT_BACKEND = METRIC_SLOT_FATIGUE_COOLDOWNS + 1
+# A histogram is its bucket counts (plus +Inf), then sum, then count.
+METRIC_SLOT_OVERSHOOT = METRIC_SLOT_BACKEND + len(BACKEND_LATENCY_BUCKETS_SEC) + 3
+METRIC_SLOT_COUNT = METRIC_SLOT_OVERSHOOT + len(OVERSHOOT_BUCKETS_SEC) + 3
+BACKEND_SUM_SLOT = METRIC_SLOT_BACKEND + len(BACKEND_LATENCY_BUCKETS_SEC) + 1
+OVERSHOOT_SUM_SLOT = METRIC_SLOT_OVERSHOOT + len(OVERSHOOT_BUCKETS_SEC) + 1
+METRIC_SLOT_SIZE = 8
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_TEXTFILE_INTERVAL_MS = 5000
+# Longest stop() waits for in-flight scrapes before the slots are released.
+METRICS_STOP_TIMEOUT_SEC = 2.0
+
+
+def click_slot(button, click_type):
+    return METRIC_SLOT_CLICKS + CLICK_BUTTONS.index(button) * len(CLICK_TYPES) + CLICK_TYPES.index(click_type)
+
+
+class EngineMetrics:
+    # Fixed slots in shared memory: the engine thread (or engine process) is
+    # the only writer, so updates are plain stores with no locks.
+    def __init__(self, name=None):
+        create = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=METRIC_SLOT_COUNT * METRIC_SLOT_SIZE)
+        self.owner = create
+        self.slots = self.shm.buf.cast("d")
+        if create:
+            for i in range(METRIC_SLOT_COUNT):
+                self.slots[i] = 0.0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def record_click(self, slot):
+        self.slots[slot] += 1
+
+    def record_thinking_pause(self):
+        self.slots[METRIC_SLOT_THINKING_PAUSES] += 1
+
+    def record_fatigue_cooldown(self):
+        self.slots[METRIC_SLOT_FATIGUE_COOLDOWNS] += 1
+
+    def observe_backend(self, seconds):
+        slots = self.slots
+        slots[METRIC_SLOT_BACKEND + bisect_left(BACKEND_LATENCY_BUCKETS_SEC, seconds)] += 1
+        slots[BACKEND_SUM_SLOT] += seconds
+        slots[BACKEND_SUM_SLOT + 1] += 1
+
+    def observe_overshoot(self, seconds):
+        if seconds < 0:
+            seconds = 0.0
+        slots = self.slots
+        slots[METRIC_SLOT_OVERSHOOT + bisect_left(OVERSHOOT_BUCKETS_SEC, seconds)] += 1
+        slots[OVERSHOOT_SUM_SLOT] += seconds
+        slots[OVERSHOOT_SUM_SLOT + 1] += 1
+
+    def _render_histogram(self, lines, name, help_text, base, bounds):
+        slots = self.slots
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        total = 0.0
+        for i, bound in enumerate(bounds):
+            total += slots[base + i]
+            lines.append(f'{name}_bucket{{le="{bound}"}} {total:g}')
+        total += slots[base + len(bounds)]
+        lines.append(f'{name}_bucket{{le="+Inf"}} {total:g}')
+        lines.append(f"{name}_sum {slots[base + len(bounds) + 1]!r}")
+        lines.append(f"{name}_count {slots[base + len(bounds) + 2]:g}")
+
+    def render(self):
+        slots = self.slots
+        lines = [
+            "# HELP autoclicker_clicks_total Clicks and key presses sent, by button and click type.",
+            "# TYPE autoclicker_clicks_total counter",
+        ]
+        for button in CLICK_BUTTONS:
+            for click_type in CLICK_TYPES:
+                value = slots[click_slot(button, click_type)]
+                lines.append(f'autoclicker_clicks_total{{button="{button}",type="{click_type}"}} {value:g}')
+        lines.append("# HELP autoclicker_thinking_pauses_total Thinking pauses taken.")
+        lines.append("# TYPE autoclicker_thinking_pauses_total counter")
+        lines.append(f"autoclicker_thinking_pauses_total {slots[METRIC_SLOT_THINKING_PAUSES]:g}")
+        lines.append("# HELP autoclicker_fatigue_cooldowns_total Fatigue cooldowns triggered.")
+        lines.append("# TYPE autoclicker_fatigue_cooldowns_total counter")
+        lines.append(f"autoclicker_fatigue_cooldowns_total {slots[METRIC_SLOT_FATIGUE_COOLDOWNS]:g}")
+        self._render_histogram(lines, "autoclicker_backend_call_seconds",
+                               "Time spent in mouse, keyboard or background press/release calls.",
+                               METRIC_SLOT_BACKEND, BACKEND_LATENCY_BUCKETS_SEC)
+        self._render_histogram(lines, "autoclicker_deadline_overshoot_seconds",
+                               "How far each interval sleep overshot its deadline.",
+                               METRIC_SLOT_OVERSHOOT, OVERSHOOT_BUCKETS_SEC)
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self.slots is None:
+            return
+        self.slots.release()
+        self.slots = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.exporter.render()
+        if body is None:
+            self.send_error(503)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsHTTPExporter:
+    def __init__(self, metrics, port, host=DEFAULT_METRICS_HOST):
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.exporter = self
+        self.metrics = metrics
+        self.address = self.server.server_address[:2]
+        # Scrapes in flight; stop() waits for them so close() never pulls the slots from under a render.
+        self.cond = threading.Condition()
+        self.active = 0
+        self.stopping = False
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def render(self):
+        with self.cond:
+            if self.stopping:
+                return None
+            self.active += 1
+        try:
+            return self.metrics.render().encode()
+        finally:
+            with self.cond:
+                self.active -= 1
+                self.cond.notify_all()
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        with self.cond:
+            self.cond.wait_for(lambda: self.active == 0, METRICS_STOP_TIMEOUT_SEC)
+
+
+def write_textfile(metrics, path):
+    # Collectors read only *.prom, so they never see the .tmp file being written.
+    write_atomic(path, metrics.render())
+
+
+class TextfileExporter(threading.Thread):
+    def __init__(self, metrics, path, interval_ms=DEFAULT_TEXTFILE_INTERVAL_MS):
+        super().__init__(daemon=True)
+        self.metrics = metrics
+        self.path = path
+        self.interval_sec = max(1, int(interval_ms)) / 1000
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                write_textfile(self.metrics, self.path)
+            except OSError as exc:
+                print(f"Metrics textfile write failed: {exc}")
+            if self.stop_event.wait(self.interval_sec):
+                break
+
+    def stop(self):
+        # Joined, so the last write finishes before the metrics are closed.
+        self.stop_event.set()
+        if self.is_alive() and self is not threading.current_thread():
+            self.join()
+
+
+def metrics_from_config(config):
+    # Returns (metrics, exporter); both None when metrics are off or invalid.
+    if not config:
+        return None, None
+    if not isinstance(config, dict):
+        print("Invalid metrics config: expected an object with a port or textfile")
+        return None, None
+    if not config.get("enabled", True):
+        return None, None
+    metrics = EngineMetrics()
+    try:
+        if config.get("textfile"):
+            exporter = TextfileExporter(metrics, config["textfile"],
+                                        config.get("interval_ms", DEFAULT_TEXTFILE_INTERVAL_MS))
+            exporter.start()
+        else:
+            exporter = MetricsHTTPExporter(metrics, int(config["port"]), config.get("host", DEFAULT_METRICS_HOST))
+    except (KeyError, TypeError, ValueError, OSError) as exc:
+        print(f"Invalid metrics config: {exc}")
+        metrics.close()
+        return None, None
+    return metrics, exporter
@@ -0,0 +1,125 @@
+import threading
+
+from PIL import ImageGrab
+
+PIXEL_MODE_MATCH = "match"
+PIXEL_MODE_DIFFER = "differ"
+PIXEL_MODES = (PIXEL_MODE_MATCH, PIXEL_MODE_DIFFER)
+DEFAULT_PIXEL_TOLERANCE = 10
+DEFAULT_PIXEL_SAMPLE_INTERVAL_MS = 50
+MIN_PIXEL_SAMPLE_INTERVAL_MS = 1
+
+
+class ScreenFrameSource:
+    def __init__(self, xdisplay=None):
+        self.xdisplay = xdisplay
+
+    def grab(self, bbox):
+        # Only the bounding box is captured, never the full screen.
+        if self.xdisplay is not None:
+            return ImageGrab.grab(bbox=bbox, xdisplay=self.xdisplay)
+        return ImageGrab.grab(bbox=bbox)
+
+
+def parse_color(value):
+    if isinstance(value, str):
+        text = value.strip().lstrip("#")
+        if len(text) != 6:
+            raise ValueError(f"invalid color: {value}")
+        return tuple(int(text[i:i + 2], 16) for i in (0, 2, 4))
+    red, green, blue = value
+    return int(red), int(green), int(blue)
+
+
+def region_to_bbox(region):
+    if len(region) == 2:
+        x, y = region
+        return int(x), int(y), int(x) + 1, int(y) + 1
+    x, y, width, height = region
+    return int(x), int(y), int(x) + max(1, int(width)), int(y) + max(1, int(height))
+
+
+class PixelCondition:
+    def __init__(self, region, color, tolerance=DEFAULT_PIXEL_TOLERANCE, mode=PIXEL_MODE_MATCH,
+                 sample_interval_ms=DEFAULT_PIXEL_SAMPLE_INTERVAL_MS, stop_when_unsatisfied=False,
+                 frame_source=None):
+        if mode not in PIXEL_MODES:
+            raise ValueError(f"invalid pixel condition mode: {mode}")
+        self.bbox = region_to_bbox(region)
+        self.color = parse_color(color)
+        self.tolerance = max(0, int(tolerance))
+        self.mode = mode
+        self.sample_interval_ms = max(MIN_PIXEL_SAMPLE_INTERVAL_MS, int(sample_interval_ms))
+        self.stop_when_unsatisfied = stop_when_unsatisfied
+        self.frame_source = frame_source if frame_source else ScreenFrameSource()
+        # Per-band acceptance window; a region matches when every band's
+        # extrema fall inside it, so one C-level getextrema() pass decides.
+        self.bounds = tuple(
+            (max(0, channel - self.tolerance), min(255, channel + self.tolerance))
+            for channel in self.color
+        )
+
+    def matches(self):
+        frame = self.frame_source.grab(self.bbox)
+        if frame.mode != "RGB":
+            frame = frame.convert("RGB")
+        for (low, high), (band_min, band_max) in zip(self.bounds, frame.getextrema()):
+            if band_min < low or band_max > high:
+                return False
+        return True
+
+    def satisfied(self):
+        matched = self.matches()
+        return matched if self.mode == PIXEL_MODE_MATCH else not matched
+
+
+class PixelWatcher(threading.Thread):
+    def __init__(self, condition):
+        super().__init__(daemon=True)
+        self.condition = condition
+        self.interval_sec = condition.sample_interval_ms / 1000
+        self.stop_event = threading.Event()
+        # The first grab happens in run(), off the thread that starts the
+        # session; the click thread waits on first_sample before its first check.
+        self.satisfied = False
+        self.first_sample = threading.Event()
+
+    def _sample(self):
+        try:
+            return self.condition.satisfied()
+        except Exception as exc:
+            print(f"Pixel sample failed: {exc}")
+            return False
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.satisfied = self._sample()
+            self.first_sample.set()
+            self.stop_event.wait(self.interval_sec)
+
+    def stop(self):
+        self.stop_event.set()
+        self.first_sample.set()
+
+
+def pixel_condition_from_config(config, frame_source=None):
+    if not config:
+        return None
+    if not isinstance(config, dict):
+        print("Invalid pixel condition: expected an object")
+        return None
+    if not config.get("enabled", True):
+        return None
+    try:
+        return PixelCondition(
+            region=config["region"],
+            color=config["color"],
+            tolerance=config.get("tolerance", DEFAULT_PIXEL_TOLERANCE),
+            mode=config.get("mode", PIXEL_MODE_MATCH),
+            sample_interval_ms=config.get("sample_interval_ms", DEFAULT_PIXEL_SAMPLE_INTERVAL_MS),
+            stop_when_unsatisfied=bool(config.get("stop_when_unsatisfied", False)),
+            frame_source=frame_source,
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        print(f"Invalid pixel condition: {exc}")
+        return None
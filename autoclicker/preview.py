@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .process import PROCESS_CONTEXT
+from .session import profile_snapshot
+from .sweep import simulate
+
+PREVIEW_DURATION_SEC = 600
+# Caps the cost of fast settings; about 150 thinking pauses at the defaults.
+PREVIEW_MAX_CLICKS = 20000
+PREVIEW_CACHE_SIZE = 64
+# Parameters that move the cursor but don't change timing.
+PREVIEW_IGNORED_PARAMS = ("target_pos", "random_pos_offset", "click_limit", "button", "drift_enabled",
+                          "drift_step_min", "drift_step_max", "drift_reset_min", "drift_reset_max")
+# Feature flag -> parameters that only matter while it is on.
+PREVIEW_FEATURE_PARAMS = {
+    "hold_time_enabled": ("hold_time_mean_us", "hold_time_std_us"),
+    "thinking_pause_enabled": ("thinking_pause_mean_us", "thinking_pause_std_us",
+                               "thinking_pause_min_clicks", "thinking_pause_max_clicks"),
+    "fatigue_enabled": ("fatigue_threshold_interval_us", "fatigue_duration_us",
+                        "fatigue_cooldown_duration_us", "fatigue_cooldown_min_interval_us"),
+}
+
+
+def preview_key(config):
+    # Hash of the normalized timing parameters, so edits that end up at the
+    # same settings (undo, "080" vs "80", fields of a disabled feature or the
+    # inactive timing model) share one cache entry. Raises ValueError for
+    # settings the engine would reject.
+    params = profile_snapshot(config, None)
+    for name in PREVIEW_IGNORED_PARAMS:
+        params.pop(name)
+    for flag, names in PREVIEW_FEATURE_PARAMS.items():
+        if not params[flag]:
+            for name in names:
+                params.pop(name)
+    if params["interval_mode"] == "Exponential":
+        del params["interval_us"], params["random_interval_us"]
+    else:
+        del params["exp_mean_interval_us"]
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def preview_config(config):
+    # Steady-state behavior: the user's click limit is replaced by the preview cap.
+    config = dict(config)
+    config.update({"repeat_mode": "limit", "repeat_limit": PREVIEW_MAX_CLICKS})
+    return config
+
+
+class PreviewWorker(threading.Thread):
+    # Memoizes preview simulations in an LRU and runs them in a child
+    # process, so they never hold the GIL the click thread needs. Only the
+    # newest request waits: edits made while one simulation runs replace
+    # the queued one rather than piling up. on_result(key, result) is called
+    # on this thread. executor_factory is for tests.
+    def __init__(self, on_result, cache_size=PREVIEW_CACHE_SIZE, duration_sec=PREVIEW_DURATION_SEC,
+                 simulate_fn=simulate, executor_factory=None):
+        super().__init__(name="preview", daemon=True)
+        self.on_result = on_result
+        self.cache_size = cache_size
+        self.duration_sec = duration_sec
+        self.simulate = simulate_fn
+        self.executor_factory = executor_factory or (
+            lambda: ProcessPoolExecutor(max_workers=1, mp_context=PROCESS_CONTEXT))
+        self.executor = None
+        self.cache = OrderedDict()
+        self.cond = threading.Condition()
+        self.pending = None
+        self.stopping = False
+        self.runs = 0
+
+    def request(self, key, config):
+        # The cached result, or None once the simulation is queued.
+        with self.cond:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            self.pending = key, config
+            self.cond.notify()
+        return None
+
+    def run(self):
+        try:
+            self._serve()
+        finally:
+            if self.executor:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _serve(self):
+        while True:
+            with self.cond:
+                while self.pending is None and not self.stopping:
+                    self.cond.wait()
+                if self.stopping:
+                    return
+                (key, config), self.pending = self.pending, None
+            result = self._simulate(config)
+            with self.cond:
+                self.runs += 1
+                self.cache[key] = result
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            self.on_result(key, result)
+
+    def _simulate(self, config):
+        # The child process is started on first use, not with the window.
+        if self.executor is None:
+            self.executor = self.executor_factory()
+        try:
+            return self.executor.submit(self.simulate, preview_config(config), self.duration_sec).result()
+        except (KeyError, TypeError, ValueError) as exc:
+            return {"error": str(exc)}
+        except BrokenProcessPool:
+            self.executor = None
+            return {"error": "simulation process exited"}
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+
+
+def _format_ms(value):
+    # Sub-millisecond settings still get significant digits.
+    return f"{value:.0f}" if value >= 10 else f"{value:.2f}"
+
+
+def format_preview(result):
+    if result is None:
+        return "Expected: simulating..."
+    if "error" in result:
+        return f"Expected: n/a ({result['error']})"
+    if "interval_p50_ms" not in result:
+        return "Expected: no clicks"
+    text = (f"Expected: {result['cps']:.1f} CPS, interval p50 {_format_ms(result['interval_p50_ms'])} ms "
+            f"/ p95 {_format_ms(result['interval_p95_ms'])} ms, {result['pause_share']:.0%} paused")
+    if result["cooldown_share"]:
+        text += f", {result['cooldown_share']:.0%} in cooldown"
+    return text
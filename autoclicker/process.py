@@ -0,0 +1,243 @@
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+from .core import AutoClicker
+from .metrics import EngineMetrics
+
+STATS_SLOT_RUNNING = 0
+STATS_SLOT_CLICK_COUNT = 1
+STATS_SLOT_SLEEP_SAMPLES = 2
+STATS_SLOT_OVERSLEEP_SUM_US = 3
+STATS_SLOT_OVERSLEEP_MAX_US = 4
+STATS_SLOT_HISTOGRAM = 5
+OVERSLEEP_BUCKETS_US = (50, 100, 250, 500, 1000, 2000, 5000, 10000, 20000)
+STATS_SLOT_PAUSED = STATS_SLOT_HISTOGRAM + len(OVERSLEEP_BUCKETS_US) + 1
+STATS_SLOT_COUNT = STATS_SLOT_PAUSED + 1
+STATS_SLOT_SIZE = 8
+PROCESS_JOIN_TIMEOUT_SEC = 2.0
+# Forking the threaded Tk process can deadlock the child; spawn starts clean on every OS.
+PROCESS_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class SharedStats:
+    def __init__(self, name=None):
+        create = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=STATS_SLOT_COUNT * STATS_SLOT_SIZE)
+        self.owner = create
+        self.slots = self.shm.buf.cast("Q")
+        if create:
+            for i in range(STATS_SLOT_COUNT):
+                self.slots[i] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def running(self):
+        return bool(self.slots[STATS_SLOT_RUNNING])
+
+    @property
+    def click_count(self):
+        return self.slots[STATS_SLOT_CLICK_COUNT]
+
+    @property
+    def paused(self):
+        return bool(self.slots[STATS_SLOT_PAUSED])
+
+    def set_running(self, running):
+        self.slots[STATS_SLOT_RUNNING] = 1 if running else 0
+
+    def set_paused(self, paused):
+        self.slots[STATS_SLOT_PAUSED] = 1 if paused else 0
+
+    def record_click_count(self, count):
+        self.slots[STATS_SLOT_CLICK_COUNT] = count
+
+    def record_sleep(self, requested_sec, actual_sec):
+        slots = self.slots
+        over_us = int((actual_sec - requested_sec) * 1_000_000)
+        if over_us < 0:
+            over_us = 0
+        slots[STATS_SLOT_SLEEP_SAMPLES] += 1
+        slots[STATS_SLOT_OVERSLEEP_SUM_US] += over_us
+        if over_us > slots[STATS_SLOT_OVERSLEEP_MAX_US]:
+            slots[STATS_SLOT_OVERSLEEP_MAX_US] = over_us
+        bucket = 0
+        for bound in OVERSLEEP_BUCKETS_US:
+            if over_us <= bound:
+                break
+            bucket += 1
+        slots[STATS_SLOT_HISTOGRAM + bucket] += 1
+
+    def histogram(self):
+        return [self.slots[STATS_SLOT_HISTOGRAM + i] for i in range(len(OVERSLEEP_BUCKETS_US) + 1)]
+
+    def oversleep_percentile_us(self, fraction):
+        histogram = self.histogram()
+        total = sum(histogram)
+        if total == 0:
+            return 0
+        threshold = total * fraction
+        seen = 0
+        for i, count in enumerate(histogram):
+            seen += count
+            if seen >= threshold:
+                if i < len(OVERSLEEP_BUCKETS_US):
+                    return OVERSLEEP_BUCKETS_US[i]
+                break
+        return self.slots[STATS_SLOT_OVERSLEEP_MAX_US]
+
+    def snapshot(self):
+        samples = self.slots[STATS_SLOT_SLEEP_SAMPLES]
+        return {
+            "running": self.running,
+            "paused": self.paused,
+            "click_count": self.click_count,
+            "sleep_samples": samples,
+            "oversleep_mean_us": self.slots[STATS_SLOT_OVERSLEEP_SUM_US] / samples if samples else 0.0,
+            "oversleep_p50_us": self.oversleep_percentile_us(0.5),
+            "oversleep_p99_us": self.oversleep_percentile_us(0.99),
+            "oversleep_max_us": self.slots[STATS_SLOT_OVERSLEEP_MAX_US],
+            "histogram": self.histogram(),
+        }
+
+    def close(self):
+        if self.slots is None:
+            return
+        self.slots.release()
+        self.slots = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class _StopNotifier:
+    # Stands in for the Tk app inside the child: the engine's stop callback becomes a pipe message.
+    def __init__(self, conn):
+        self.conn = conn
+
+    def after(self, delay_ms, callback):
+        callback()
+
+    def stop_clicking_ui(self):
+        try:
+            self.conn.send("stopped")
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+
+
+def _engine_main(conn, stats_name, params, metrics_name=None, notify=False):
+    stats = SharedStats(stats_name)
+    metrics = EngineMetrics(metrics_name) if metrics_name else None
+    app = _StopNotifier(conn) if notify else None
+    clicker = AutoClicker(**params, app=app, stats=stats, metrics=metrics)
+    clicker.daemon = True
+    clicker.start()
+    try:
+        while True:
+            try:
+                command = conn.recv()
+            except (EOFError, OSError):
+                break
+            if command == "start":
+                clicker.start_clicking()
+            elif command == "stop":
+                clicker.stop_clicking()
+            elif command == "exit":
+                break
+            elif isinstance(command, tuple) and command[0] == "switch":
+                clicker.switch_params(command[1])
+    finally:
+        clicker.exit()
+        clicker.join(PROCESS_JOIN_TIMEOUT_SEC)
+        stats.close()
+        if metrics:
+            metrics.close()
+
+
+class ProcessClicker:
+    def __init__(self, app=None, metrics=None, **params):
+        self.app = app
+        self.click_limit = params.get("click_limit", 0)
+        self.seed = params.get("seed")
+        self.stats = SharedStats()
+        self.closed = False
+        self.conn, child_conn = PROCESS_CONTEXT.Pipe()
+        self.process = PROCESS_CONTEXT.Process(
+            target=_engine_main,
+            args=(child_conn, self.stats.name, params, metrics.name if metrics else None, app is not None),
+            daemon=True,
+        )
+        self.reader = threading.Thread(target=self._read_events, daemon=True) if app else None
+
+    @property
+    def running(self):
+        return self.stats.slots is not None and self.stats.running
+
+    @property
+    def paused(self):
+        # Set by the child while the user has taken over; running stays set.
+        return self.stats.slots is not None and self.stats.paused
+
+    @property
+    def click_count(self):
+        return self.stats.click_count if self.stats.slots is not None else 0
+
+    def _send(self, command):
+        try:
+            self.conn.send(command)
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+
+    def _read_events(self):
+        # Relays the child's stop events to the app, as a threaded AutoClicker would.
+        while True:
+            try:
+                event = self.conn.recv()
+            except (EOFError, OSError):
+                return
+            if event == "stopped" and not self.closed:
+                self.app.after(0, self.app.stop_clicking_ui)
+
+    def start(self):
+        self.process.start()
+        if self.reader:
+            self.reader.start()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def join(self, timeout=None):
+        if self.process.pid is not None:
+            self.process.join(timeout)
+
+    def start_clicking(self):
+        self.stats.set_running(True)
+        self.stats.record_click_count(0)
+        self._send("start")
+
+    def stop_clicking(self):
+        self.stats.set_running(False)
+        self.stats.set_paused(False)
+        self._send("stop")
+
+    def switch_params(self, params):
+        self.click_limit = params.get("click_limit", self.click_limit)
+        self._send(("switch", params))
+
+    def exit(self):
+        self.closed = True
+        self._send("exit")
+        if self.process.pid is not None:
+            self.process.join(PROCESS_JOIN_TIMEOUT_SEC)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.conn.close()
+        if self.reader and self.reader.ident is not None:
+            self.reader.join(PROCESS_JOIN_TIMEOUT_SEC)
+        self.stats.close()
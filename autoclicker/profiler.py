@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+import time
+
+from .config import write_atomic
+
+DEFAULT_PROFILE_INTERVAL_MS = 5
+DEFAULT_PROFILE_PREFIX = "autoclicker-profile"
+
+
+def _label(code):
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler(threading.Thread):
+    # Wall-clock sampler: every tick it snapshots the stacks of the watched
+    # threads, so time blocked in sleep or in the backend shows up too.
+    def __init__(self, interval_ms=DEFAULT_PROFILE_INTERVAL_MS, threads=None):
+        super().__init__(name="profiler", daemon=True)
+        self.interval_sec = max(1, interval_ms) / 1000
+        self.threads = threads
+        self.stacks = {}
+        self.ticks = 0
+        self.elapsed_sec = 0.0
+        self.stop_event = threading.Event()
+
+    def _targets(self):
+        threads = threading.enumerate() if self.threads is None else self.threads()
+        return {thread.ident: thread.name for thread in threads
+                if thread is not None and thread is not self and thread.ident}
+
+    def run(self):
+        started = time.perf_counter()
+        stacks = self.stacks
+        while not self.stop_event.wait(self.interval_sec):
+            targets = self._targets()
+            frames = sys._current_frames()
+            for ident, name in targets.items():
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                stack.append(name)
+                # Keyed by code objects, root first; labels are only built when writing.
+                key = tuple(reversed(stack))
+                stacks[key] = stacks.get(key, 0) + 1
+            del frames
+            self.ticks += 1
+        self.elapsed_sec = time.perf_counter() - started
+
+    def stop(self):
+        self.stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def collapsed(self):
+        lines = {}
+        for stack, count in self.stacks.items():
+            line = ";".join([stack[0]] + [_label(code) for code in stack[1:]])
+            lines[line] = lines.get(line, 0) + count
+        return "".join(f"{line} {count}\n" for line, count in sorted(lines.items()))
+
+    def function_stats(self):
+        # (label, self samples, total samples), hottest self time first.
+        self_counts = {}
+        total_counts = {}
+        for stack, count in self.stacks.items():
+            leaf = _label(stack[-1])
+            self_counts[leaf] = self_counts.get(leaf, 0) + count
+            for label in {_label(code) for code in stack[1:]}:
+                total_counts[label] = total_counts.get(label, 0) + count
+        rows = [(label, self_counts.get(label, 0), total) for label, total in total_counts.items()]
+        rows.sort(key=lambda row: (-row[1], -row[2], row[0]))
+        return rows
+
+    def report(self):
+        samples = sum(self.stacks.values())
+        share = 100 / max(1, samples)
+        threads = sorted({stack[0] for stack in self.stacks})
+        lines = [
+            f"{samples} samples from {self.ticks} ticks every {self.interval_sec * 1000:g} ms "
+            f"over {self.elapsed_sec:.1f} s; threads: {', '.join(threads) or 'none'}",
+            f"{'self':>8} {'self%':>7} {'total':>8} {'total%':>7}  function",
+        ]
+        for label, self_count, total in self.function_stats():
+            lines.append(f"{self_count:>8} {self_count * share:>6.1f}% {total:>8} {total * share:>6.1f}%  {label}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, prefix=DEFAULT_PROFILE_PREFIX):
+        # prefix.txt holds per-function aggregates; prefix.collapsed feeds flamegraph.pl or speedscope.
+        try:
+            write_atomic(f"{prefix}.txt", self.report())
+            write_atomic(f"{prefix}.collapsed", self.collapsed())
+            print(f"Profile written to {prefix}.txt and {prefix}.collapsed")
+        except OSError as exc:
+            print(f"Profile write failed: {exc}")
+
+
+def start_profiler(threads=None, interval_ms=DEFAULT_PROFILE_INTERVAL_MS):
+    profiler = SamplingProfiler(interval_ms, threads)
+    profiler.start()
+    return profiler
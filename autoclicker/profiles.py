@@ -0,0 +1,89 @@
+import json
+import os
+from urllib.parse import quote, unquote
+
+from .config import write_atomic
+
+DEFAULT_PROFILE_DIR = "autoclicker_profiles"
+PROFILE_SUFFIX = ".json"
+
+
+class ProfileStore:
+    # Named setting overrides, one file each. Opening the store only lists
+    # the directory; a profile's file is read the first time it is used, so
+    # startup stays flat however many profiles there are. With a saver,
+    # writes are debounced and atomic; without one they happen immediately.
+    def __init__(self, directory=DEFAULT_PROFILE_DIR, saver=None):
+        self.directory = directory
+        self.saver = saver
+        self.cache = {}
+        self._names = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, quote(name, safe=" -_") + PROFILE_SUFFIX)
+
+    def names(self):
+        if self._names is None:
+            self._names = set()
+            try:
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(PROFILE_SUFFIX) and entry.is_file():
+                            self._names.add(unquote(entry.name[:-len(PROFILE_SUFFIX)]))
+            except FileNotFoundError:
+                pass
+        return sorted(self._names)
+
+    def __contains__(self, name):
+        self.names()
+        return name in self._names
+
+    def __len__(self):
+        return len(self.names())
+
+    def get(self, name):
+        if name in self.cache:
+            return self.cache[name]
+        if name not in self:
+            raise KeyError(f"unknown profile: {name}")
+        path = self._path(name)
+        try:
+            with open(path, "r") as handle:
+                overrides = json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise KeyError(f"unreadable profile: {name} ({exc})")
+        if not isinstance(overrides, dict):
+            raise KeyError(f"profile {name} is not an object")
+        if self.saver:
+            self.saver.remember(path, overrides)
+        self.cache[name] = overrides
+        return overrides
+
+    def put(self, name, overrides):
+        if not name:
+            raise ValueError("profile name must not be empty")
+        overrides = dict(overrides)
+        if self.cache.get(name) == overrides:
+            return
+        self.names()
+        self._names.add(name)
+        self.cache[name] = overrides
+        self._save(name, overrides)
+
+    def delete(self, name):
+        if name not in self:
+            raise KeyError(f"unknown profile: {name}")
+        self._names.discard(name)
+        self.cache.pop(name, None)
+        self._save(name, None)
+
+    def _save(self, name, overrides):
+        path = self._path(name)
+        if self.saver:
+            os.makedirs(self.directory, exist_ok=True)
+            self.saver.schedule(path, overrides)
+        elif overrides is None:
+            os.remove(path)
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            write_atomic(path, json.dumps(overrides))
@@ -0,0 +1,171 @@
+import datetime
+import heapq
+import itertools
+import re
+import threading
+import time
+
+# Caps a single wait so a suspend that the monotonic clock doesn't count is still noticed.
+MAX_WAIT_SEC = 300.0
+CLOCK_JUMP_TOLERANCE_SEC = 2.0
+SECONDS_PER_DAY = 24 * 60 * 60
+DURATION_UNITS = {"s": 1, "m": 60, "h": 60 * 60, "d": SECONDS_PER_DAY}
+DURATION_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+
+
+def parse_duration(value):
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = DURATION_PATTERN.match(str(value))
+        if not match:
+            raise ValueError(f"invalid duration: {value}")
+        seconds = float(match.group(1)) * DURATION_UNITS[match.group(2) or "s"]
+    if seconds <= 0:
+        raise ValueError(f"duration must be positive: {value}")
+    return seconds
+
+
+def parse_time_of_day(value):
+    hours, minutes = str(value).strip().split(":")
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"invalid time of day: {value}")
+    return datetime.time(hours, minutes)
+
+
+def _at(day, time_of_day):
+    return datetime.datetime.combine(day, time_of_day).timestamp()
+
+
+class ScheduledSession:
+    def __init__(self, name, profile=None, start=None, end=None, every=None, duration=None, cps=None):
+        self.name = name
+        self.profile = profile
+        self.cps = cps
+        self.every_sec = parse_duration(every) if every is not None else None
+        self.start = parse_time_of_day(start) if start is not None else datetime.time(0, 0)
+        if self.every_sec:
+            self.duration_sec = parse_duration(duration) if duration is not None else None
+            if self.duration_sec is None or self.duration_sec > self.every_sec:
+                raise ValueError(f"{name}: duration must be set and no longer than the repeat period")
+        else:
+            if start is None or end is None:
+                raise ValueError(f"{name}: daily sessions need start and end")
+            start_sec = self.start.hour * 3600 + self.start.minute * 60
+            end_time = parse_time_of_day(end)
+            end_sec = end_time.hour * 3600 + end_time.minute * 60
+            self.duration_sec = (end_sec - start_sec) % SECONDS_PER_DAY or SECONDS_PER_DAY
+
+    def window_at(self, now):
+        # Returns the (start, end) window containing `now`, else the next one.
+        today = datetime.date.fromtimestamp(now)
+        if self.every_sec:
+            # Repeats restart from `start` each day; a window running into the
+            # next day's start is cut short there.
+            for offset in (-1, 0, 1):
+                day = today + datetime.timedelta(days=offset)
+                first = _at(day, self.start)
+                next_first = _at(day + datetime.timedelta(days=1), self.start)
+                if now >= next_first:
+                    continue
+                start = first + max(0, int((now - first) // self.every_sec)) * self.every_sec
+                if now >= min(start + self.duration_sec, next_first):
+                    start += self.every_sec
+                if start < next_first:
+                    return start, min(start + self.duration_sec, next_first)
+                following = _at(day + datetime.timedelta(days=2), self.start)
+                return next_first, min(next_first + self.duration_sec, following)
+        for offset in (-1, 0, 1):
+            start = _at(today + datetime.timedelta(days=offset), self.start)
+            end = start + self.duration_sec
+            if now < end:
+                return start, end
+        start = _at(today + datetime.timedelta(days=2), self.start)
+        return start, start + self.duration_sec
+
+
+def parse_schedule(entries):
+    sessions = []
+    for i, entry in enumerate(entries or []):
+        sessions.append(ScheduledSession(
+            name=entry.get("name") or f"session {i + 1}",
+            profile=entry.get("profile"),
+            start=entry.get("start"),
+            end=entry.get("end"),
+            every=entry.get("every"),
+            duration=entry.get("duration"),
+            cps=entry.get("cps"),
+        ))
+    return sessions
+
+
+class SessionScheduler(threading.Thread):
+    def __init__(self, sessions, on_start, on_stop, wall_clock=None, monotonic=None):
+        super().__init__(daemon=True)
+        self.sessions = list(sessions)
+        self.on_start = on_start
+        self.on_stop = on_stop
+        self.wall = wall_clock if wall_clock else time.time
+        self.monotonic = monotonic if monotonic else time.monotonic
+        self.wake = threading.Event()
+        self.stopped = False
+        self.active = set()
+        self.heap = []
+        self.counter = itertools.count()
+
+    def _push(self, when, session):
+        heapq.heappush(self.heap, (when, next(self.counter), session))
+
+    def _reconcile(self, session, now):
+        start, end = session.window_at(now)
+        if start <= now < end:
+            if session not in self.active:
+                self.active.add(session)
+                self.on_start(session)
+            self._push(end, session)
+        else:
+            if session in self.active:
+                self.active.discard(session)
+                self.on_stop(session)
+            self._push(start, session)
+
+    def rebuild(self):
+        now = self.wall()
+        self.heap = []
+        for session in self.sessions:
+            self._reconcile(session, now)
+
+    def fire_due(self):
+        now = self.wall()
+        while self.heap and self.heap[0][0] <= now:
+            _, _, session = heapq.heappop(self.heap)
+            self._reconcile(session, now)
+
+    def next_timeout(self):
+        if not self.heap:
+            return MAX_WAIT_SEC
+        return min(MAX_WAIT_SEC, max(0.0, self.heap[0][0] - self.wall()))
+
+    def run(self):
+        self.rebuild()
+        while not self.stopped:
+            timeout = self.next_timeout()
+            wall_before, mono_before = self.wall(), self.monotonic()
+            self.wake.wait(timeout)
+            self.wake.clear()
+            if self.stopped:
+                break
+            drift = (self.wall() - wall_before) - (self.monotonic() - mono_before)
+            if abs(drift) > CLOCK_JUMP_TOLERANCE_SEC:
+                # Suspend/resume or a wall-clock step: every deadline may be stale.
+                self.rebuild()
+            else:
+                self.fire_due()
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
+        for session in list(self.active):
+            self.active.discard(session)
+            self.on_stop(session)
@@ -0,0 +1,372 @@
+import math
+import re
+
+from pynput.mouse import Button
+
+from .keys import parse_key_combo
+from .metrics import click_slot
+
+# Every instruction is STRIDE slots wide in one flat list: opcode, operand, operand.
+STRIDE = 3
+OP_END = 0
+OP_CLICK = 1
+OP_CLICK_HOLD = 2
+OP_WAIT = 3
+OP_WAIT_UNIFORM = 4
+OP_WAIT_EXP = 5
+OP_MOVE = 6
+OP_MOVE_OFFSET = 7
+OP_HERE = 8
+OP_LOOP = 9
+OP_NEXT = 10
+OP_JUMP = 11
+OP_KEY = 12
+OP_KEY_HOLD = 13
+OP_HERE_OFFSET = 14
+WAIT_OPS = (OP_WAIT, OP_WAIT_UNIFORM, OP_WAIT_EXP)
+CLICK_OPS = (OP_CLICK, OP_CLICK_HOLD)
+POSITION_OPS = (OP_MOVE, OP_MOVE_OFFSET, OP_HERE, OP_HERE_OFFSET)
+
+US_PER_MS = 1000
+US_PER_SEC = 1_000_000
+MIN_INTERVAL_US = 1
+WAIT_UNITS_US = {None: US_PER_MS, "ms": US_PER_MS, "s": US_PER_SEC, "us": 1}
+CLICK_VERBS = {
+    "click": (Button.left, 1),
+    "double-click": (Button.left, 2),
+    "right-click": (Button.right, 1),
+    "double-right-click": (Button.right, 2),
+}
+STATEMENT_SEPARATORS = re.compile(r"[,;\n]")
+WAIT_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)(?:-(\d+(?:\.\d+)?))?(us|ms|s)?$")
+REPEAT_PATTERN = re.compile(r"^x(\d+)$")
+
+
+def _normalize(source):
+    if isinstance(source, (list, tuple)):
+        source = "\n".join(source)
+    return source.replace("×", "x").replace("–", "-").replace("—", "-")
+
+
+def _number(token, label):
+    try:
+        return int(token)
+    except ValueError:
+        raise ValueError(f"{label}: expected a number, got '{token}'") from None
+
+
+def _parse_click(verb, args, points, label):
+    button, count = CLICK_VERBS[verb]
+    repeat = 1
+    if args and REPEAT_PATTERN.match(args[-1].lower()):
+        repeat = int(args.pop()[1:])
+        if repeat < 1:
+            raise ValueError(f"{label}: repeat count must be at least 1")
+    if not args:
+        target = None
+    elif len(args) == 1:
+        if args[0] not in points:
+            raise ValueError(f"{label}: unknown point '{args[0]}'")
+        target = points[args[0]]
+    elif len(args) == 2:
+        target = (_number(args[0], label), _number(args[1], label))
+    else:
+        raise ValueError(f"{label}: expected a point name or X Y")
+    return ("click", button, count, target, repeat)
+
+
+def _parse_press(args, label):
+    repeat = 1
+    if len(args) == 2 and REPEAT_PATTERN.match(args[-1].lower()):
+        repeat = int(args.pop()[1:])
+        if repeat < 1:
+            raise ValueError(f"{label}: repeat count must be at least 1")
+    if len(args) != 1:
+        raise ValueError(f"{label}: expected 'press KEY [xN]'")
+    try:
+        combo = parse_key_combo(args[0])
+    except ValueError as exc:
+        raise ValueError(f"{label}: {exc}") from None
+    return ("press", combo, repeat)
+
+
+def _parse_wait(args, label):
+    match = WAIT_PATTERN.match("".join(args).lower())
+    if not match:
+        raise ValueError(f"{label}: expected 'wait N[-M] [us|ms|s]'")
+    scale = WAIT_UNITS_US[match.group(3)]
+    low_us = round(float(match.group(1)) * scale)
+    high_us = round(float(match.group(2)) * scale) if match.group(2) else low_us
+    if high_us < low_us:
+        raise ValueError(f"{label}: wait range must go from low to high")
+    return ("wait", low_us, high_us)
+
+
+def _close_block(stack):
+    count, body = stack.pop()
+    parent = stack[-1][1]
+    if not body:
+        # "..., repeat 50" with nothing after it repeats what came before.
+        body = parent[:]
+        parent.clear()
+    parent.append(("repeat", count, body))
+
+
+def parse_script(source):
+    points = {}
+    stack = [(None, [])]
+    lines = _normalize(source).split("\n")
+    for line_no, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0]
+        for statement in STATEMENT_SEPARATORS.split(line):
+            tokens = statement.split()
+            if not tokens:
+                continue
+            label = f"line {line_no}"
+            verb, args = tokens[0].lower(), tokens[1:]
+            if verb == "point":
+                if len(args) != 3:
+                    raise ValueError(f"{label}: expected 'point NAME X Y'")
+                points[args[0]] = (_number(args[1], label), _number(args[2], label))
+            elif verb in CLICK_VERBS:
+                stack[-1][1].append(_parse_click(verb, args, points, label))
+            elif verb == "press":
+                stack[-1][1].append(_parse_press(args, label))
+            elif verb == "wait":
+                stack[-1][1].append(_parse_wait(args, label))
+            elif verb == "repeat":
+                if len(args) > 1:
+                    raise ValueError(f"{label}: expected 'repeat [N]'")
+                count = _number(args[0], label) if args else 0
+                if args and count < 0:
+                    raise ValueError(f"{label}: repeat count must not be negative")
+                stack.append((count if args else None, []))
+            elif verb == "end":
+                if len(stack) == 1:
+                    raise ValueError(f"{label}: 'end' without 'repeat'")
+                _close_block(stack)
+            else:
+                raise ValueError(f"{label}: unknown command '{tokens[0]}'")
+    while len(stack) > 1:
+        _close_block(stack)
+    return stack[0][1]
+
+
+class Program:
+    def __init__(self, code, counter_slots):
+        self.code = code
+        self.counter_slots = counter_slots
+
+    def __len__(self):
+        return len(self.code) // STRIDE
+
+
+class _Compiler:
+    # The instruction layout depends only on the script, never on the
+    # interval, hold or offset settings, so a session that switches them can
+    # recompile and carry on from the same pc.
+    def __init__(self, interval_wait, hold, offset):
+        self.code = []
+        self.interval_wait = interval_wait
+        self.click_op = OP_CLICK_HOLD if hold else OP_CLICK
+        self.key_op = OP_KEY_HOLD if hold else OP_KEY
+        self.move_op = OP_MOVE_OFFSET if offset else OP_MOVE
+        self.here_op = OP_HERE_OFFSET if offset else OP_HERE
+        self.depth = 0
+        self.counter_slots = 0
+
+    def emit(self, op, a=0, b=0):
+        self.code.extend((op, a, b))
+
+    def loop(self, count, emit_body):
+        # Counts known at compile time: 0 drops the body, 1 inlines it.
+        if count == 0:
+            return
+        if count == 1:
+            emit_body()
+            return
+        slot = self.depth
+        self.depth += 1
+        self.counter_slots = max(self.counter_slots, self.depth)
+        if count is not None:
+            self.emit(OP_LOOP, slot, count)
+        start = len(self.code)
+        emit_body()
+        if count is None:
+            if not any(op in WAIT_OPS for op in self.code[start::STRIDE]):
+                # An endless loop without a wait would spin and click unpaced.
+                self.emit(*self.interval_wait)
+            self.emit(OP_JUMP, start)
+        else:
+            self.emit(OP_NEXT, slot, start)
+        self.depth -= 1
+
+    def position(self, target):
+        if target is None:
+            self.emit(self.here_op)
+        else:
+            self.emit(self.move_op, target[0], target[1])
+
+    def click(self, button, count, target, repeat):
+        self.position(target)
+        self.emit(self.click_op, button, count)
+        if repeat == 1:
+            return
+
+        def body():
+            self.emit(*self.interval_wait)
+            self.position(target)
+            self.emit(self.click_op, button, count)
+
+        self.loop(repeat - 1, body)
+
+    def press(self, combo, repeat):
+        self.emit(self.key_op, combo)
+        if repeat == 1:
+            return
+
+        def body():
+            self.emit(*self.interval_wait)
+            self.emit(self.key_op, combo)
+
+        self.loop(repeat - 1, body)
+
+    def wait(self, low_us, high_us):
+        if high_us <= 0:
+            return
+        if high_us == low_us:
+            self.emit(OP_WAIT, low_us / US_PER_SEC)
+        else:
+            self.emit(OP_WAIT_UNIFORM, low_us / US_PER_SEC, (high_us - low_us) / US_PER_SEC)
+
+    def block(self, statements):
+        for statement in statements:
+            kind = statement[0]
+            if kind == "click":
+                self.click(*statement[1:])
+            elif kind == "press":
+                self.press(*statement[1:])
+            elif kind == "wait":
+                self.wait(*statement[1:])
+            else:
+                _, count, body = statement
+                self.loop(count, lambda body=body: self.block(body))
+
+
+def interval_wait(interval_mode, interval_us, random_interval_us, exp_mean_interval_us):
+    if interval_mode == "Exponential":
+        return OP_WAIT_EXP, max(MIN_INTERVAL_US, exp_mean_interval_us) / US_PER_SEC
+    if random_interval_us > 0:
+        return OP_WAIT_UNIFORM, max(MIN_INTERVAL_US, interval_us) / US_PER_SEC, random_interval_us / US_PER_SEC
+    return OP_WAIT, max(MIN_INTERVAL_US, interval_us) / US_PER_SEC
+
+
+def compile_script(script, interval=(OP_WAIT, MIN_INTERVAL_US / US_PER_SEC), hold=False, offset=False):
+    # Accepts source text (or a list of lines) as well as parse_script() output.
+    statements = script
+    if isinstance(script, str) or (script and isinstance(script[0], str)):
+        statements = parse_script(script)
+    compiler = _Compiler(interval, hold, offset)
+    compiler.block(statements)
+    compiler.emit(OP_END)
+    return Program(compiler.code, compiler.counter_slots)
+
+
+def run_program(program, clicker):
+    # Returns True when the script ran to its end or hit the click limit,
+    # False when clicking was stopped or paused from outside or parameters
+    # were switched. Then the position is kept in clicker.program_state, so
+    # the next call carries on from there.
+    code = program.code
+    if clicker.program_state:
+        pc, counters, x, y = clicker.program_state
+    else:
+        pc, counters, x, y = 0, [0] * program.counter_slots, 0, 0
+    sleep = clicker.sleep
+    random = clicker.streams.interval.random
+    log = math.log
+    stats = clicker.stats
+    metrics = clicker.metrics
+    limit = clicker.click_limit
+    cursor_position = clicker._cursor_position
+    click_button = clicker._click_button
+    hold_click = clicker._hold_click
+    tap_key = clicker._tap_key
+    hold_key = clicker._hold_key
+    offset_position = clicker._offset_position
+    move_cursor = clicker._move_cursor
+    while clicker.running and clicker.pending_params is None:
+        op = code[pc]
+        if op == OP_CLICK or op == OP_CLICK_HOLD:
+            count = code[pc + 2]
+            if op == OP_CLICK:
+                click_button(code[pc + 1], x, y, count)
+            else:
+                hold_click(code[pc + 1], x, y, count)
+            clicker.click_count += count
+            if stats:
+                stats.record_click_count(clicker.click_count)
+            if metrics:
+                button = "left" if code[pc + 1] == Button.left else "right"
+                metrics.record_click(click_slot(button, "double" if count == 2 else "single"))
+            if limit > 0 and clicker.click_count >= limit:
+                return True
+        elif op == OP_WAIT:
+            sleep(code[pc + 1])
+        elif op == OP_KEY or op == OP_KEY_HOLD:
+            if op == OP_KEY:
+                tap_key(code[pc + 1])
+            else:
+                hold_key(code[pc + 1])
+            clicker.click_count += 1
+            if stats:
+                stats.record_click_count(clicker.click_count)
+            if metrics:
+                metrics.record_click(click_slot("key", "single"))
+            if limit > 0 and clicker.click_count >= limit:
+                return True
+        elif op == OP_MOVE:
+            x = code[pc + 1]
+            y = code[pc + 2]
+            move_cursor(x, y)
+        elif op == OP_NEXT:
+            slot = code[pc + 1]
+            counters[slot] -= 1
+            if counters[slot] > 0:
+                pc = code[pc + 2]
+                continue
+        elif op == OP_WAIT_UNIFORM:
+            sleep(code[pc + 1] + random() * code[pc + 2])
+        elif op == OP_WAIT_EXP:
+            sleep(-log(1.0 - random()) * code[pc + 1])
+        elif op == OP_MOVE_OFFSET:
+            x, y = offset_position(code[pc + 1], code[pc + 2])
+            move_cursor(x, y)
+        elif op == OP_HERE:
+            x, y = cursor_position()
+        elif op == OP_HERE_OFFSET:
+            x, y = offset_position(*cursor_position())
+            move_cursor(x, y)
+        elif op == OP_LOOP:
+            counters[code[pc + 1]] = code[pc + 2]
+        elif op == OP_JUMP:
+            pc = code[pc + 1]
+            continue
+        else:
+            return True
+        pc += STRIDE
+    if code[pc] in CLICK_OPS and pc >= STRIDE and code[pc - STRIDE] in POSITION_OPS:
+        # The cursor may have moved meanwhile; position again before the click.
+        pc -= STRIDE
+    clicker.program_state = pc, counters, x, y
+    return False
+
+
+def script_from_config(value):
+    if not value:
+        return None
+    try:
+        return parse_script(value)
+    except (TypeError, ValueError) as exc:
+        print(f"Invalid click script: {exc}")
+        return None
@@ -0,0 +1,405 @@
+import threading
+import time
+
+from .config import migrate_config, read_config
+from .control import start_control_server
+from .core import (
+    AutoClicker,
+    US_PER_SEC,
+    SWITCHABLE_PARAMS,
+    DEFAULT_INTERVAL_US,
+    DEFAULT_RANDOM_INTERVAL_US,
+    DEFAULT_EXP_MEAN_INTERVAL_US,
+    DEFAULT_HOLD_TIME_ENABLED,
+    DEFAULT_HOLD_TIME_MEAN_US,
+    DEFAULT_HOLD_TIME_STD_US,
+    DEFAULT_DRIFT_ENABLED,
+    DEFAULT_DRIFT_STEP_MIN,
+    DEFAULT_DRIFT_STEP_MAX,
+    DEFAULT_DRIFT_RESET_MIN,
+    DEFAULT_DRIFT_RESET_MAX,
+    DEFAULT_THINKING_PAUSE_ENABLED,
+    DEFAULT_THINKING_PAUSE_MEAN_US,
+    DEFAULT_THINKING_PAUSE_STD_US,
+    DEFAULT_THINKING_PAUSE_MIN_CLICKS,
+    DEFAULT_THINKING_PAUSE_MAX_CLICKS,
+    DEFAULT_FATIGUE_ENABLED,
+    DEFAULT_FATIGUE_THRESHOLD_INTERVAL_US,
+    DEFAULT_FATIGUE_DURATION_US,
+    DEFAULT_FATIGUE_COOLDOWN_DURATION_US,
+    DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_US,
+    coerce_bool,
+    get_foreground_window_handle,
+    get_window_at_point,
+    safe_int,
+)
+from .backends import backend_from_config
+from .keys import key_sequence_from_config
+from .locate import template_locator_from_config
+from .metrics import metrics_from_config
+from .pixel import pixel_condition_from_config
+from .process import ProcessClicker
+from .profiler import start_profiler
+from .profiles import ProfileStore
+from .schedule import SessionScheduler, parse_schedule
+from .script import script_from_config
+from .trace import tracer_from_config
+from .streams import seed_from_config
+from .takeover import takeover_from_config
+from .verify import verifier_from_config
+from .tuning import normalize_tuning
+
+DEFAULT_REPEAT_LIMIT = 100
+DEFAULT_POS = 500
+DEFAULT_OFFSET = 15
+HEADLESS_STATUS_INTERVAL_SEC = 0.2
+ENGINE_JOIN_TIMEOUT_SEC = 2.0
+
+
+def resolve_profile(config, name, store=None):
+    # Profiles inline in the config win over ones in the profile store.
+    if not name:
+        return dict(config)
+    profiles = config.get("profiles") or {}
+    if name in profiles:
+        overrides = profiles[name]
+    elif store is not None and name in store:
+        overrides = store.get(name)
+    else:
+        raise KeyError(f"unknown profile: {name}")
+    merged = dict(config)
+    merged.update(migrate_config(overrides))
+    return merged
+
+
+def apply_cps(config, cps):
+    if not cps:
+        return config
+    interval_us = max(1, safe_int(US_PER_SEC / float(cps), DEFAULT_INTERVAL_US))
+    config = dict(config)
+    config["interval_us"] = interval_us
+    config["exp_mean_interval_us"] = interval_us
+    return config
+
+
+def _int_field(config, key, default, minimum=None, strict=True):
+    # A missing key takes the default. A present value must be a finite
+    # number no smaller than minimum; strict=False is for fields the session
+    # won't use, where anything invalid quietly takes the default.
+    value = config.get(key)
+    if value is None:
+        return default
+    number = safe_int(value, None)
+    if number is not None and (minimum is None or number >= minimum):
+        return number
+    if not strict:
+        return default
+    name = key.removesuffix("_us").removesuffix("_px").replace("_", " ")
+    if number is None:
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    raise ValueError(f"{name} must be {'positive' if minimum else 'non-negative'}")
+
+
+def engine_kwargs_from_config(config):
+    config = migrate_config(config)
+    timing_mode = config.get("timing_model", "Exponential")
+    if timing_mode not in ("Uniform", "Exponential"):
+        timing_mode = "Exponential"
+    button = str(config.get("button", "Left")).capitalize()
+    click_type = str(config.get("click_type", "Single")).capitalize()
+    uniform = timing_mode == "Uniform"
+    click_limit = 0
+    if config.get("repeat_mode", "infinite") == "limit":
+        click_limit = _int_field(config, "repeat_limit", DEFAULT_REPEAT_LIMIT, minimum=1)
+    target_pos = None
+    if not coerce_bool(config.get("use_current_pos", False)):
+        target_pos = (_int_field(config, "pos_x", DEFAULT_POS), _int_field(config, "pos_y", DEFAULT_POS))
+
+    human_enabled = coerce_bool(config.get("human_like", True))
+    hold_time_enabled = human_enabled and coerce_bool(config.get("hold_time_enabled", DEFAULT_HOLD_TIME_ENABLED))
+    drift_enabled = human_enabled and coerce_bool(config.get("drift_enabled", DEFAULT_DRIFT_ENABLED))
+    thinking_pause_enabled = human_enabled and coerce_bool(config.get("thinking_pause_enabled", DEFAULT_THINKING_PAUSE_ENABLED))
+    fatigue_enabled = human_enabled and coerce_bool(config.get("fatigue_enabled", DEFAULT_FATIGUE_ENABLED))
+
+    drift_step_min = _int_field(config, "drift_step_min_px", DEFAULT_DRIFT_STEP_MIN, strict=drift_enabled)
+    drift_step_max = _int_field(config, "drift_step_max_px", DEFAULT_DRIFT_STEP_MAX, strict=drift_enabled)
+    drift_reset_min = _int_field(config, "drift_reset_min_px", DEFAULT_DRIFT_RESET_MIN, strict=drift_enabled)
+    drift_reset_max = _int_field(config, "drift_reset_max_px", DEFAULT_DRIFT_RESET_MAX, strict=drift_enabled)
+    if drift_step_min > drift_step_max or drift_reset_min > drift_reset_max:
+        raise ValueError("drift min must not exceed max")
+    thinking_pause_min_clicks = _int_field(config, "thinking_pause_min_clicks", DEFAULT_THINKING_PAUSE_MIN_CLICKS,
+                                           minimum=1, strict=thinking_pause_enabled)
+    thinking_pause_max_clicks = _int_field(config, "thinking_pause_max_clicks", DEFAULT_THINKING_PAUSE_MAX_CLICKS,
+                                           minimum=1, strict=thinking_pause_enabled)
+    if thinking_pause_max_clicks < thinking_pause_min_clicks:
+        raise ValueError("thinking pause max clicks must not be below min")
+
+    kwargs = {
+        "interval_us": _int_field(config, "interval_us", DEFAULT_INTERVAL_US, minimum=1, strict=uniform),
+        "random_interval_us": _int_field(config, "random_interval_us", DEFAULT_RANDOM_INTERVAL_US, minimum=0,
+                                         strict=uniform),
+        "click_type": click_type if click_type in ("Single", "Double") else "Single",
+        "button": button if button in ("Left", "Right") else "Left",
+        "interval_mode": timing_mode,
+        "exp_mean_interval_us": _int_field(config, "exp_mean_interval_us", DEFAULT_EXP_MEAN_INTERVAL_US, minimum=1,
+                                           strict=not uniform),
+        "target_pos": target_pos,
+        "random_pos_offset": (safe_int(config.get("offset_x"), DEFAULT_OFFSET), safe_int(config.get("offset_y"), DEFAULT_OFFSET)),
+        "click_limit": click_limit,
+        "human_like": human_enabled,
+        "hold_time_enabled": hold_time_enabled,
+        "hold_time_mean_us": _int_field(config, "hold_time_mean_us", DEFAULT_HOLD_TIME_MEAN_US, minimum=1,
+                                        strict=hold_time_enabled),
+        "hold_time_std_us": _int_field(config, "hold_time_std_us", DEFAULT_HOLD_TIME_STD_US, minimum=0,
+                                       strict=hold_time_enabled),
+        "drift_enabled": drift_enabled,
+        "drift_step_min": drift_step_min,
+        "drift_step_max": drift_step_max,
+        "drift_reset_min": drift_reset_min,
+        "drift_reset_max": drift_reset_max,
+        "thinking_pause_enabled": thinking_pause_enabled,
+        "thinking_pause_mean_us": _int_field(config, "thinking_pause_mean_us", DEFAULT_THINKING_PAUSE_MEAN_US, minimum=1,
+                                             strict=thinking_pause_enabled),
+        "thinking_pause_std_us": _int_field(config, "thinking_pause_std_us", DEFAULT_THINKING_PAUSE_STD_US, minimum=0,
+                                            strict=thinking_pause_enabled),
+        "thinking_pause_min_clicks": thinking_pause_min_clicks,
+        "thinking_pause_max_clicks": thinking_pause_max_clicks,
+        "fatigue_enabled": fatigue_enabled,
+        "fatigue_threshold_interval_us": _int_field(config, "fatigue_threshold_interval_us",
+                                                    DEFAULT_FATIGUE_THRESHOLD_INTERVAL_US, minimum=1,
+                                                    strict=fatigue_enabled),
+        "fatigue_duration_us": _int_field(config, "fatigue_duration_us", DEFAULT_FATIGUE_DURATION_US, minimum=1,
+                                          strict=fatigue_enabled),
+        "fatigue_cooldown_duration_us": _int_field(config, "fatigue_cooldown_duration_us",
+                                                   DEFAULT_FATIGUE_COOLDOWN_DURATION_US, minimum=1,
+                                                   strict=fatigue_enabled),
+        "fatigue_cooldown_min_interval_us": _int_field(config, "fatigue_cooldown_min_interval_us",
+                                                       DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_US, minimum=1,
+                                                       strict=fatigue_enabled),
+        "pixel_condition": pixel_condition_from_config(config.get("pixel_condition")),
+        "target_locator": template_locator_from_config(config.get("template_target")),
+        "script": script_from_config(config.get("script")),
+        "keys": key_sequence_from_config(config.get("keys")),
+        "tracer": tracer_from_config(config.get("trace")),
+        "backend": backend_from_config(config.get("input_backend")),
+        "cursor_cache": coerce_bool(config.get("cursor_cache", True)),
+        "specialize": coerce_bool(config.get("specialize", True)),
+        "verifier": verifier_from_config(config.get("verify_injection")),
+        "takeover": takeover_from_config(config.get("auto_pause"), app_hotkeys(config)),
+        "seed": seed_from_config(config.get("seed")),
+    }
+    if coerce_bool(config.get("background_click_enabled", False)):
+        if target_pos is None:
+            raise ValueError("background clicking needs a fixed position")
+        handle = get_window_at_point(*target_pos) or get_foreground_window_handle()
+        if not handle:
+            raise ValueError("unable to detect a target window")
+        kwargs["background_click_enabled"] = True
+        kwargs["background_click_handle"] = handle
+    kwargs.update(normalize_tuning(config))
+    return kwargs
+
+
+# Config keys that build engine objects; a switch can't change them, so
+# snapshots skip building them.
+SNAPSHOT_SKIPPED_KEYS = ("pixel_condition", "template_target", "script", "keys", "trace", "input_backend",
+                         "background_click_enabled", "verify_injection", "auto_pause")
+
+
+def profile_snapshot(config, name, store=None):
+    # Parsed and validated once, so a switch is just handing the dict over.
+    config = {key: value for key, value in resolve_profile(config, name, store).items()
+              if key not in SNAPSHOT_SKIPPED_KEYS}
+    kwargs = engine_kwargs_from_config(config)
+    return {key: kwargs[key] for key in SWITCHABLE_PARAMS}
+
+
+def profile_hotkeys_from_config(value):
+    # {"F9": "A", ...} -> {key: profile}; None when missing or invalid.
+    if not value:
+        return None
+    if not isinstance(value, dict) or not all(isinstance(key, str) and isinstance(name, str)
+                                              for key, name in value.items()):
+        print("Invalid profile_hotkeys: expected an object of key -> profile name")
+        return None
+    return {key.upper(): name for key, name in value.items()}
+
+
+def app_hotkeys(config):
+    # Names of the keys the app itself listens for.
+    names = [config.get("hotkey_start"), config.get("hotkey_pick")]
+    profile_hotkeys = config.get("profile_hotkeys")
+    if isinstance(profile_hotkeys, dict):
+        names += list(profile_hotkeys)
+    return {name.upper() for name in names if isinstance(name, str) and name}
+
+
+def profile_snapshots(config, names, store=None):
+    snapshots = {}
+    for name in names:
+        try:
+            snapshots[name] = profile_snapshot(config, name, store)
+        except (KeyError, ValueError) as exc:
+            print(f"Profile '{name}' can't be switched to: {exc}")
+    return snapshots
+
+
+class HeadlessSession:
+    def __init__(self, engine_factory=None, metrics=None):
+        self.engine_factory = engine_factory
+        self.metrics = metrics
+        self.engine = None
+        self.label = None
+
+    def is_clicking(self):
+        return bool(self.engine and (self.engine.running or self.engine.paused))
+
+    def start(self, config, label=None):
+        kwargs = engine_kwargs_from_config(config)
+        if self.metrics:
+            kwargs["metrics"] = self.metrics
+        self.stop()
+        factory = self.engine_factory
+        if factory is None:
+            factory = ProcessClicker if coerce_bool(config.get("engine_process", False)) else AutoClicker
+        self.engine = factory(**kwargs)
+        self.engine.daemon = True
+        self.engine.start()
+        self.engine.start_clicking()
+        self.label = label
+
+    def stop(self):
+        if self.engine:
+            self.engine.exit()
+            if self.metrics:
+                # Metrics outlive the engine; let it finish its last write first.
+                self.engine.join(ENGINE_JOIN_TIMEOUT_SEC)
+            self.engine = None
+            self.label = None
+
+    def stats(self):
+        engine = self.engine
+        if not engine:
+            return {"running": False, "paused": False, "click_count": 0, "click_limit": 0, "label": None,
+                    "seed": None}
+        return {
+            "running": bool(engine.running),
+            "paused": bool(engine.paused),
+            "click_count": engine.click_count,
+            "click_limit": engine.click_limit,
+            "label": self.label,
+            "seed": getattr(engine, "seed", None),
+        }
+
+
+class SessionController:
+    # Control-server and scheduler entry points for a headless session.
+    def __init__(self, config, session=None, store=None):
+        self.config = dict(config)
+        self.session = session if session else HeadlessSession()
+        self.store = store
+        self.lock = threading.Lock()
+
+    def start(self, profile=None, cps=None, label=None):
+        with self.lock:
+            config = apply_cps(resolve_profile(self.config, profile, self.store), cps)
+            self.session.start(config, label=label or profile)
+
+    def stop(self, label=None):
+        with self.lock:
+            if label is None or self.session.label == label:
+                self.session.stop()
+
+    def configure(self, updates):
+        with self.lock:
+            self.config.update(migrate_config(updates))
+
+    def save_profile(self, name, settings=None):
+        if self.store is None:
+            raise ValueError("no profile store")
+        with self.lock:
+            if settings is None:
+                settings = {key: value for key, value in self.config.items() if key not in ("profiles", "schedule")}
+            self.store.put(name, settings)
+
+    def stats(self):
+        return self.session.stats()
+
+
+def run_headless(config=None, control_address=None, profile=None):
+    config = read_config() if config is None else config
+    metrics, metrics_exporter = metrics_from_config(config.get("metrics"))
+    profiler = start_profiler() if profile else None
+    try:
+        return _run_headless(config, control_address, HeadlessSession(metrics=metrics), ProfileStore())
+    finally:
+        if profiler:
+            profiler.stop()
+            profiler.write(profile)
+        if metrics_exporter:
+            metrics_exporter.stop()
+        if metrics:
+            metrics.close()
+
+
+def _run_headless(config, control_address, session, store=None):
+    # Returns the process exit status.
+    controller = SessionController(config, session=session, store=store)
+    try:
+        sessions = parse_schedule(config.get("schedule"))
+    except (AttributeError, TypeError, ValueError) as exc:
+        print(f"Invalid schedule: {exc}")
+        return 1
+    control_address = control_address or config.get("control_address")
+    if not sessions and not control_address:
+        try:
+            controller.session.start(config)
+        except ValueError as exc:
+            print(f"Invalid config: {exc}")
+            return 1
+        print("Clicking; press Ctrl+C to stop.")
+        try:
+            while controller.session.is_clicking():
+                time.sleep(HEADLESS_STATUS_INTERVAL_SEC)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            controller.stop()
+        return 0
+
+    def on_start(scheduled):
+        try:
+            controller.start(scheduled.profile, scheduled.cps, label=scheduled.name)
+            print(f"Started scheduled session '{scheduled.name}'")
+        except (KeyError, ValueError) as exc:
+            print(f"Schedule '{scheduled.name}' failed: {exc}")
+
+    def on_stop(scheduled):
+        if controller.session.label == scheduled.name:
+            controller.stop(label=scheduled.name)
+            print(f"Stopped scheduled session '{scheduled.name}'")
+
+    server = None
+    if control_address:
+        try:
+            server = start_control_server(controller, control_address)
+        except ValueError as exc:
+            print(f"Invalid control address: {exc}")
+    scheduler = None
+    if sessions:
+        scheduler = SessionScheduler(sessions, on_start, on_stop)
+        scheduler.start()
+        print(f"Waiting on {len(sessions)} scheduled session(s); press Ctrl+C to quit.")
+    else:
+        print("Waiting for control commands; press Ctrl+C to quit.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if scheduler:
+            scheduler.stop()
+        if server:
+            server.stop()
+        controller.stop()
+    return 0
@@ -0,0 +1,263 @@
+import math
+import textwrap
+
+# core imports this module, so its timing constants are read as core.NAME
+# when a loop is built rather than bound at import time.
+from . import core
+from .trace import (STAGE_CLICK, STAGE_FATIGUE, STAGE_INTERVAL_SLEEP, STAGE_MOVE, STAGE_POSITION,
+                    STAGE_SCHEDULE)
+
+# Source text -> compiled loop; each feature set is compiled once per process.
+_LOOPS = {}
+
+
+def _loop_env(clicker):
+    # Every parameter the stages may use, read once per session.
+    range_x, range_y = clicker.random_pos_offset or (0, 0)
+    target_x, target_y = clicker.target_pos or (0, 0)
+    return {
+        "now": clicker.now,
+        "sleep": clicker.sleep,
+        "interval_random": clicker.streams.interval.random,
+        "interval_uniform": clicker.streams.interval.uniform,
+        "position_uniform": clicker.streams.position.uniform,
+        "position_randint": clicker.streams.position.randint,
+        "thinking_rand": clicker.streams.thinking,
+        "thinking_randint": clicker.streams.thinking.randint,
+        "log": math.log,
+        "stats": clicker.stats,
+        "metrics": clicker.metrics,
+        "metrics_slot": getattr(clicker, "metrics_click_slot", None),
+        "tracer_begin": clicker.tracer.begin if clicker.tracer else None,
+        "tracer_mark": clicker.tracer.mark if clicker.tracer else None,
+        "use_background": clicker._use_background_clicker,
+        "pixel_watcher": clicker.pixel_watcher,
+        "pixel_interval_sec": clicker.pixel_watcher.interval_sec if clicker.pixel_watcher else 0,
+        "locate": clicker.target_locator.locate if clicker.target_locator else None,
+        "idle_sec": core.IDLE_SLEEP_MS / core.MS_PER_SEC,
+        "cursor_position": clicker._cursor_position,
+        "move_cursor": clicker._move_cursor,
+        "click_button": clicker._click_button,
+        "hold_click": clicker._hold_click,
+        "tap_key": clicker._tap_key,
+        "hold_key": clicker._hold_key,
+        "sample_gauss": clicker._sample_positive_gauss_us,
+        "button": clicker.button,
+        "target_x": target_x,
+        "target_y": target_y,
+        "range_x": range_x,
+        "range_y": range_y,
+        "drift_step_min": clicker.drift_step_min,
+        "drift_step_max": clicker.drift_step_max,
+        "drift_reset_min": clicker.drift_reset_min,
+        "drift_reset_max": clicker.drift_reset_max,
+        "key_sequence": clicker.key_sequence,
+        "key_count": len(clicker.key_sequence),
+        "combo": clicker.key_sequence[0] if clicker.key_sequence else None,
+        "click_limit": clicker.click_limit,
+        "thinking_mean_us": clicker.thinking_pause_mean_us,
+        "thinking_std_us": clicker.thinking_pause_std_us,
+        "thinking_min_clicks": clicker.thinking_pause_min_clicks,
+        "thinking_max_clicks": clicker.thinking_pause_max_clicks,
+        "fatigue_threshold_us": clicker.fatigue_threshold_interval_us,
+        "fatigue_duration_us": clicker.fatigue_duration_us,
+        "fatigue_cooldown_sec": clicker.fatigue_cooldown_duration_us / core.US_PER_SEC,
+        "fatigue_min_interval_us": clicker.fatigue_cooldown_min_interval_us,
+        "interval_us": clicker.interval_us,
+        "random_interval_us": clicker.random_interval_us,
+        "exp_mean_us": max(core.MIN_SLEEP_US, clicker.exp_mean_interval_us),
+        "delay_sec": max(core.MIN_SLEEP_US, clicker.interval_us) / core.US_PER_SEC,
+    }
+
+
+def _loop_source(clicker, names):
+    # Picks one fragment per stage for the active feature set; a disabled
+    # feature leaves no code behind.
+    human = clicker.human_like
+    fatigue = human and clicker.fatigue_enabled
+    hold = human and clicker.hold_time_enabled
+    thinking = human and clicker.thinking_pause_enabled
+    range_x, range_y = clicker.random_pos_offset or (0, 0)
+    offset = range_x > 0 or range_y > 0
+    drift = offset and human and clicker.drift_enabled
+    tracer = bool(clicker.tracer)
+    metrics = bool(clicker.metrics)
+    body = []
+
+    def emit(text, when=True, indent=0):
+        if when:
+            body.append(textwrap.indent(textwrap.dedent(text).strip("\n"), "    " * indent))
+
+    def mark(stage):
+        emit(f"tracer_mark({stage})", tracer)
+
+    # Session state kept in locals; written back when a parameter switch ends the loop.
+    state = []
+    if fatigue:
+        state += ["last_action_time", "jitter_duration", "cooldown_end_time"]
+    if thinking:
+        state.append("next_thinking_click")
+    if drift:
+        state += ["drift_x", "drift_y"]
+    if len(clicker.key_sequence) > 1:
+        state.append("key_index")
+    prologue = ["click_count = clicker.click_count"] + [f"{name} = clicker.{name}" for name in state]
+
+    emit("""
+        if not use_background():
+            return True
+    """, clicker.background_click_enabled)
+    if clicker.pixel_watcher:
+        if clicker.pixel_condition.stop_when_unsatisfied:
+            emit("""
+                if not pixel_watcher.satisfied:
+                    return True
+            """)
+        else:
+            emit("""
+                if not pixel_watcher.satisfied:
+                    sleep(pixel_interval_sec)
+                    continue
+            """)
+    emit("tracer_begin()", tracer)
+    if fatigue:
+        emit(f"""
+            now_sec = now()
+            if last_action_time is not None:
+                delta_us = (now_sec - last_action_time) * {core.US_PER_SEC}
+                if delta_us < fatigue_threshold_us:
+                    jitter_duration += delta_us
+                else:
+                    jitter_duration = 0
+            last_action_time = now_sec
+            if jitter_duration >= fatigue_duration_us:
+                cooldown_end_time = now_sec + fatigue_cooldown_sec
+                jitter_duration = 0
+        """)
+        emit("metrics.record_fatigue_cooldown()", metrics, indent=1)
+    mark(STAGE_FATIGUE)
+
+    if clicker.key_sequence:
+        clicks = 1
+        if len(clicker.key_sequence) > 1:
+            emit("""
+                combo = key_sequence[key_index]
+                key_index = (key_index + 1) % key_count
+            """)
+        if hold:
+            emit("hold_key(combo)")
+        else:
+            emit("tap_key(combo)")
+            mark(STAGE_CLICK)
+    else:
+        clicks = 2 if clicker.click_type == "double" else 1
+        base = "x", "y"
+        if clicker.target_locator:
+            emit("""
+                located = locate()
+                if located is None:
+                    sleep(idle_sec)
+                    continue
+                x, y = located
+            """)
+        elif clicker.target_pos:
+            base = "target_x", "target_y"
+            if not offset:
+                prologue += ["x = target_x", "y = target_y"]
+        else:
+            emit("x, y = cursor_position()")
+        if drift:
+            emit(f"""
+                drift_x += position_uniform(drift_step_min, drift_step_max)
+                drift_y += position_uniform(drift_step_min, drift_step_max)
+                if abs(drift_x) > range_x or abs(drift_y) > range_y:
+                    drift_x = position_uniform(drift_reset_min, drift_reset_max)
+                    drift_y = position_uniform(drift_reset_min, drift_reset_max)
+                x = {base[0]} + int(drift_x)
+                y = {base[1]} + int(drift_y)
+            """)
+        elif offset:
+            emit(f"x = {base[0]} + position_randint(-range_x, range_x)" if range_x > 0 else f"x = {base[0]}")
+            emit(f"y = {base[1]} + position_randint(-range_y, range_y)" if range_y > 0 else f"y = {base[1]}")
+        mark(STAGE_POSITION)
+        if clicker.target_pos or clicker.target_locator or offset:
+            emit("move_cursor(x, y)")
+            mark(STAGE_MOVE)
+        if hold:
+            emit(f"hold_click(button, x, y, {clicks})")
+        else:
+            emit(f"click_button(button, x, y, {clicks})")
+            mark(STAGE_CLICK)
+
+    emit(f"""
+        click_count += {clicks}
+        clicker.click_count = click_count
+    """)
+    emit("stats.record_click_count(click_count)", bool(clicker.stats))
+    emit("metrics.record_click(metrics_slot)", metrics)
+    emit("""
+        if click_count >= click_limit:
+            return True
+    """, clicker.click_limit > 0)
+
+    if thinking:
+        emit("""
+            thinking_pause_us = 0
+            if click_count >= next_thinking_click:
+                thinking_pause_us = sample_gauss(thinking_rand, thinking_mean_us, thinking_std_us)
+                next_thinking_click = click_count + thinking_randint(thinking_min_clicks, thinking_max_clicks)
+        """)
+        emit("metrics.record_thinking_pause()", metrics, indent=1)
+    if clicker.interval_mode == "Exponential":
+        emit("delay_us = -log(1.0 - interval_random()) * exp_mean_us")
+    elif clicker.random_interval_us > 0:
+        emit("delay_us = interval_us + interval_uniform(0, random_interval_us)")
+    elif thinking or fatigue:
+        emit("delay_us = interval_us")
+    # A fixed interval with nothing added keeps the precomputed delay_sec.
+    if clicker.interval_mode == "Exponential" or clicker.random_interval_us > 0 or thinking or fatigue:
+        emit("delay_us += thinking_pause_us", thinking)
+        emit("""
+            if now() < cooldown_end_time:
+                delay_us = max(delay_us, fatigue_min_interval_us)
+        """, fatigue)
+        emit(f"delay_sec = max({core.MIN_SLEEP_US}, delay_us) / {core.US_PER_SEC}")
+    mark(STAGE_SCHEDULE)
+    if clicker.stats or metrics:
+        emit("""
+            sleep_start = now()
+            sleep(delay_sec)
+            slept_sec = now() - sleep_start
+        """)
+        emit("stats.record_sleep(delay_sec, slept_sec)", bool(clicker.stats))
+        emit("metrics.observe_overshoot(slept_sec - delay_sec)", metrics)
+    else:
+        emit("sleep(delay_sec)")
+    mark(STAGE_INTERVAL_SLEEP)
+
+    lines = ["def loop(clicker, env):"]
+    lines += [f"    {name} = env[{name!r}]" for name in names]
+    lines += [f"    {line}" for line in prologue]
+    lines.append("    while clicker.running and clicker.pending_params is None:")
+    lines += [textwrap.indent(fragment, " " * 8) for fragment in body]
+    lines += [f"    clicker.{name} = {name}" for name in state]
+    lines.append("    return False")
+    return "\n".join(lines) + "\n"
+
+
+def build_click_loop(clicker, env):
+    source = _loop_source(clicker, env)
+    loop = _LOOPS.get(source)
+    if loop is None:
+        namespace = {}
+        exec(compile(source, "<specialized click loop>", "exec"), namespace)
+        loop = _LOOPS[source] = namespace["loop"]
+    return loop
+
+
+def run_specialized(clicker):
+    # Same contract as script.run_program: True when the session ended on
+    # its own (limit, lost window, pixel stop), False when stopped from
+    # outside or interrupted by a parameter switch.
+    env = _loop_env(clicker)
+    return build_click_loop(clicker, env)(clicker, env)
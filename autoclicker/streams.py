@@ -0,0 +1,144 @@
+import random
+import secrets
+import struct
+from hashlib import blake2b, shake_128
+
+MASK64 = (1 << 64) - 1
+RECIP_53 = 1.0 / (1 << 53)
+# Draws per generated block; a jump costs at most one block.
+BLOCK_WORDS = 64
+BLOCK_SHIFT = 6
+BLOCK_FORMAT = f"<{BLOCK_WORDS}Q"
+# One stream per humanization subsystem.
+RANDOM_STREAMS = ("interval", "position", "hold", "gap", "thinking")
+
+
+def stream_key(seed, name, chunk=0):
+    return blake2b(f"{seed & MASK64}:{name}:{chunk}".encode(), digest_size=16).digest()
+
+
+def random_seed():
+    return secrets.randbits(64)
+
+
+def seed_from_config(value):
+    # An integer seed replays a session exactly; anything else gets a fresh one.
+    if value is None or value == "":
+        return random_seed()
+    try:
+        return int(value) & MASK64
+    except (TypeError, ValueError):
+        print(f"Invalid seed: {value!r}, using a random one")
+        return random_seed()
+
+
+class CounterRandom(random.Random):
+    # Counter-based generator: draw n comes from word n % 64 of
+    # SHAKE-128(key, n // 64), a pure function of (key, n). Jumping anywhere
+    # costs one block, and streams with different keys never overlap. A block
+    # is converted to floats once, so a draw is a list pop. Everything
+    # random.Random offers (uniform, gauss, ...) is built on random().
+    def __init__(self, key, counter=0):
+        self.key = key
+        self.block = -1
+        self.floats = []
+        super().__init__()
+        self.counter = counter
+
+    @property
+    def counter(self):
+        return (self.block + 1) * BLOCK_WORDS - len(self.floats)
+
+    @counter.setter
+    def counter(self, value):
+        block, offset = divmod(value, BLOCK_WORDS)
+        if offset:
+            self._load(block)
+            del self.floats[BLOCK_WORDS - offset:]
+        else:
+            # Loaded on the next draw.
+            self.block = block - 1
+            self.floats = []
+
+    def seed(self, a=None, version=2):
+        if a is not None:
+            self.key = blake2b(repr(a).encode(), digest_size=16).digest()
+            self.counter = 0
+        self.gauss_next = None
+
+    def _load(self, block):
+        words = struct.unpack(BLOCK_FORMAT, shake_128(self.key + block.to_bytes(8, "little")).digest(BLOCK_WORDS * 8))
+        # Reversed, so pop() hands out word 0 first.
+        self.floats = [(word >> 11) * RECIP_53 for word in reversed(words)]
+        self.block = block
+
+    def random(self):
+        floats = self.floats
+        if not floats:
+            self._load(self.block + 1)
+            floats = self.floats
+        return floats.pop()
+
+    def randint(self, a, b):
+        # One draw each; 53 bits leave no visible bias for click-sized ranges.
+        return a + int(self.random() * (b - a + 1))
+
+    def getrandbits(self, k):
+        bits = 0
+        for shift in range(0, k, 32):
+            bits |= int(self.random() * 4294967296.0) << shift
+        return bits & ((1 << k) - 1)
+
+    def jump(self, draws):
+        self.counter += draws
+        self.gauss_next = None
+
+    def getstate(self):
+        return self.key, self.counter, self.gauss_next
+
+    def setstate(self, state):
+        key, counter, self.gauss_next = state
+        self.key = key
+        self.counter = counter
+
+    def __reduce__(self):
+        return self.__class__, (self.key, self.counter)
+
+
+class RandomStreams:
+    # Independent, seeded streams per subsystem: enabling drift doesn't shift
+    # the interval sequence, a session replays exactly from its seed, and
+    # chunk k of a split simulation gets streams no other chunk touches.
+    def __init__(self, seed=None, chunk=0):
+        self.seed = random_seed() if seed is None else seed & MASK64
+        self.chunk = chunk
+        for name in RANDOM_STREAMS:
+            setattr(self, name, CounterRandom(stream_key(self.seed, name, chunk)))
+
+    @classmethod
+    def shared(cls, rand):
+        # Every subsystem draws from one caller-supplied generator.
+        streams = cls.__new__(cls)
+        streams.seed = None
+        streams.chunk = 0
+        for name in RANDOM_STREAMS:
+            setattr(streams, name, rand)
+        return streams
+
+    def fork(self, chunk):
+        return RandomStreams(self.seed, chunk)
+
+    def positions(self):
+        if self.seed is None:
+            return None
+        return {name: getattr(self, name).counter for name in RANDOM_STREAMS}
+
+    def jump_to(self, positions):
+        for name, counter in positions.items():
+            stream = getattr(self, name)
+            stream.counter = counter
+            stream.gauss_next = None
+
+    def rewind(self):
+        if self.seed is not None:
+            self.jump_to(dict.fromkeys(RANDOM_STREAMS, 0))
@@ -0,0 +1,294 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .config import migrate_config, read_config, write_atomic
+from .core import AutoClicker, MS_PER_SEC, US_PER_SEC, coerce_bool
+from .process import PROCESS_CONTEXT
+from .profiles import ProfileStore
+from .session import profile_snapshot, resolve_profile
+
+DEFAULT_SWEEP_DURATION_SEC = 600
+DEFAULT_SWEEP_OUTPUT = "sweep.csv"
+CHECKPOINT_SUFFIX = ".checkpoint.jsonl"
+SWEEP_COLUMNS = ("clicks", "cps", "pause_share", "cooldown_share",
+                 "interval_p50_ms", "interval_p90_ms", "interval_p95_ms", "interval_p99_ms", "error")
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_axis(spec):
+    # "name=a,b,c" lists values, "name=start:stop[:step]" is an inclusive range.
+    name, sep, values = spec.partition("=")
+    name = name.strip()
+    if not sep or not name or not values:
+        raise ValueError(f"expected name=values, got {spec!r}")
+    if ":" in values:
+        parts = [float(part) for part in values.split(":")]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"expected start:stop[:step] for {name}")
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) == 3 else 1
+        if step <= 0 or stop < start:
+            raise ValueError(f"empty range for {name}")
+        count = int(round((stop - start) / step, 9)) + 1
+        points = [start + step * i for i in range(count)]
+        if all(part.is_integer() for part in parts):
+            points = [int(point) for point in points]
+        return name, points
+    return name, [_parse_value(value.strip()) for value in values.split(",")]
+
+
+def grid_points(axes):
+    names = [name for name, _values in axes]
+    return [dict(zip(names, values)) for values in itertools.product(*(values for _name, values in axes))]
+
+
+def point_key(point):
+    return json.dumps(point, sort_keys=True)
+
+
+class VirtualClock:
+    # Stands in for perf_counter/sleep: sleeping only advances the clock, so
+    # an hour of clicking simulates in well under a second. The session ends
+    # once end_sec of virtual time has passed.
+    def __init__(self, end_sec):
+        self.now_sec = 0.0
+        self.end_sec = end_sec
+        self.clicker = None
+
+    def now(self):
+        return self.now_sec
+
+    def sleep(self, seconds):
+        clicker = self.clicker
+        if not clicker.running:
+            # run()'s idle wait after the session ended.
+            clicker.program_running = False
+            return
+        self.now_sec += seconds
+        if self.now_sec >= self.end_sec:
+            clicker.running = False
+
+
+class SimMouse:
+    def __init__(self):
+        self.position = (0, 0)
+
+    def press(self, button):
+        pass
+
+    def release(self, button):
+        pass
+
+    def click(self, button, count):
+        pass
+
+
+class SimRecorder:
+    # Takes the metrics slot to timestamp clicks, thinking pauses and
+    # fatigue cooldowns on the virtual clock.
+    def __init__(self, clock):
+        self.clock = clock
+        self.click_times = []
+        self.cooldown_starts = []
+        self.pause_sec = 0.0
+        self.last_sample_us = 0.0
+
+    def record_click(self, slot):
+        self.click_times.append(self.clock.now_sec)
+
+    def record_thinking_pause(self):
+        # The pause length is the Gaussian sample drawn just before this call.
+        self.pause_sec += self.last_sample_us / US_PER_SEC
+
+    def record_fatigue_cooldown(self):
+        self.cooldown_starts.append(self.clock.now_sec)
+
+    def observe_backend(self, seconds):
+        pass
+
+    def observe_overshoot(self, seconds):
+        pass
+
+
+def _covered_sec(starts, length_sec, end_sec):
+    covered = 0.0
+    reach = 0.0
+    for start in starts:
+        stop = min(start + length_sec, end_sec)
+        covered += max(0.0, stop - max(start, reach))
+        reach = max(reach, stop)
+    return covered
+
+
+def simulate(config, duration_sec=DEFAULT_SWEEP_DURATION_SEC, seed=0):
+    params = profile_snapshot(config, None)
+    clock = VirtualClock(duration_sec)
+    recorder = SimRecorder(clock)
+    clicker = AutoClicker(**params, seed=seed, time_provider=clock.now, sleep_fn=clock.sleep,
+                          mouse=SimMouse(), backend="pynput", metrics=recorder,
+                          specialize=coerce_bool(config.get("specialize", True)))
+    clock.clicker = clicker
+    sample = clicker._sample_positive_gauss_us
+
+    def recorded_sample(rand, mean_us, std_us):
+        recorder.last_sample_us = sample(rand, mean_us, std_us)
+        return recorder.last_sample_us
+    clicker._sample_positive_gauss_us = recorded_sample
+
+    clicker.start_clicking()
+    clicker.run()
+    elapsed = clock.now_sec
+    times = recorder.click_times
+    intervals = sorted((b - a) * MS_PER_SEC for a, b in zip(times, times[1:]))
+    result = {
+        "clicks": clicker.click_count,
+        "cps": clicker.click_count / elapsed if elapsed else 0.0,
+        "pause_share": recorder.pause_sec / elapsed if elapsed else 0.0,
+        "cooldown_share": (_covered_sec(recorder.cooldown_starts, params["fatigue_cooldown_duration_us"] / US_PER_SEC,
+                                        elapsed) / elapsed if elapsed else 0.0),
+    }
+    if intervals:
+        result.update({
+            "interval_p50_ms": _percentile(intervals, 0.5),
+            "interval_p90_ms": _percentile(intervals, 0.9),
+            "interval_p95_ms": _percentile(intervals, 0.95),
+            "interval_p99_ms": _percentile(intervals, 0.99),
+        })
+    return result
+
+
+def run_point(base_config, point, duration_sec, seed):
+    # Worker entry: one grid point, seeded from its key so reruns and
+    # resumed sweeps reproduce the same numbers in any order.
+    # Migrated separately, so an interval_ms axis overrides the base's interval_us.
+    config = migrate_config(base_config)
+    config.update(migrate_config(point))
+    row = dict(point)
+    try:
+        row.update(simulate(config, duration_sec, seed ^ zlib.crc32(point_key(point).encode())))
+    except (KeyError, TypeError, ValueError) as exc:
+        row["error"] = str(exc)
+    return row
+
+
+def load_checkpoint(path):
+    # Finished rows by point key. A line torn by a crash is dropped and the
+    # file rewritten without it, so appends continue on a clean line.
+    rows = {}
+    try:
+        with open(path, "r") as handle:
+            lines = handle.read().split("\n")
+    except FileNotFoundError:
+        return rows
+    torn = False
+    for line in lines:
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+            rows[point_key(entry["point"])] = entry["row"]
+        except (ValueError, KeyError, TypeError):
+            torn = True
+    if torn or (lines and lines[-1]):
+        write_atomic(path, "".join(json.dumps({"point": json.loads(key), "row": row}) + "\n"
+                                   for key, row in rows.items()))
+    return rows
+
+
+def run_sweep(base_config, points, duration_sec=DEFAULT_SWEEP_DURATION_SEC, checkpoint_path=None,
+              workers=None, seed=0):
+    done = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    todo = [point for point in points if point_key(point) not in done]
+    if done:
+        print(f"Resuming: {len(points) - len(todo)} of {len(points)} points already done")
+    checkpoint = open(checkpoint_path, "a") if checkpoint_path else None
+
+    def finished(point, row):
+        done[point_key(point)] = row
+        if checkpoint:
+            checkpoint.write(json.dumps({"point": point, "row": row}) + "\n")
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+
+    try:
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(todo) <= 1:
+            for point in todo:
+                finished(point, run_point(base_config, point, duration_sec, seed))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo)), mp_context=PROCESS_CONTEXT) as pool:
+                futures = {pool.submit(run_point, base_config, point, duration_sec, seed): point for point in todo}
+                for future in as_completed(futures):
+                    finished(futures[future], future.result())
+    finally:
+        if checkpoint:
+            checkpoint.close()
+    return [done[point_key(point)] for point in points]
+
+
+def format_table(names, rows):
+    columns = list(names) + [column for column in SWEEP_COLUMNS
+                             if column != "error" or any("error" in row for row in rows)]
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([f"{row[column]:.4f}" if isinstance(row.get(column), float) else row.get(column, "")
+                         for column in columns])
+    return out.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m autoclicker.sweep",
+        description="simulate the click engine in virtual time over a grid of config values",
+    )
+    parser.add_argument("axes", nargs="+", metavar="NAME=VALUES",
+                        help="config key with comma-separated values or an inclusive start:stop[:step] range")
+    parser.add_argument("--config", metavar="PATH", help="base config file (default: the saved config)")
+    parser.add_argument("--profile", help="apply this profile to the base config first")
+    parser.add_argument("--duration", type=float, default=DEFAULT_SWEEP_DURATION_SEC,
+                        help="virtual seconds of clicking per point")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_SWEEP_OUTPUT, help="CSV results table")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help=f"finished points, for resuming (default: OUT{CHECKPOINT_SUFFIX})")
+    args = parser.parse_args(argv)
+    try:
+        axes = [parse_axis(spec) for spec in args.axes]
+        if args.config:
+            with open(args.config, "r") as handle:
+                base_config = json.load(handle)
+        else:
+            base_config = read_config()
+        base_config = resolve_profile(base_config, args.profile, ProfileStore())
+    except (OSError, KeyError, ValueError) as exc:
+        parser.error(str(exc))
+    points = grid_points(axes)
+    rows = run_sweep(base_config, points, args.duration, args.checkpoint or args.out + CHECKPOINT_SUFFIX,
+                     args.workers, args.seed)
+    table = format_table([name for name, _values in axes], rows)
+    write_atomic(args.out, table)
+    print(table, end="")
+    print(f"Wrote {len(rows)} points to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
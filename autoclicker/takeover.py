@@ -0,0 +1,166 @@
+import threading
+import time
+
+from pynput import keyboard, mouse
+
+from .keys import key_name
+
+DEFAULT_TAKEOVER_IDLE_MS = 1000
+# Rounding between the position we send and the one the OS reports.
+TAKEOVER_SLACK_PX = 2
+TAKEOVER_JOIN_TIMEOUT_SEC = 0.5
+
+
+class TakeoverGuard:
+    # Pauses the engine the moment the user touches the mouse or keyboard and
+    # resumes it once they have been idle for idle_ms. Everything happens in
+    # listener callbacks and one waiting thread; the click path is untouched.
+    # Our own events are told apart by pynput's injected flag, and where the
+    # platform doesn't set it (XTest on Xorg) by what the engine could have
+    # sent: its button near its click spot, a move within its position
+    # offset, or a key from its key sequence. The app's own hotkeys (by
+    # name, as the UI stores them) never count as taking over.
+    def __init__(self, idle_ms=DEFAULT_TAKEOVER_IDLE_MS, hotkeys=(), clock=time.monotonic,
+                 mouse_listener_factory=mouse.Listener, keyboard_listener_factory=keyboard.Listener):
+        self.idle_sec = idle_ms / 1000
+        self.hotkeys = frozenset(name.upper() for name in hotkeys)
+        self.clock = clock
+        self.mouse_listener_factory = mouse_listener_factory
+        self.keyboard_listener_factory = keyboard_listener_factory
+        self._reset()
+
+    def __getstate__(self):
+        # A separate engine process gets its own listeners and resume thread.
+        return {"idle_sec": self.idle_sec, "hotkeys": self.hotkeys, "clock": self.clock,
+                "mouse_listener_factory": self.mouse_listener_factory,
+                "keyboard_listener_factory": self.keyboard_listener_factory}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
+
+    def _reset(self):
+        self.clicker = None
+        self.listeners = []
+        self.thread = None
+        self.cond = threading.Condition()
+        self.deadline = 0.0
+        self.stopping = False
+        self.anchor = None
+        self.own_keys = set()
+        self.takeovers = 0
+
+    def start(self, clicker):
+        self.stop()
+        self.clicker = clicker
+        self.stopping = False
+        # A fixed target is where our clicks land; otherwise they start where the cursor is.
+        self.anchor = clicker.target_pos or clicker._cursor_position()
+        self.own_keys = {key for combo in clicker.key_sequence for key in combo}
+        try:
+            self.listeners = [
+                self.mouse_listener_factory(on_move=self.on_move, on_click=self.on_click, on_scroll=self.on_scroll),
+                self.keyboard_listener_factory(on_press=self.on_key, on_release=self.on_key),
+            ]
+            for listener in self.listeners:
+                listener.start()
+        except Exception as exc:
+            print(f"Takeover guard unavailable: {exc}")
+            self._stop_listeners()
+            return
+        self.thread = threading.Thread(target=self._resume_when_idle, name="takeover", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop_listeners()
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        thread, self.thread = self.thread, None
+        if thread and thread is not threading.current_thread():
+            thread.join(TAKEOVER_JOIN_TIMEOUT_SEC)
+
+    def _stop_listeners(self):
+        for listener in self.listeners:
+            try:
+                listener.stop()
+            except Exception:
+                pass
+        self.listeners = []
+
+    def _near_anchor(self, x, y):
+        anchor = self.anchor
+        if anchor is None:
+            return False
+        range_x, range_y = self.clicker.random_pos_offset or (0, 0)
+        return (abs(x - anchor[0]) <= range_x + TAKEOVER_SLACK_PX
+                and abs(y - anchor[1]) <= range_y + TAKEOVER_SLACK_PX)
+
+    def on_move(self, x, y, injected=False):
+        if not injected and not self._near_anchor(x, y):
+            self.user_input()
+
+    def on_click(self, x, y, button, pressed, injected=False):
+        if injected:
+            return
+        clicker = self.clicker
+        if not clicker.key_sequence and button == clicker.button and self._near_anchor(x, y):
+            if pressed and not clicker.target_pos:
+                # Cursor-position sessions walk with their offset; follow our last click.
+                self.anchor = (x, y)
+            return
+        self.user_input()
+
+    def on_scroll(self, x, y, dx, dy, injected=False):
+        if not injected:
+            self.user_input()
+
+    def on_key(self, key, injected=False):
+        if not injected and key not in self.own_keys and key_name(key) not in self.hotkeys:
+            self.user_input()
+
+    def user_input(self):
+        # Runs on a listener thread: pausing here stops the engine at its next
+        # loop check; each further event pushes the resume back.
+        with self.cond:
+            self.deadline = self.clock() + self.idle_sec
+            if self.clicker.pause():
+                self.takeovers += 1
+                self.cond.notify()
+
+    def _resume_when_idle(self):
+        with self.cond:
+            while not self.stopping:
+                if not self.clicker.paused:
+                    self.cond.wait()
+                    continue
+                remaining = self.deadline - self.clock()
+                if remaining > 0:
+                    self.cond.wait(remaining)
+                    continue
+                if not self.clicker.target_pos:
+                    # Carry on from wherever the user left the cursor.
+                    self.anchor = self.clicker._cursor_position()
+                self.clicker.resume()
+
+
+def takeover_from_config(config, hotkeys=()):
+    # true, or {"idle_ms": 1000}.
+    if not config:
+        return None
+    if config is True:
+        return TakeoverGuard(hotkeys=hotkeys)
+    if not isinstance(config, dict):
+        print("Invalid auto_pause config: expected true or an object")
+        return None
+    if not config.get("enabled", True):
+        return None
+    try:
+        idle_ms = float(config.get("idle_ms", DEFAULT_TAKEOVER_IDLE_MS))
+    except (TypeError, ValueError) as exc:
+        print(f"Invalid auto_pause config: {exc}")
+        return None
+    if idle_ms < 0:
+        print("Invalid auto_pause config: idle_ms must be non-negative")
+        return None
+    return TakeoverGuard(idle_ms=idle_ms, hotkeys=hotkeys)
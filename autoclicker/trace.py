@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+from array import array
+
+from .config import write_atomic
+
+STAGE_FATIGUE = 0
+STAGE_POSITION = 1
+STAGE_MOVE = 2
+STAGE_PRESS = 3
+STAGE_HOLD = 4
+STAGE_RELEASE = 5
+STAGE_GAP = 6
+STAGE_CLICK = 7
+STAGE_SCHEDULE = 8
+STAGE_INTERVAL_SLEEP = 9
+STAGE_NAMES = (
+    "fatigue bookkeeping",
+    "position",
+    "cursor move",
+    "press",
+    "hold sleep",
+    "release",
+    "double-click gap",
+    "click",
+    "schedule next",
+    "interval sleep",
+)
+DEFAULT_TRACE_CAPACITY = 100000
+EVENT_WIDTH = 3
+US_PER_SEC = 1_000_000
+
+
+class Tracer:
+    # Spans go into a preallocated ring of (stage, start, end) doubles; each
+    # mark() closes the span that began at the previous mark.
+    def __init__(self, path=None, capacity=DEFAULT_TRACE_CAPACITY, clock=None):
+        self.path = path
+        self.capacity = max(1, int(capacity))
+        self.events = array("d", bytes(self.capacity * EVENT_WIDTH * 8))
+        self.clock = clock
+        self.seed = None
+        self.count = 0
+        self.dumped_count = 0
+        self.last = 0.0
+
+    def begin(self):
+        self.last = self.clock()
+
+    def mark(self, stage):
+        now = self.clock()
+        i = self.count % self.capacity * EVENT_WIDTH
+        events = self.events
+        events[i] = stage
+        events[i + 1] = self.last
+        events[i + 2] = now
+        self.last = now
+        self.count += 1
+
+    def spans(self):
+        total = min(self.count, self.capacity)
+        first = self.count - total
+        events = self.events
+        for n in range(first, self.count):
+            i = n % self.capacity * EVENT_WIDTH
+            yield int(events[i]), events[i + 1], events[i + 2]
+
+    def to_chrome_trace(self, thread_name="click engine"):
+        pid = os.getpid()
+        tid = threading.get_native_id()
+        trace_events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}]
+        origin = None
+        for stage, start, end in self.spans():
+            if origin is None:
+                origin = start
+            trace_events.append({
+                "name": STAGE_NAMES[stage],
+                "cat": "engine",
+                "ph": "X",
+                "ts": round((start - origin) * US_PER_SEC, 3),
+                "dur": round((end - start) * US_PER_SEC, 3),
+                "pid": pid,
+                "tid": tid,
+            })
+        other = {"dropped_spans": max(0, self.count - self.capacity)}
+        if self.seed is not None:
+            # Replays the traced session's random draws with the same config.
+            other["seed"] = self.seed
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms", "otherData": other}
+
+    def dump(self, path=None):
+        write_atomic(path or self.path, json.dumps(self.to_chrome_trace()))
+        self.dumped_count = self.count
+
+    def flush(self):
+        # Called by the engine thread once a session ends.
+        if not self.path or self.count == self.dumped_count:
+            return
+        try:
+            self.dump()
+            print(f"Trace written to {self.path}")
+        except OSError as exc:
+            print(f"Trace dump failed: {exc}")
+
+    def reset(self):
+        self.count = 0
+        self.dumped_count = 0
+
+
+def tracer_from_config(config):
+    if not config:
+        return None
+    if not isinstance(config, dict):
+        print("Invalid trace config: expected an object with a path")
+        return None
+    if not config.get("enabled", True):
+        return None
+    try:
+        return Tracer(path=config["path"], capacity=int(config.get("capacity", DEFAULT_TRACE_CAPACITY)))
+    except (KeyError, TypeError, ValueError) as exc:
+        print(f"Invalid trace config: {exc}")
+        return None
@@ -0,0 +1,125 @@
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+import time
+
+IS_LINUX = sys.platform.startswith("linux")
+
+PR_SET_TIMERSLACK = 29
+SCHED_PRIORITY_NORMAL = "normal"
+SCHED_PRIORITY_HIGH = "high"
+SCHED_PRIORITY_REALTIME = "realtime"
+SCHED_PRIORITIES = (SCHED_PRIORITY_NORMAL, SCHED_PRIORITY_HIGH, SCHED_PRIORITY_REALTIME)
+HIGH_PRIORITY_NICE = -10
+REALTIME_FIFO_PRIORITY = 10
+ENGINE_TUNING_KEYS = ("cpu_affinity", "sched_priority", "timer_slack_ns", "spin_us")
+NS_PER_SEC = 1_000_000_000
+NS_PER_US = 1000
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None and IS_LINUX:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError:
+            _libc = False
+    return _libc or None
+
+
+def set_cpu_affinity(cpus):
+    # Linux applies sched_setaffinity to the calling thread, not the process.
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(0, set(cpus))
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def set_sched_priority(priority):
+    if priority not in (SCHED_PRIORITY_HIGH, SCHED_PRIORITY_REALTIME):
+        return SCHED_PRIORITY_NORMAL
+    if priority == SCHED_PRIORITY_REALTIME and hasattr(os, "sched_setscheduler"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(REALTIME_FIFO_PRIORITY))
+            return SCHED_PRIORITY_REALTIME
+        except (OSError, AttributeError):
+            pass
+    if IS_LINUX and hasattr(os, "setpriority"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), HIGH_PRIORITY_NICE)
+            return SCHED_PRIORITY_HIGH
+        except OSError:
+            pass
+    return SCHED_PRIORITY_NORMAL
+
+
+def set_timer_slack(slack_ns):
+    libc = _get_libc()
+    if libc is None or slack_ns is None or slack_ns < 1:
+        return False
+    try:
+        return libc.prctl(PR_SET_TIMERSLACK, ctypes.c_ulong(int(slack_ns)), 0, 0, 0) == 0
+    except (AttributeError, OSError):
+        return False
+
+
+def apply_thread_tuning(cpu_affinity=None, sched_priority=None, timer_slack_ns=None):
+    status = {}
+    if cpu_affinity:
+        status["cpu_affinity"] = set_cpu_affinity(cpu_affinity)
+    if sched_priority and sched_priority != SCHED_PRIORITY_NORMAL:
+        status["sched_priority"] = set_sched_priority(sched_priority)
+    if timer_slack_ns:
+        status["timer_slack_ns"] = set_timer_slack(timer_slack_ns)
+    return status
+
+
+def spin_sleeper(spin_us, sleep=time.sleep, clock_ns=time.perf_counter_ns):
+    # Sleeps all but the last spin_us, then spins on the nanosecond clock to
+    # the deadline: waits shorter than the OS timer granularity come out
+    # exact, at the cost of one busy core for spin_us per wait.
+    spin_ns = spin_us * NS_PER_US
+
+    def spin_sleep(seconds):
+        deadline = clock_ns() + int(seconds * NS_PER_SEC)
+        coarse_ns = deadline - spin_ns - clock_ns()
+        if coarse_ns > 0:
+            sleep(coarse_ns / NS_PER_SEC)
+        while clock_ns() < deadline:
+            pass
+    return spin_sleep
+
+
+def normalize_tuning(config):
+    tuning = {}
+    cpus = config.get("cpu_affinity")
+    if isinstance(cpus, (list, tuple)):
+        try:
+            cpus = sorted({int(cpu) for cpu in cpus if int(cpu) >= 0})
+        except (TypeError, ValueError):
+            cpus = []
+        if cpus:
+            tuning["cpu_affinity"] = cpus
+    priority = str(config.get("sched_priority", SCHED_PRIORITY_NORMAL)).lower()
+    if priority in SCHED_PRIORITIES and priority != SCHED_PRIORITY_NORMAL:
+        tuning["sched_priority"] = priority
+    try:
+        slack_ns = int(config.get("timer_slack_ns") or 0)
+    except (TypeError, ValueError):
+        slack_ns = 0
+    if slack_ns > 0:
+        tuning["timer_slack_ns"] = slack_ns
+    try:
+        spin_us = int(config.get("spin_us") or 0)
+    except (TypeError, ValueError):
+        spin_us = 0
+    if spin_us > 0:
+        tuning["spin_us"] = spin_us
+    return tuning
@@ -1,38 +1,49 @@
 import os
 import sys
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk, ImageDraw, ImageOps
 from pynput.mouse import Controller
 from pynput.keyboard import Listener
 
-from .config import read_config, write_config
+from .config import AutoSaver, get_config_path, migrate_config, read_config
+from .control import AppController, start_control_server
+from .keys import key_name
+from .layout import LayoutManager
+from .metrics import metrics_from_config
+from .preview import PreviewWorker, format_preview, preview_key
+from .process import ProcessClicker
+from .profiles import ProfileStore
+from .profiler import DEFAULT_PROFILE_PREFIX, start_profiler
+from .schedule import SessionScheduler, parse_schedule
+from .session import (apply_cps, engine_kwargs_from_config, profile_hotkeys_from_config, profile_snapshots,
+                      resolve_profile)
+from .tuning import ENGINE_TUNING_KEYS
 from .core import (
     AutoClicker,
-    MS_PER_SEC,
-    DEFAULT_INTERVAL_MS,
-    DEFAULT_RANDOM_INTERVAL_MS,
-    DEFAULT_EXP_MEAN_INTERVAL_MS,
+    US_PER_MS,
+    DEFAULT_INTERVAL_US,
+    DEFAULT_RANDOM_INTERVAL_US,
+    DEFAULT_EXP_MEAN_INTERVAL_US,
     DEFAULT_HOLD_TIME_ENABLED,
-    DEFAULT_HOLD_TIME_MEAN_MS,
-    DEFAULT_HOLD_TIME_STD_MS,
+    DEFAULT_HOLD_TIME_MEAN_US,
+    DEFAULT_HOLD_TIME_STD_US,
     DEFAULT_DRIFT_ENABLED,
     DEFAULT_DRIFT_STEP_MIN,
     DEFAULT_DRIFT_STEP_MAX,
     DEFAULT_DRIFT_RESET_MIN,
     DEFAULT_DRIFT_RESET_MAX,
     DEFAULT_THINKING_PAUSE_ENABLED,
-    DEFAULT_THINKING_PAUSE_MEAN_MS,
-    DEFAULT_THINKING_PAUSE_STD_MS,
+    DEFAULT_THINKING_PAUSE_MEAN_US,
+    DEFAULT_THINKING_PAUSE_STD_US,
     DEFAULT_THINKING_PAUSE_MIN_CLICKS,
     DEFAULT_THINKING_PAUSE_MAX_CLICKS,
     DEFAULT_FATIGUE_ENABLED,
-    DEFAULT_FATIGUE_THRESHOLD_INTERVAL_MS,
-    DEFAULT_FATIGUE_DURATION_MS,
-    DEFAULT_FATIGUE_COOLDOWN_DURATION_MS,
-    DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_MS,
-    get_foreground_window_handle,
-    get_window_at_point,
+    DEFAULT_FATIGUE_THRESHOLD_INTERVAL_US,
+    DEFAULT_FATIGUE_DURATION_US,
+    DEFAULT_FATIGUE_COOLDOWN_DURATION_US,
+    DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_US,
     coerce_bool,
     safe_int,
 )
@@ -40,10 +51,18 @@ from .core import (
 UI_SCALE = 1.0
 MIN_FONT_SIZE = 10
 STATUS_UPDATE_INTERVAL_MS = 100
+ENGINE_JOIN_TIMEOUT_SEC = 2.0
 DEFAULT_WINDOW_WIDTH = 500
 DEFAULT_WINDOW_HEIGHT = 520
 MIN_WINDOW_WIDTH = 480
 MIN_WINDOW_HEIGHT = 520
+ADVANCED_CONFIG_KEYS = ENGINE_TUNING_KEYS + (
+    "pixel_condition", "template_target", "profiles", "schedule", "script", "keys", "control_address",
+    "metrics", "trace", "input_backend", "cursor_cache", "specialize", "theme_preload",
+    "profile_hotkeys", "verify_injection", "seed", "auto_pause",
+)
+# Display-only variables; writes to them are not setting changes.
+AUTOSAVE_IGNORED_VARS = ("status_var", "hk_hint_var", "preview_var")
 
 
 def ui(value, min_value=1):
@@ -60,6 +79,24 @@ FONT_BODY = ("Bahnschrift", font_size(12))
 FONT_SMALL = ("Bahnschrift", font_size(10))
 
 
+def ms_text(us):
+    # Durations are edited in milliseconds: 100000 -> "100", 250 -> "0.25".
+    return f"{us / US_PER_MS:g}"
+
+
+def us_from_ms_text(text):
+    # Text that doesn't parse is kept for engine_kwargs_from_config to reject.
+    try:
+        return round(float(text) * US_PER_MS)
+    except (TypeError, ValueError, OverflowError):
+        return text
+
+
+def int_from_text(text):
+    number = safe_int(text, None)
+    return text if number is None else number
+
+
 def resource_path(filename):
     base_dir = getattr(sys, "_MEIPASS", None)
     if base_dir:
@@ -140,15 +177,17 @@ class ToolTip:
 
 
 class App(tk.Tk):
-    def __init__(self):
+    def __init__(self, control_address=None, profile=None):
         super().__init__()
 
         self.theme_mode = "light"
         self.info_icon_labels = []
         self.info_icon_images = {}
 
+        # Read up front so only the theme that will be shown is loaded at startup.
+        config = read_config()
         self.init_theme()
-        self.apply_theme("dark")
+        self.apply_theme(config.get("theme", "Dark") if isinstance(config, dict) else "Dark")
 
         self.title("HumanAutoClicker v1.2")
         self.minsize(ui(MIN_WINDOW_WIDTH), ui(MIN_WINDOW_HEIGHT))
@@ -160,6 +199,25 @@ class App(tk.Tk):
             pass
 
         self.click_thread = None
+        self.layout = LayoutManager(self, self.update_tab_geometry)
+        self.advanced_config = {}
+        self.autosaver = AutoSaver()
+        self.autosaver.start()
+        self.autosave_pending = False
+        self.profile_store = ProfileStore(saver=self.autosaver)
+        self.preview_worker = PreviewWorker(self.on_preview_result)
+        self.preview_worker.start()
+        self.preview_key = None
+        self.profile_hotkeys = {}
+        self.profile_snapshots = {}
+        self.active_profile = None
+        self.scheduler = None
+        self.scheduled_session = None
+        self.control_server = None
+        self.metrics = None
+        self.metrics_exporter = None
+        self.profile_prefix = profile
+        self.profiler = None
         self.hotkey_listener = None
         self.is_recording_hotkey = None
 
@@ -171,6 +229,7 @@ class App(tk.Tk):
         self.hotkey_pick_var = tk.StringVar(value="F8")
         self.hold_to_click_var = tk.BooleanVar(value=False)
         self.background_click_var = tk.BooleanVar(value=False)
+        self.engine_process_var = tk.BooleanVar(value=False)
         self.hk_hint_var = tk.StringVar()
 
         self.hotkey_start_var.trace_add("write", self.update_hk_labels)
@@ -190,8 +249,19 @@ class App(tk.Tk):
 
         self.setup_hotkey_listener()
         self.protocol("WM_DELETE_WINDOW", self.on_close)
-
-        self.load_config()
+        # Hidden toggle for the sampling profiler.
+        self.bind("<Control-Alt-p>", self.toggle_profiling)
+
+        self.load_config(config)
+        self.autosaver.remember(get_config_path(), self.collect_config())
+        self.refresh_profile_snapshots(self.collect_config())
+        self.request_preview(self.collect_config())
+        self.watch_settings()
+        self.setup_scheduler()
+        self.setup_control_server(control_address or self.advanced_config.get("control_address"))
+        self.metrics, self.metrics_exporter = metrics_from_config(self.advanced_config.get("metrics"))
+        if coerce_bool(self.advanced_config.get("theme_preload", False)):
+            self.after_idle(self.preload_theme)
         self.update_hk_labels()
         self.toggle_timing_mode()
         self.toggle_repeat_entry()
@@ -245,6 +315,7 @@ class App(tk.Tk):
             except Exception:
                 pass
         elif self._theme_provider == "tcl":
+            self.load_theme_sprites(mode)
             try:
                 self.tk.call("ttk::style", "theme", "use", f"sun-valley-{mode}")
                 self.tk.call("event", "generate", ".", "<<ThemeChanged>>")
@@ -254,6 +325,23 @@ class App(tk.Tk):
         self.refresh_info_icons()
         self.refresh_logo()
 
+    def load_theme_sprites(self, mode):
+        # sv.tcl slices a theme's sprite sheet on first use; sv_ttk.set_theme does the same.
+        try:
+            if self._theme_provider == "sv_ttk":
+                load_theme = getattr(self.sv_ttk, "load_theme", None)
+                if load_theme:
+                    load_theme(mode, root=self)
+            elif self._theme_provider == "tcl":
+                self.tk.call("sv_load_theme", mode)
+        except Exception:
+            # Older theme scripts load both themes up front.
+            pass
+
+    def preload_theme(self):
+        # theme_preload: slice the hidden theme once the window is up, so the first toggle is instant.
+        self.load_theme_sprites("dark" if self.theme_mode == "light" else "light")
+
     def set_initial_geometry(self):
         self.update_tab_geometry()
 
@@ -270,9 +358,9 @@ class App(tk.Tk):
                 tab_req_height = tab_frame.winfo_reqheight()
                 tab_req_width = tab_frame.winfo_reqwidth()
                 if tab_req_height > 1:
-                    self.tabs.configure(height=tab_req_height)
+                    self.layout.set_option(self.tabs, "height", tab_req_height)
                 if tab_req_width > 1:
-                    self.tabs.configure(width=tab_req_width)
+                    self.layout.set_option(self.tabs, "width", tab_req_width)
         self.update_idletasks()
         req_width = self.main_container.winfo_reqwidth()
         req_height = self.main_container.winfo_reqheight()
@@ -389,14 +477,6 @@ class App(tk.Tk):
         combo.grid(row=0, column=combo_column, sticky="e")
         return combo
 
-    def set_row_visibility(self, frame, visible):
-        if not frame:
-            return
-        if visible:
-            frame.grid()
-        else:
-            frame.grid_remove()
-
     def create_header(self):
         self.header_frame = ttk.Frame(self.main_container)
         self.header_frame.grid(row=0, column=0, sticky="ew", pady=(0, ui(10)))
@@ -442,7 +522,7 @@ class App(tk.Tk):
     def create_tabs(self):
         self.tabs = ttk.Notebook(self.main_container)
         self.tabs.grid(row=1, column=0, sticky="nsew", pady=ui(4))
-        self.tabs.bind("<<NotebookTabChanged>>", self.update_tab_geometry)
+        self.tabs.bind("<<NotebookTabChanged>>", self.layout.request_geometry)
 
         self.tab_frames = []
         for name in ("Click", "Position", "Behavior", "Human"):
@@ -454,9 +534,9 @@ class App(tk.Tk):
         click_tab, position_tab, behavior_tab, human_tab = self.tab_frames
 
         timing_section = self.create_section(click_tab, "Timing", 0)
-        self.interval_var = tk.StringVar(value=str(DEFAULT_INTERVAL_MS))
+        self.interval_var = tk.StringVar(value=ms_text(DEFAULT_INTERVAL_US))
         self.interval_entry = self.add_labeled_entry(timing_section, 0, "Interval (ms)", self.interval_var)
-        self.random_interval_var = tk.StringVar(value=str(DEFAULT_RANDOM_INTERVAL_MS))
+        self.random_interval_var = tk.StringVar(value=ms_text(DEFAULT_RANDOM_INTERVAL_US))
         self.random_interval_entry = self.add_labeled_entry(
             timing_section,
             1,
@@ -474,7 +554,7 @@ class App(tk.Tk):
             help_text="Uniform uses the base interval. Exponential clusters clicks around the mean.",
         )
         self.timing_model_combo.bind("<<ComboboxSelected>>", self.toggle_timing_mode)
-        self.exp_mean_interval_var = tk.StringVar(value=str(DEFAULT_EXP_MEAN_INTERVAL_MS))
+        self.exp_mean_interval_var = tk.StringVar(value=ms_text(DEFAULT_EXP_MEAN_INTERVAL_US))
         self.exp_mean_interval_entry = self.add_labeled_entry(
             timing_section,
             3,
@@ -649,6 +729,22 @@ class App(tk.Tk):
         )
         self.theme_switch.grid(row=2, column=0, sticky="w", pady=ui(2))
 
+        engine_row = ttk.Frame(app_section)
+        engine_row.grid(row=3, column=0, sticky="ew", pady=ui(2))
+        engine_row.columnconfigure(0, weight=1)
+        self.engine_process_switch = ttk.Checkbutton(
+            engine_row,
+            text="Separate Engine Process",
+            variable=self.engine_process_var,
+            style=self.switch_style,
+        )
+        self.engine_process_switch.grid(row=0, column=0, sticky="w")
+        engine_help = self.add_info_icon(
+            engine_row,
+            "Runs the click engine in its own process so UI work can't delay clicks.",
+        )
+        engine_help.grid(row=0, column=1, sticky="e", padx=(ui(6), 0))
+
         human_section = self.create_section(human_tab, "Humanized Behavior", 0)
         human_row = ttk.Frame(human_section)
         human_row.grid(row=0, column=0, sticky="ew", pady=ui(2))
@@ -687,11 +783,11 @@ class App(tk.Tk):
         )
         hold_help.grid(row=0, column=1, sticky="e", padx=(ui(6), 0))
 
-        self.hold_time_mean_var = tk.StringVar(value=str(DEFAULT_HOLD_TIME_MEAN_MS))
+        self.hold_time_mean_var = tk.StringVar(value=ms_text(DEFAULT_HOLD_TIME_MEAN_US))
         self.hold_time_mean_entry = self.add_labeled_entry(hold_section, 1, "Mean (ms)", self.hold_time_mean_var, width=8)
         self.hold_time_mean_row = self.hold_time_mean_entry.master
 
-        self.hold_time_std_var = tk.StringVar(value=str(DEFAULT_HOLD_TIME_STD_MS))
+        self.hold_time_std_var = tk.StringVar(value=ms_text(DEFAULT_HOLD_TIME_STD_US))
         self.hold_time_std_entry = self.add_labeled_entry(hold_section, 2, "Std (ms)", self.hold_time_std_var, width=8)
         self.hold_time_std_row = self.hold_time_std_entry.master
 
@@ -757,11 +853,11 @@ class App(tk.Tk):
         )
         thinking_help.grid(row=0, column=1, sticky="e", padx=(ui(6), 0))
 
-        self.thinking_pause_mean_var = tk.StringVar(value=str(DEFAULT_THINKING_PAUSE_MEAN_MS))
+        self.thinking_pause_mean_var = tk.StringVar(value=ms_text(DEFAULT_THINKING_PAUSE_MEAN_US))
         self.thinking_pause_mean_entry = self.add_labeled_entry(thinking_section, 1, "Mean (ms)", self.thinking_pause_mean_var, width=8)
         self.thinking_pause_mean_row = self.thinking_pause_mean_entry.master
 
-        self.thinking_pause_std_var = tk.StringVar(value=str(DEFAULT_THINKING_PAUSE_STD_MS))
+        self.thinking_pause_std_var = tk.StringVar(value=ms_text(DEFAULT_THINKING_PAUSE_STD_US))
         self.thinking_pause_std_entry = self.add_labeled_entry(thinking_section, 2, "Std (ms)", self.thinking_pause_std_var, width=8)
         self.thinking_pause_std_row = self.thinking_pause_std_entry.master
 
@@ -796,7 +892,7 @@ class App(tk.Tk):
         )
         fatigue_help.grid(row=0, column=1, sticky="e", padx=(ui(6), 0))
 
-        self.fatigue_threshold_interval_var = tk.StringVar(value=str(DEFAULT_FATIGUE_THRESHOLD_INTERVAL_MS))
+        self.fatigue_threshold_interval_var = tk.StringVar(value=ms_text(DEFAULT_FATIGUE_THRESHOLD_INTERVAL_US))
         self.fatigue_threshold_interval_entry = self.add_labeled_entry(
             fatigue_section,
             1,
@@ -806,7 +902,7 @@ class App(tk.Tk):
         )
         self.fatigue_threshold_row = self.fatigue_threshold_interval_entry.master
 
-        self.fatigue_duration_var = tk.StringVar(value=str(DEFAULT_FATIGUE_DURATION_MS))
+        self.fatigue_duration_var = tk.StringVar(value=ms_text(DEFAULT_FATIGUE_DURATION_US))
         self.fatigue_duration_entry = self.add_labeled_entry(
             fatigue_section,
             2,
@@ -816,7 +912,7 @@ class App(tk.Tk):
         )
         self.fatigue_duration_row = self.fatigue_duration_entry.master
 
-        self.fatigue_cooldown_duration_var = tk.StringVar(value=str(DEFAULT_FATIGUE_COOLDOWN_DURATION_MS))
+        self.fatigue_cooldown_duration_var = tk.StringVar(value=ms_text(DEFAULT_FATIGUE_COOLDOWN_DURATION_US))
         self.fatigue_cooldown_duration_entry = self.add_labeled_entry(
             fatigue_section,
             3,
@@ -826,7 +922,7 @@ class App(tk.Tk):
         )
         self.fatigue_cooldown_row = self.fatigue_cooldown_duration_entry.master
 
-        self.fatigue_cooldown_min_interval_var = tk.StringVar(value=str(DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_MS))
+        self.fatigue_cooldown_min_interval_var = tk.StringVar(value=ms_text(DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_US))
         self.fatigue_cooldown_min_interval_entry = self.add_labeled_entry(
             fatigue_section,
             4,
@@ -857,6 +953,10 @@ class App(tk.Tk):
         self.stop_btn.grid(row=0, column=1, sticky="ew", padx=(ui(6), 0))
         self.stop_btn.configure(state="disabled")
 
+        self.preview_var = tk.StringVar()
+        self.preview_label = ttk.Label(self.control_frame, textvariable=self.preview_var, font=FONT_SMALL, anchor="w")
+        self.preview_label.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(ui(6), 0))
+
         self.status_var = tk.StringVar(value="Ready")
         self.status_bar = ttk.Label(
             self.main_container,
@@ -874,71 +974,43 @@ class App(tk.Tk):
         self.apply_theme(self.theme_var.get())
 
     def toggle_pos_inputs(self):
-        state = "disabled" if coerce_bool(self.current_pos_var.get()) else "normal"
-        self.pick_pos_btn.configure(state=state)
-        self.pos_x_entry.configure(state=state)
-        self.pos_y_entry.configure(state=state)
+        enabled = not coerce_bool(self.current_pos_var.get())
+        self.layout.set_state((self.pick_pos_btn, self.pos_x_entry, self.pos_y_entry), enabled)
 
     def toggle_timing_mode(self, _event=None):
         is_exp = self.timing_model_var.get() == "Exponential"
-        self.interval_entry.configure(state="disabled" if is_exp else "normal")
-        self.random_interval_entry.configure(state="disabled" if is_exp else "normal")
-        self.exp_mean_interval_entry.configure(state="normal" if is_exp else "disabled")
+        self.layout.set_state((self.interval_entry, self.random_interval_entry), not is_exp)
+        self.layout.set_state((self.exp_mean_interval_entry,), is_exp)
 
     def toggle_repeat_entry(self):
-        if self.repeat_mode_var.get() == "infinite":
-            self.repeat_entry.configure(state="disabled")
-        else:
-            self.repeat_entry.configure(state="normal")
-
-    def parse_int(self, value, min_value=None, allow_zero=True):
-        number = int(value)
-        if min_value is not None and number < min_value:
-            raise ValueError
-        if not allow_zero and number == 0:
-            raise ValueError
-        return number
+        self.layout.set_state((self.repeat_entry,), self.repeat_mode_var.get() != "infinite")
 
     def update_human_settings(self):
         human_enabled = coerce_bool(self.human_like_var.get())
-        hold_enabled = human_enabled and coerce_bool(self.hold_time_enabled_var.get())
-        hold_state = "normal" if hold_enabled else "disabled"
-        self.hold_time_mean_entry.configure(state=hold_state)
-        self.hold_time_std_entry.configure(state=hold_state)
-        self.set_row_visibility(self.hold_time_mean_row, hold_enabled)
-        self.set_row_visibility(self.hold_time_std_row, hold_enabled)
-
-        drift_enabled = human_enabled and coerce_bool(self.drift_enabled_var.get())
-        drift_state = "normal" if drift_enabled else "disabled"
-        self.drift_step_min_entry.configure(state=drift_state)
-        self.drift_step_max_entry.configure(state=drift_state)
-        self.drift_reset_min_entry.configure(state=drift_state)
-        self.drift_reset_max_entry.configure(state=drift_state)
-        self.set_row_visibility(self.drift_step_row, drift_enabled)
-        self.set_row_visibility(self.drift_reset_row, drift_enabled)
-
-        thinking_enabled = human_enabled and coerce_bool(self.thinking_pause_enabled_var.get())
-        thinking_state = "normal" if thinking_enabled else "disabled"
-        self.thinking_pause_mean_entry.configure(state=thinking_state)
-        self.thinking_pause_std_entry.configure(state=thinking_state)
-        self.thinking_pause_min_clicks_entry.configure(state=thinking_state)
-        self.thinking_pause_max_clicks_entry.configure(state=thinking_state)
-        self.set_row_visibility(self.thinking_pause_mean_row, thinking_enabled)
-        self.set_row_visibility(self.thinking_pause_std_row, thinking_enabled)
-        self.set_row_visibility(self.thinking_pause_clicks_row, thinking_enabled)
-
-        fatigue_enabled = human_enabled and coerce_bool(self.fatigue_enabled_var.get())
-        fatigue_state = "normal" if fatigue_enabled else "disabled"
-        self.fatigue_threshold_interval_entry.configure(state=fatigue_state)
-        self.fatigue_duration_entry.configure(state=fatigue_state)
-        self.fatigue_cooldown_duration_entry.configure(state=fatigue_state)
-        self.fatigue_cooldown_min_interval_entry.configure(state=fatigue_state)
-        self.set_row_visibility(self.fatigue_threshold_row, fatigue_enabled)
-        self.set_row_visibility(self.fatigue_duration_row, fatigue_enabled)
-        self.set_row_visibility(self.fatigue_cooldown_row, fatigue_enabled)
-        self.set_row_visibility(self.fatigue_cooldown_min_row, fatigue_enabled)
-
-        self.after(0, self.update_tab_geometry)
+        groups = (
+            (self.hold_time_enabled_var,
+             (self.hold_time_mean_entry, self.hold_time_std_entry),
+             (self.hold_time_mean_row, self.hold_time_std_row)),
+            (self.drift_enabled_var,
+             (self.drift_step_min_entry, self.drift_step_max_entry, self.drift_reset_min_entry, self.drift_reset_max_entry),
+             (self.drift_step_row, self.drift_reset_row)),
+            (self.thinking_pause_enabled_var,
+             (self.thinking_pause_mean_entry, self.thinking_pause_std_entry,
+              self.thinking_pause_min_clicks_entry, self.thinking_pause_max_clicks_entry),
+             (self.thinking_pause_mean_row, self.thinking_pause_std_row, self.thinking_pause_clicks_row)),
+            (self.fatigue_enabled_var,
+             (self.fatigue_threshold_interval_entry, self.fatigue_duration_entry,
+              self.fatigue_cooldown_duration_entry, self.fatigue_cooldown_min_interval_entry),
+             (self.fatigue_threshold_row, self.fatigue_duration_row, self.fatigue_cooldown_row, self.fatigue_cooldown_min_row)),
+        )
+        rows_changed = False
+        for var, entries, rows in groups:
+            enabled = human_enabled and coerce_bool(var.get())
+            self.layout.set_state(entries, enabled)
+            rows_changed = self.layout.apply_rows(rows, enabled) or rows_changed
+        # Only shown or hidden rows change the window's size.
+        if rows_changed:
+            self.layout.request_geometry()
 
     def update_hk_labels(self, *args):
         hk = self.hotkey_start_var.get()
@@ -961,13 +1033,7 @@ class App(tk.Tk):
         self.status_var.set(f"RECORDING: Press new key for {target}")
 
     def key_to_str(self, key):
-        try:
-            if hasattr(key, "char") and key.char:
-                return key.char.upper()
-            k_str = str(key).replace("Key.", "").upper()
-            return k_str
-        except:
-            return str(key).upper()
+        return key_name(key)
 
     def pick_location_mode(self):
         hk = self.hotkey_pick_var.get()
@@ -1003,6 +1069,9 @@ class App(tk.Tk):
                     mouse_pos = self.mouse_controller.position
                     self.after(0, lambda: self.set_picked_location(mouse_pos))
 
+                elif k_str in self.profile_hotkeys:
+                    self.switch_profile(self.profile_hotkeys[k_str])
+
             except Exception as e:
                 print(f"Hotkey Error: {e}")
 
@@ -1026,192 +1095,249 @@ class App(tk.Tk):
             self.status_var.set(f"Position set to {pos}")
 
     def is_clicking(self):
-        return self.click_thread and self.click_thread.running
+        # A session paused for the user's input still counts as clicking.
+        return self.click_thread and (self.click_thread.running or self.click_thread.paused)
     def start_clicking(self):
         if self.is_clicking():
             return
 
+        config = self.collect_config()
+        if coerce_bool(config.get("background_click_enabled")) and coerce_bool(config.get("use_current_pos")):
+            # Background clicks need a fixed point; take it from the cursor.
+            mouse_controller = getattr(self, "mouse_controller", None) or Controller()
+            pos_x, pos_y = mouse_controller.position
+            config.update(use_current_pos=False, pos_x=pos_x, pos_y=pos_y)
         try:
-            timing_mode = self.timing_model_var.get()
-            if timing_mode == "Exponential":
-                exp_mean_interval_ms = self.parse_int(self.exp_mean_interval_var.get(), min_value=1, allow_zero=False)
-                interval_ms = DEFAULT_INTERVAL_MS
-                rand_interval_ms = 0
-            else:
-                interval_ms = self.parse_int(self.interval_var.get(), min_value=1, allow_zero=False)
-                rand_interval_ms = self.parse_int(self.random_interval_var.get(), min_value=0, allow_zero=True)
-                exp_mean_interval_ms = DEFAULT_EXP_MEAN_INTERVAL_MS
-
-            click_limit = 0
-            if self.repeat_mode_var.get() == "limit":
-                click_limit = self.parse_int(self.repeat_limit_var.get(), min_value=1, allow_zero=False)
-
-            target_pos = None
-            rand_pos_offset = (0, 0)
-
-            if not self.current_pos_var.get():
-                try:
-                    px = int(self.pos_x_var.get())
-                    py = int(self.pos_y_var.get())
-                    target_pos = (px, py)
-                except ValueError:
-                    messagebox.showerror("Error", "Invalid Coordinate values")
-                    return
+            engine_kwargs = engine_kwargs_from_config(config)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid settings: {e} (durations are milliseconds, e.g. 0.25).")
+            return
+        self.launch_engine(engine_kwargs)
 
-            try:
-                ox = int(self.offset_x_var.get())
-                oy = int(self.offset_y_var.get())
-                rand_pos_offset = (ox, oy)
-            except ValueError:
-                pass
+    def launch_engine(self, engine_kwargs, session_name=None):
+        if self.click_thread and self.click_thread.is_alive():
+            self.click_thread.exit()
 
-            background_click_enabled = coerce_bool(self.background_click_var.get())
-            background_click_handle = None
-            if background_click_enabled:
-                if target_pos is None:
-                    mouse_controller = getattr(self, "mouse_controller", None) or Controller()
-                    target_pos = mouse_controller.position
-                target_x, target_y = target_pos
-                background_click_handle = get_window_at_point(target_x, target_y) or get_foreground_window_handle()
-                if not background_click_handle:
-                    messagebox.showerror(
-                        "Error",
-                        "Unable to detect a target window. Bring the target app to the front and try again.",
-                    )
-                    return
+        engine_cls = AutoClicker
+        if coerce_bool(self.engine_process_var.get()):
+            engine_cls = ProcessClicker
+
+        if self.metrics:
+            engine_kwargs = dict(engine_kwargs, metrics=self.metrics)
+        self.click_thread = engine_cls(app=self, **engine_kwargs)
+        self.click_thread.start()
+        self.click_thread.start_clicking()
+        self.scheduled_session = session_name
+        self.active_profile = None
+        if self.profile_prefix:
+            self.start_profiling()
+
+        self.start_btn.configure(state="disabled")
+        self.stop_btn.configure(state="normal")
+        hk = self.hotkey_start_var.get()
+        self.status_var.set(f"RUNNING... Press {hk} to Stop")
+
+    def setup_scheduler(self):
+        try:
+            sessions = parse_schedule(self.advanced_config.get("schedule"))
+        except (AttributeError, TypeError, ValueError) as e:
+            print(f"Invalid schedule: {e}")
+            return
+        if not sessions:
+            return
+        self.scheduler = SessionScheduler(
+            sessions,
+            on_start=lambda session: self.after(0, lambda: self.start_scheduled_session(session)),
+            on_stop=lambda session: self.after(0, lambda: self.stop_scheduled_session(session)),
+        )
+        self.scheduler.start()
+
+    def start_scheduled_session(self, session):
+        try:
+            self.start_session(session.profile, session.cps, session_name=session.name)
+        except (KeyError, ValueError) as e:
+            self.status_var.set(f"Schedule '{session.name}' failed: {e}")
+
+    def start_session(self, profile=None, cps=None, session_name=None):
+        if not profile and not cps:
+            self.start_clicking()
+            return
+        config = apply_cps(resolve_profile(self.collect_config(), profile, self.profile_store), cps)
+        self.launch_engine(engine_kwargs_from_config(config), session_name=session_name or profile)
+        self.active_profile = profile
+
+    def apply_config_updates(self, updates):
+        config = self.collect_config()
+        config.update(migrate_config(updates))
+        self.load_config(config)
+
+    def setup_control_server(self, address):
+        if not address:
+            return
+        try:
+            self.control_server = start_control_server(AppController(self), address)
+        except ValueError as e:
+            print(f"Invalid control address: {e}")
 
-            human_enabled = coerce_bool(self.human_like_var.get())
-            hold_time_enabled = human_enabled and coerce_bool(self.hold_time_enabled_var.get())
-            hold_time_mean_ms = DEFAULT_HOLD_TIME_MEAN_MS
-            hold_time_std_ms = DEFAULT_HOLD_TIME_STD_MS
-            if hold_time_enabled:
-                hold_time_mean_ms = self.parse_int(self.hold_time_mean_var.get(), min_value=1, allow_zero=False)
-                hold_time_std_ms = self.parse_int(self.hold_time_std_var.get(), min_value=0, allow_zero=True)
-
-            drift_enabled = human_enabled and coerce_bool(self.drift_enabled_var.get())
-            drift_step_min = DEFAULT_DRIFT_STEP_MIN
-            drift_step_max = DEFAULT_DRIFT_STEP_MAX
-            drift_reset_min = DEFAULT_DRIFT_RESET_MIN
-            drift_reset_max = DEFAULT_DRIFT_RESET_MAX
-            if drift_enabled:
-                drift_step_min = self.parse_int(self.drift_step_min_var.get())
-                drift_step_max = self.parse_int(self.drift_step_max_var.get())
-                drift_reset_min = self.parse_int(self.drift_reset_min_var.get())
-                drift_reset_max = self.parse_int(self.drift_reset_max_var.get())
-                if drift_step_min > drift_step_max or drift_reset_min > drift_reset_max:
-                    raise ValueError
-
-            thinking_pause_enabled = human_enabled and coerce_bool(self.thinking_pause_enabled_var.get())
-            thinking_pause_mean_ms = DEFAULT_THINKING_PAUSE_MEAN_MS
-            thinking_pause_std_ms = DEFAULT_THINKING_PAUSE_STD_MS
-            thinking_pause_min_clicks = DEFAULT_THINKING_PAUSE_MIN_CLICKS
-            thinking_pause_max_clicks = DEFAULT_THINKING_PAUSE_MAX_CLICKS
-            if thinking_pause_enabled:
-                thinking_pause_mean_ms = self.parse_int(self.thinking_pause_mean_var.get(), min_value=1, allow_zero=False)
-                thinking_pause_std_ms = self.parse_int(self.thinking_pause_std_var.get(), min_value=0, allow_zero=True)
-                thinking_pause_min_clicks = self.parse_int(self.thinking_pause_min_clicks_var.get(), min_value=1, allow_zero=False)
-                thinking_pause_max_clicks = self.parse_int(self.thinking_pause_max_clicks_var.get(), min_value=1, allow_zero=False)
-                if thinking_pause_max_clicks < thinking_pause_min_clicks:
-                    raise ValueError
-
-            fatigue_enabled = human_enabled and coerce_bool(self.fatigue_enabled_var.get())
-            fatigue_threshold_interval_ms = DEFAULT_FATIGUE_THRESHOLD_INTERVAL_MS
-            fatigue_duration_ms = DEFAULT_FATIGUE_DURATION_MS
-            fatigue_cooldown_duration_ms = DEFAULT_FATIGUE_COOLDOWN_DURATION_MS
-            fatigue_cooldown_min_interval_ms = DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_MS
-            if fatigue_enabled:
-                fatigue_threshold_interval_ms = self.parse_int(self.fatigue_threshold_interval_var.get(), min_value=1, allow_zero=False)
-                fatigue_duration_ms = self.parse_int(self.fatigue_duration_var.get(), min_value=1, allow_zero=False)
-                fatigue_cooldown_duration_ms = self.parse_int(self.fatigue_cooldown_duration_var.get(), min_value=1, allow_zero=False)
-                fatigue_cooldown_min_interval_ms = self.parse_int(self.fatigue_cooldown_min_interval_var.get(), min_value=1, allow_zero=False)
-
-            if self.click_thread and self.click_thread.is_alive():
-                self.click_thread.exit()
-
-            self.click_thread = AutoClicker(
-                interval_ms=interval_ms,
-                random_interval_ms=rand_interval_ms,
-                click_type=self.click_type_var.get(),
-                button=self.button_var.get(),
-                interval_mode=timing_mode,
-                exp_mean_interval_ms=exp_mean_interval_ms,
-                target_pos=target_pos,
-                random_pos_offset=rand_pos_offset,
-                click_limit=click_limit,
-                human_like=human_enabled,
-                hold_time_enabled=hold_time_enabled,
-                hold_time_mean_ms=hold_time_mean_ms,
-                hold_time_std_ms=hold_time_std_ms,
-                drift_enabled=drift_enabled,
-                drift_step_min=drift_step_min,
-                drift_step_max=drift_step_max,
-                drift_reset_min=drift_reset_min,
-                drift_reset_max=drift_reset_max,
-                thinking_pause_enabled=thinking_pause_enabled,
-                thinking_pause_mean_ms=thinking_pause_mean_ms,
-                thinking_pause_std_ms=thinking_pause_std_ms,
-                thinking_pause_min_clicks=thinking_pause_min_clicks,
-                thinking_pause_max_clicks=thinking_pause_max_clicks,
-                fatigue_enabled=fatigue_enabled,
-                fatigue_threshold_interval_ms=fatigue_threshold_interval_ms,
-                fatigue_duration_ms=fatigue_duration_ms,
-                fatigue_cooldown_duration_ms=fatigue_cooldown_duration_ms,
-                fatigue_cooldown_min_interval_ms=fatigue_cooldown_min_interval_ms,
-                background_click_enabled=background_click_enabled,
-                background_click_handle=background_click_handle,
-                app=self
-            )
-
-            self.click_thread.start()
-            self.click_thread.start_clicking()
-
-            self.start_btn.configure(state="disabled")
-            self.stop_btn.configure(state="normal")
-            hk = self.hotkey_start_var.get()
-            self.status_var.set(f"RUNNING... Press {hk} to Stop")
-
-        except ValueError:
-            messagebox.showerror("Error", "Invalid numeric input (use whole milliseconds).")
+    def stop_scheduled_session(self, session):
+        if self.scheduled_session == session.name and self.is_clicking():
+            self.stop_clicking_ui()
 
     def stop_clicking_ui(self):
+        self.scheduled_session = None
         if self.click_thread:
             self.click_thread.stop_clicking()
+        self.stop_profiling()
         self.start_btn.configure(state="normal")
         self.stop_btn.configure(state="disabled")
         self.status_var.set("Stopped")
 
     def update_status(self):
         if self.is_clicking():
-            msg = f"RUNNING... {self.click_thread.click_count}"
+            state = "PAUSED (user input)" if self.click_thread.paused else "RUNNING"
+            msg = f"{state}... {self.click_thread.click_count}"
             if self.click_thread.click_limit > 0:
                 msg += f" / {self.click_thread.click_limit}"
+            if self.active_profile:
+                msg += f" [{self.active_profile}]"
             self.status_var.set(msg)
 
     def status_updater(self):
         self.update_status()
         self.after(STATUS_UPDATE_INTERVAL_MS, self.status_updater)
 
+    def profiled_threads(self):
+        # A ProcessClicker's loop lives in another process; only the Tk and hotkey threads are sampled then.
+        engine = self.click_thread if isinstance(self.click_thread, threading.Thread) else None
+        return [threading.main_thread(), engine, self.hotkey_listener]
+
+    def start_profiling(self):
+        if not self.profiler:
+            self.profiler = start_profiler(self.profiled_threads)
+
+    def stop_profiling(self):
+        if self.profiler:
+            self.profiler.stop()
+            self.profiler.write(self.profile_prefix or DEFAULT_PROFILE_PREFIX)
+            self.profiler = None
+
+    def toggle_profiling(self, event=None):
+        if self.profile_prefix:
+            self.stop_profiling()
+            self.profile_prefix = None
+            self.status_var.set("Profiling off")
+            return
+        self.profile_prefix = DEFAULT_PROFILE_PREFIX
+        if self.is_clicking():
+            self.start_profiling()
+        self.status_var.set(f"Profiling sessions to {self.profile_prefix}.txt")
+
     def on_close(self):
+        self.stop_profiling()
+        if self.scheduler:
+            self.scheduler.stop()
+        if self.control_server:
+            self.control_server.stop()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
         if self.click_thread and self.click_thread.is_alive():
             self.click_thread.exit()
+            if self.metrics:
+                self.click_thread.join(ENGINE_JOIN_TIMEOUT_SEC)
+        if self.metrics and not (self.click_thread and self.click_thread.is_alive()):
+            self.metrics.close()
         if self.hotkey_listener:
             try:
                 self.hotkey_listener.stop()
             except:
                 pass
         self.save_config()
+        self.autosaver.stop()
+        self.preview_worker.stop()
         self.destroy()
 
-    def save_config(self):
+    def save_config(self, config=None):
+        self.autosaver.schedule(get_config_path(), config if config is not None else self.collect_config())
+
+    def watch_settings(self):
+        for name, value in vars(self).items():
+            if isinstance(value, tk.Variable) and name not in AUTOSAVE_IGNORED_VARS:
+                value.trace_add("write", self.request_autosave)
+
+    def request_autosave(self, *_args):
+        # A config load writes dozens of variables; collect once per idle cycle.
+        if self.autosave_pending:
+            return
+        self.autosave_pending = True
+        self.after_idle(self._autosave)
+
+    def _autosave(self):
+        self.autosave_pending = False
+        config = self.collect_config()
+        self.save_config(config)
+        self.refresh_profile_snapshots(config)
+        self.request_preview(config)
+
+    def request_preview(self, config):
+        # Cached settings show at once; others are simulated on the preview
+        # thread and shown when done, unless the settings changed meanwhile.
+        try:
+            key = preview_key(config)
+        except ValueError as exc:
+            self.preview_key = None
+            self.preview_var.set(format_preview({"error": str(exc)}))
+            return
+        if key == self.preview_key:
+            return
+        self.preview_key = key
+        self.preview_var.set(format_preview(self.preview_worker.request(key, config)))
+
+    def on_preview_result(self, key, result):
+        # Called on the preview thread; the window may already be gone.
+        try:
+            self.after(0, lambda: self.show_preview(key, result))
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def show_preview(self, key, result):
+        if key == self.preview_key:
+            self.preview_var.set(format_preview(result))
+
+    def save_profile(self, name, settings=None):
+        config = self.collect_config()
+        if settings is None:
+            settings = {key: value for key, value in config.items() if key not in ADVANCED_CONFIG_KEYS}
+        self.profile_store.put(name, settings)
+        self.refresh_profile_snapshots(config)
+
+    def refresh_profile_snapshots(self, config):
+        # Hotkey-bound profiles are parsed here, when settings change, so a
+        # switch never touches Tk variables.
+        self.profile_hotkeys = profile_hotkeys_from_config(config.get("profile_hotkeys")) or {}
+        self.profile_snapshots = profile_snapshots(config, set(self.profile_hotkeys.values()), self.profile_store)
+
+    def switch_profile(self, name):
+        # Called on the hotkey thread.
+        snapshot = self.profile_snapshots.get(name)
+        if snapshot is None:
+            return
+        engine = self.click_thread
+        if engine and (engine.running or engine.paused):
+            engine.switch_params(snapshot)
+            self.active_profile = name
+        else:
+            self.after(0, lambda: self.start_session(name))
+
+    def collect_config(self):
         config = {
-            "interval_ms": safe_int(self.interval_var.get(), DEFAULT_INTERVAL_MS),
-            "random_interval_ms": safe_int(self.random_interval_var.get(), DEFAULT_RANDOM_INTERVAL_MS),
+            "interval_us": us_from_ms_text(self.interval_var.get()),
+            "random_interval_us": us_from_ms_text(self.random_interval_var.get()),
             "timing_model": self.timing_model_var.get(),
-            "exp_mean_interval_ms": safe_int(self.exp_mean_interval_var.get(), DEFAULT_EXP_MEAN_INTERVAL_MS),
+            "exp_mean_interval_us": us_from_ms_text(self.exp_mean_interval_var.get()),
             "button": self.button_var.get(),
             "click_type": self.click_type_var.get(),
             "repeat_mode": self.repeat_mode_var.get(),
-            "repeat_limit": safe_int(self.repeat_limit_var.get(), 100),
+            "repeat_limit": int_from_text(self.repeat_limit_var.get()),
             "use_current_pos": self.current_pos_var.get(),
             "pos_x": self.pos_x_var.get(),
             "pos_y": self.pos_y_var.get(),
@@ -1221,73 +1347,47 @@ class App(tk.Tk):
             "theme": self.theme_var.get(),
             "human_like": self.human_like_var.get(),
             "hold_time_enabled": self.hold_time_enabled_var.get(),
-            "hold_time_mean_ms": safe_int(self.hold_time_mean_var.get(), DEFAULT_HOLD_TIME_MEAN_MS),
-            "hold_time_std_ms": safe_int(self.hold_time_std_var.get(), DEFAULT_HOLD_TIME_STD_MS),
+            "hold_time_mean_us": us_from_ms_text(self.hold_time_mean_var.get()),
+            "hold_time_std_us": us_from_ms_text(self.hold_time_std_var.get()),
             "drift_enabled": self.drift_enabled_var.get(),
-            "drift_step_min_px": safe_int(self.drift_step_min_var.get(), DEFAULT_DRIFT_STEP_MIN),
-            "drift_step_max_px": safe_int(self.drift_step_max_var.get(), DEFAULT_DRIFT_STEP_MAX),
-            "drift_reset_min_px": safe_int(self.drift_reset_min_var.get(), DEFAULT_DRIFT_RESET_MIN),
-            "drift_reset_max_px": safe_int(self.drift_reset_max_var.get(), DEFAULT_DRIFT_RESET_MAX),
+            "drift_step_min_px": int_from_text(self.drift_step_min_var.get()),
+            "drift_step_max_px": int_from_text(self.drift_step_max_var.get()),
+            "drift_reset_min_px": int_from_text(self.drift_reset_min_var.get()),
+            "drift_reset_max_px": int_from_text(self.drift_reset_max_var.get()),
             "thinking_pause_enabled": self.thinking_pause_enabled_var.get(),
-            "thinking_pause_mean_ms": safe_int(self.thinking_pause_mean_var.get(), DEFAULT_THINKING_PAUSE_MEAN_MS),
-            "thinking_pause_std_ms": safe_int(self.thinking_pause_std_var.get(), DEFAULT_THINKING_PAUSE_STD_MS),
-            "thinking_pause_min_clicks": safe_int(self.thinking_pause_min_clicks_var.get(), DEFAULT_THINKING_PAUSE_MIN_CLICKS),
-            "thinking_pause_max_clicks": safe_int(self.thinking_pause_max_clicks_var.get(), DEFAULT_THINKING_PAUSE_MAX_CLICKS),
+            "thinking_pause_mean_us": us_from_ms_text(self.thinking_pause_mean_var.get()),
+            "thinking_pause_std_us": us_from_ms_text(self.thinking_pause_std_var.get()),
+            "thinking_pause_min_clicks": int_from_text(self.thinking_pause_min_clicks_var.get()),
+            "thinking_pause_max_clicks": int_from_text(self.thinking_pause_max_clicks_var.get()),
             "fatigue_enabled": self.fatigue_enabled_var.get(),
-            "fatigue_threshold_interval_ms": safe_int(self.fatigue_threshold_interval_var.get(), DEFAULT_FATIGUE_THRESHOLD_INTERVAL_MS),
-            "fatigue_duration_ms": safe_int(self.fatigue_duration_var.get(), DEFAULT_FATIGUE_DURATION_MS),
-            "fatigue_cooldown_duration_ms": safe_int(self.fatigue_cooldown_duration_var.get(), DEFAULT_FATIGUE_COOLDOWN_DURATION_MS),
-            "fatigue_cooldown_min_interval_ms": safe_int(self.fatigue_cooldown_min_interval_var.get(), DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_MS),
+            "fatigue_threshold_interval_us": us_from_ms_text(self.fatigue_threshold_interval_var.get()),
+            "fatigue_duration_us": us_from_ms_text(self.fatigue_duration_var.get()),
+            "fatigue_cooldown_duration_us": us_from_ms_text(self.fatigue_cooldown_duration_var.get()),
+            "fatigue_cooldown_min_interval_us": us_from_ms_text(self.fatigue_cooldown_min_interval_var.get()),
             "background_click_enabled": self.background_click_var.get(),
+            "engine_process": self.engine_process_var.get(),
             "hotkey_start": self.hotkey_start_var.get(),
             "hotkey_pick": self.hotkey_pick_var.get(),
             "hold_to_click": self.hold_to_click_var.get()
         }
-        write_config(config)
+        config.update(self.advanced_config)
+        return config
 
-    def load_config(self):
+    def load_config(self, config=None):
         try:
-            config = read_config()
+            if config is None:
+                config = read_config()
             if not config:
                 return
 
-            interval_ms = config.get("interval_ms")
-            if interval_ms is None:
-                legacy_interval = config.get("interval")
-                if legacy_interval is not None:
-                    try:
-                        interval_ms = float(legacy_interval) * MS_PER_SEC
-                    except ValueError:
-                        interval_ms = DEFAULT_INTERVAL_MS
-            interval_ms = safe_int(interval_ms, DEFAULT_INTERVAL_MS)
-            self.interval_var.set(str(interval_ms))
-
-            random_interval_ms = config.get("random_interval_ms")
-            if random_interval_ms is None:
-                legacy_random = config.get("random_interval")
-                if legacy_random is not None:
-                    try:
-                        random_interval_ms = float(legacy_random) * MS_PER_SEC
-                    except ValueError:
-                        random_interval_ms = DEFAULT_RANDOM_INTERVAL_MS
-            random_interval_ms = safe_int(random_interval_ms, DEFAULT_RANDOM_INTERVAL_MS)
-            self.random_interval_var.set(str(random_interval_ms))
+            config = migrate_config(config)
+            self.interval_var.set(ms_text(safe_int(config.get("interval_us"), DEFAULT_INTERVAL_US)))
+            self.random_interval_var.set(ms_text(safe_int(config.get("random_interval_us"), DEFAULT_RANDOM_INTERVAL_US)))
             timing_model = config.get("timing_model", "Exponential")
             if timing_model not in ("Uniform", "Exponential"):
                 timing_model = "Exponential"
             self.timing_model_var.set(timing_model)
-            exp_mean_interval_ms = config.get("exp_mean_interval_ms")
-            if exp_mean_interval_ms is None:
-                legacy_lambda = config.get("lambda_rate")
-                if legacy_lambda is not None:
-                    try:
-                        legacy_lambda = float(legacy_lambda)
-                        if legacy_lambda > 0:
-                            exp_mean_interval_ms = MS_PER_SEC / legacy_lambda
-                    except ValueError:
-                        exp_mean_interval_ms = DEFAULT_EXP_MEAN_INTERVAL_MS
-            exp_mean_interval_ms = safe_int(exp_mean_interval_ms, DEFAULT_EXP_MEAN_INTERVAL_MS)
-            self.exp_mean_interval_var.set(str(exp_mean_interval_ms))
+            self.exp_mean_interval_var.set(ms_text(safe_int(config.get("exp_mean_interval_us"), DEFAULT_EXP_MEAN_INTERVAL_US)))
             button_val = config.get("button", "Left")
             if isinstance(button_val, str):
                 button_val = button_val.capitalize()
@@ -1318,8 +1418,8 @@ class App(tk.Tk):
 
             self.human_like_var.set(coerce_bool(config.get("human_like", True)))
             self.hold_time_enabled_var.set(coerce_bool(config.get("hold_time_enabled", DEFAULT_HOLD_TIME_ENABLED)))
-            self.hold_time_mean_var.set(str(safe_int(config.get("hold_time_mean_ms"), DEFAULT_HOLD_TIME_MEAN_MS)))
-            self.hold_time_std_var.set(str(safe_int(config.get("hold_time_std_ms"), DEFAULT_HOLD_TIME_STD_MS)))
+            self.hold_time_mean_var.set(ms_text(safe_int(config.get("hold_time_mean_us"), DEFAULT_HOLD_TIME_MEAN_US)))
+            self.hold_time_std_var.set(ms_text(safe_int(config.get("hold_time_std_us"), DEFAULT_HOLD_TIME_STD_US)))
 
             self.drift_enabled_var.set(coerce_bool(config.get("drift_enabled", DEFAULT_DRIFT_ENABLED)))
             self.drift_step_min_var.set(str(safe_int(config.get("drift_step_min_px"), DEFAULT_DRIFT_STEP_MIN)))
@@ -1328,17 +1428,19 @@ class App(tk.Tk):
             self.drift_reset_max_var.set(str(safe_int(config.get("drift_reset_max_px"), DEFAULT_DRIFT_RESET_MAX)))
 
             self.thinking_pause_enabled_var.set(coerce_bool(config.get("thinking_pause_enabled", DEFAULT_THINKING_PAUSE_ENABLED)))
-            self.thinking_pause_mean_var.set(str(safe_int(config.get("thinking_pause_mean_ms"), DEFAULT_THINKING_PAUSE_MEAN_MS)))
-            self.thinking_pause_std_var.set(str(safe_int(config.get("thinking_pause_std_ms"), DEFAULT_THINKING_PAUSE_STD_MS)))
+            self.thinking_pause_mean_var.set(ms_text(safe_int(config.get("thinking_pause_mean_us"), DEFAULT_THINKING_PAUSE_MEAN_US)))
+            self.thinking_pause_std_var.set(ms_text(safe_int(config.get("thinking_pause_std_us"), DEFAULT_THINKING_PAUSE_STD_US)))
             self.thinking_pause_min_clicks_var.set(str(safe_int(config.get("thinking_pause_min_clicks"), DEFAULT_THINKING_PAUSE_MIN_CLICKS)))
             self.thinking_pause_max_clicks_var.set(str(safe_int(config.get("thinking_pause_max_clicks"), DEFAULT_THINKING_PAUSE_MAX_CLICKS)))
 
             self.fatigue_enabled_var.set(coerce_bool(config.get("fatigue_enabled", DEFAULT_FATIGUE_ENABLED)))
-            self.fatigue_threshold_interval_var.set(str(safe_int(config.get("fatigue_threshold_interval_ms"), DEFAULT_FATIGUE_THRESHOLD_INTERVAL_MS)))
-            self.fatigue_duration_var.set(str(safe_int(config.get("fatigue_duration_ms"), DEFAULT_FATIGUE_DURATION_MS)))
-            self.fatigue_cooldown_duration_var.set(str(safe_int(config.get("fatigue_cooldown_duration_ms"), DEFAULT_FATIGUE_COOLDOWN_DURATION_MS)))
-            self.fatigue_cooldown_min_interval_var.set(str(safe_int(config.get("fatigue_cooldown_min_interval_ms"), DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_MS)))
+            self.fatigue_threshold_interval_var.set(ms_text(safe_int(config.get("fatigue_threshold_interval_us"), DEFAULT_FATIGUE_THRESHOLD_INTERVAL_US)))
+            self.fatigue_duration_var.set(ms_text(safe_int(config.get("fatigue_duration_us"), DEFAULT_FATIGUE_DURATION_US)))
+            self.fatigue_cooldown_duration_var.set(ms_text(safe_int(config.get("fatigue_cooldown_duration_us"), DEFAULT_FATIGUE_COOLDOWN_DURATION_US)))
+            self.fatigue_cooldown_min_interval_var.set(ms_text(safe_int(config.get("fatigue_cooldown_min_interval_us"), DEFAULT_FATIGUE_COOLDOWN_MIN_INTERVAL_US)))
             self.background_click_var.set(coerce_bool(config.get("background_click_enabled", False)))
+            self.engine_process_var.set(coerce_bool(config.get("engine_process", False)))
+            self.advanced_config = {key: config[key] for key in ADVANCED_CONFIG_KEYS if key in config}
             self.hotkey_start_var.set(config.get("hotkey_start", "F6"))
             self.hotkey_pick_var.set(config.get("hotkey_pick", "F8"))
             self.hold_to_click_var.set(coerce_bool(config.get("hold_to_click", False)))
@@ -0,0 +1,175 @@
+import math
+import threading
+import time
+from collections import deque
+
+from pynput.mouse import Listener
+
+DEFAULT_VERIFY_TIMEOUT_MS = 250
+VERIFY_POLL_SEC = 0.005
+VERIFY_READY_TIMEOUT_SEC = 0.5
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class InjectionVerifier:
+    # Loopback check of the input path: every press/release the engine issues
+    # is queued with its sequence number, time and position, and a mouse
+    # listener matches what the OS reports back, in order, per button and
+    # direction. Issued events not seen within timeout_ms count as dropped;
+    # observed events nobody issued (the user's own clicks) as extra.
+    def __init__(self, timeout_ms=DEFAULT_VERIFY_TIMEOUT_MS, clock=time.perf_counter, sleep=time.sleep,
+                 listener_factory=Listener):
+        self.timeout_sec = timeout_ms / 1000
+        self.clock = clock
+        self.sleep = sleep
+        self.listener_factory = listener_factory
+        self.listener = None
+        self.lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self):
+        # A separate engine process gets its own lock, listener and counters.
+        return {"timeout_sec": self.timeout_sec, "clock": self.clock, "sleep": self.sleep,
+                "listener_factory": self.listener_factory}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.listener = None
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.sequence = 0
+        self.pending = {}
+        self.last_issue = 0.0
+        self.latencies = []
+        self.position_errors = []
+        self.dropped = 0
+        self.extra = 0
+
+    def wrap(self, name, call):
+        # Same shape as the backend methods: press/release(button, x, y), click(button, x, y, count).
+        if name == "_click_button":
+            def verified_click(button, x, y, count):
+                for _ in range(count):
+                    self.issue(button, True, x, y)
+                    self.issue(button, False, x, y)
+                return call(button, x, y, count)
+            return verified_click
+        pressed = name == "_press_button"
+
+        def verified(button, x, y):
+            self.issue(button, pressed, x, y)
+            return call(button, x, y)
+        return verified
+
+    def issue(self, button, pressed, x, y):
+        now = self.clock()
+        with self.lock:
+            self.sequence += 1
+            self.pending.setdefault((button, pressed), deque()).append((self.sequence, now, x, y))
+            self.last_issue = now
+
+    def _expire(self, now):
+        for queue in self.pending.values():
+            while queue and now - queue[0][1] > self.timeout_sec:
+                queue.popleft()
+                self.dropped += 1
+
+    def on_click(self, x, y, button, pressed):
+        now = self.clock()
+        with self.lock:
+            self._expire(now)
+            queue = self.pending.get((button, pressed))
+            if not queue:
+                self.extra += 1
+                return
+            _sequence, issued_at, issued_x, issued_y = queue.popleft()
+            self.latencies.append(now - issued_at)
+            self.position_errors.append(math.hypot(x - issued_x, y - issued_y))
+
+    def outstanding(self):
+        with self.lock:
+            return sum(len(queue) for queue in self.pending.values())
+
+    def start(self):
+        self.stop()
+        self.reset()
+        try:
+            self.listener = self.listener_factory(on_click=self.on_click)
+            self.listener.start()
+            # Events issued before the listener is hooked in would count as dropped.
+            ready = threading.Thread(target=getattr(self.listener, "wait", lambda: None), daemon=True)
+            ready.start()
+            ready.join(VERIFY_READY_TIMEOUT_SEC)
+        except Exception as exc:
+            print(f"Injection verifier unavailable: {exc}")
+            self.listener = None
+
+    def stop(self):
+        if self.listener:
+            try:
+                self.listener.stop()
+            except Exception:
+                pass
+            self.listener = None
+
+    def finish(self):
+        # Called on the click thread after a session: waits out events still in
+        # flight, then reports.
+        if not self.listener:
+            return None
+        deadline = self.last_issue + self.timeout_sec
+        while self.outstanding() and self.clock() < deadline:
+            self.sleep(VERIFY_POLL_SEC)
+        self.stop()
+        with self.lock:
+            self._expire(float("inf"))
+        report = self.report()
+        print(format_verify_report(report))
+        return report
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        errors = sorted(self.position_errors)
+        report = {"issued": self.sequence, "observed": len(latencies), "dropped": self.dropped, "extra": self.extra}
+        if latencies:
+            report.update({
+                "latency_p50_us": _percentile(latencies, 0.5) * 1_000_000,
+                "latency_p99_us": _percentile(latencies, 0.99) * 1_000_000,
+                "latency_max_us": latencies[-1] * 1_000_000,
+                "position_error_mean_px": sum(errors) / len(errors),
+                "position_error_max_px": errors[-1],
+            })
+        return report
+
+
+def format_verify_report(report):
+    line = (f"Injection check: {report['issued']} issued, {report['observed']} observed, "
+            f"{report['dropped']} dropped, {report['extra']} extra")
+    if report["observed"]:
+        line += (f"; latency p50={report['latency_p50_us']:.0f} us p99={report['latency_p99_us']:.0f} us "
+                 f"max={report['latency_max_us']:.0f} us; position error mean={report['position_error_mean_px']:.2f} px "
+                 f"max={report['position_error_max_px']:.2f} px")
+    return line
+
+
+def verifier_from_config(config):
+    # true, or {"timeout_ms": 250}.
+    if not config:
+        return None
+    if config is True:
+        return InjectionVerifier()
+    if not isinstance(config, dict):
+        print("Invalid verify_injection config: expected true or an object")
+        return None
+    if not config.get("enabled", True):
+        return None
+    try:
+        return InjectionVerifier(timeout_ms=float(config.get("timeout_ms", DEFAULT_VERIFY_TIMEOUT_MS)))
+    except (TypeError, ValueError) as exc:
+        print(f"Invalid verify_injection config: {exc}")
+        return None
@@ -1,6 +1,46 @@
+import datetime
+import json
 import random
+import os
+import socket
+import stat
+import tempfile
+import threading
+import time
+import tkinter
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-from autoclicker.core import AutoClicker, MS_PER_SEC, ms_to_sec
+from PIL import Image, ImageFilter
+from pynput.mouse import Button
+
+from autoclicker import backends
+from autoclicker.backends import (BACKENDS, CAP_MOVE, InputBackend, XTestBackend, auto_backend_name, available_backends,
+                                  backend_from_config, create_backend, get_backend_results_path, read_backend_results,
+                                  register_backend, write_backend_results)
+from autoclicker.config import AutoSaver, migrate_config, write_atomic
+from autoclicker.control import ControlServer, parse_control_address
+from autoclicker.core import AutoClicker, DEFAULT_INTERVAL_US, MS_PER_SEC, ms_to_sec
+from autoclicker.keys import parse_key, parse_key_combo
+from autoclicker.layout import LayoutManager
+from autoclicker.locate import TemplateLocator
+from autoclicker.metrics import EngineMetrics, MetricsHTTPExporter, TextfileExporter, metrics_from_config, write_textfile
+from autoclicker.pixel import PIXEL_MODE_DIFFER, PixelCondition, PixelWatcher
+from autoclicker.preview import PreviewWorker, format_preview, preview_key
+from autoclicker.process import ProcessClicker, SharedStats
+from autoclicker.profiler import start_profiler
+from autoclicker.profiles import ProfileStore
+from autoclicker.schedule import MAX_WAIT_SEC, SessionScheduler, parse_schedule
+from autoclicker.script import OP_LOOP, OP_MOVE, OP_WAIT, OP_WAIT_UNIFORM, compile_script, parse_script
+from autoclicker.session import (HeadlessSession, SessionController, _run_headless, app_hotkeys, apply_cps,
+                                 engine_kwargs_from_config, profile_hotkeys_from_config, profile_snapshot,
+                                 resolve_profile)
+from autoclicker.streams import CounterRandom, RandomStreams, stream_key
+from autoclicker.takeover import takeover_from_config
+from autoclicker.sweep import CHECKPOINT_SUFFIX, grid_points, parse_axis, run_sweep, simulate
+from autoclicker.trace import Tracer
+from autoclicker.verify import InjectionVerifier, verifier_from_config
+from autoclicker.tuning import apply_thread_tuning, normalize_tuning, spin_sleeper
 
 
 class FakeClock:
@@ -33,6 +73,17 @@ class FakeMouse:
         self.release_count += count
 
 
+class FakeKeyboard:
+    def __init__(self):
+        self.events = []
+
+    def press(self, key):
+        self.events.append(("press", key))
+
+    def release(self, key):
+        self.events.append(("release", key))
+
+
 class FakeBackgroundClicker:
     def __init__(self):
         self.press_calls = 0
@@ -51,6 +102,178 @@ class FakeBackgroundClicker:
         self.coords.append((x, y))
 
 
+class RecordingBackend(InputBackend):
+    name = "recording"
+    capabilities = frozenset({CAP_MOVE})
+
+    def __init__(self):
+        self.events = []
+
+    def press(self, button, x, y):
+        self.events.append(("press", x, y))
+
+    def release(self, button, x, y):
+        self.events.append(("release", x, y))
+
+    def move(self, x, y):
+        self.events.append(("move", x, y))
+
+
+class FakeXlib:
+    # Stands in for libX11 and libXtst, logging calls in order.
+    def __init__(self):
+        self.calls = []
+
+    def XOpenDisplay(self, name):
+        return 1
+
+    def XCloseDisplay(self, display):
+        self.calls.append(("close",))
+
+    def XFlush(self, display):
+        self.calls.append(("flush",))
+
+    def XTestFakeButtonEvent(self, display, button, is_press, delay):
+        self.calls.append(("button", button, is_press))
+
+    def XTestFakeMotionEvent(self, display, screen, x, y, delay):
+        self.calls.append(("motion", x, y))
+
+
+class FakeListener:
+    def __init__(self, on_move):
+        self.on_move = on_move
+        self.alive = False
+
+    def start(self):
+        self.alive = True
+
+    def stop(self):
+        self.alive = False
+
+    def is_alive(self):
+        return self.alive
+
+
+class FakeInputListener:
+    # Mouse or keyboard listener; tests call its callbacks directly.
+    def __init__(self, **callbacks):
+        self.__dict__.update(callbacks)
+        self.alive = False
+
+    def start(self):
+        self.alive = True
+
+    def stop(self):
+        self.alive = False
+
+
+class FakeWidget:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def configure(self, **options):
+        self.calls.append(("configure", self, options))
+
+    def grid(self):
+        self.calls.append(("grid", self))
+
+    def grid_remove(self):
+        self.calls.append(("grid_remove", self))
+
+
+class FakeIdleRoot:
+    def __init__(self):
+        self.idle = []
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def run_idle(self):
+        idle, self.idle = self.idle, []
+        for callback in idle:
+            callback()
+
+
+class FakeClickListener(FakeListener):
+    def __init__(self, on_click):
+        super().__init__(on_move=None)
+        self.on_click = on_click
+
+
+class LoopbackBackend(RecordingBackend):
+    # Reports each event back to the verifier's listener 2 ms later and 1 px
+    # off, and loses every fourth release.
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+        self.verifier = None
+        self.releases = 0
+
+    def press(self, button, x, y):
+        self.clock.sleep(0.002)
+        self.verifier.listener.on_click(x + 1, y, button, True)
+
+    def release(self, button, x, y):
+        self.releases += 1
+        if self.releases % 4:
+            self.clock.sleep(0.002)
+            self.verifier.listener.on_click(x + 1, y, button, False)
+
+
+class FakeFrameSource:
+    def __init__(self, color):
+        self.color = color
+        self.bboxes = []
+
+    def grab(self, bbox):
+        self.bboxes.append(bbox)
+        left, top, right, bottom = bbox
+        return Image.new("RGB", (right - left, bottom - top), self.color)
+
+
+class FakeScreen:
+    def __init__(self, image):
+        self.image = image
+        self.bboxes = []
+
+    def grab(self, bbox):
+        self.bboxes.append(bbox)
+        return self.image if bbox is None else self.image.crop(bbox)
+
+
+class FakeEngine:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.click_limit = kwargs["click_limit"]
+        self.click_count = 0
+        self.running = False
+        self.paused = False
+        self.daemon = False
+
+    def start(self):
+        pass
+
+    def start_clicking(self):
+        self.running = True
+        self.click_count = 5
+
+    def exit(self):
+        self.running = False
+
+
+def make_template(size, seed=3):
+    random.seed(seed)
+    noise = Image.effect_noise(size, 100).filter(ImageFilter.GaussianBlur(2))
+    return noise.point(lambda value: max(0, min(255, (value - 128) * 8 + 128)))
+
+
+def make_screen(template, pos, size=(320, 200)):
+    screen = Image.new("L", size, 90)
+    screen.paste(template, pos)
+    return screen
+
+
 class FastHoldClicker(AutoClicker):
     def _sample_hold_time(self):
         return ms_to_sec(1)
@@ -76,8 +299,8 @@ class TraceRandom(random.Random):
         return super().gauss(mu, sigma)
 
 
-def build_clicker(clicker_cls=AutoClicker, max_clicks=8, seed=7, rand=None, **overrides):
-    clock = FakeClock()
+def build_clicker(clicker_cls=AutoClicker, max_clicks=8, seed=7, rand=None, clock=None, **overrides):
+    clock = clock if clock else FakeClock()
     sleep_log = []
     clicker_ref = {}
 
@@ -90,8 +313,8 @@ def build_clicker(clicker_cls=AutoClicker, max_clicks=8, seed=7, rand=None, **ov
             clicker.program_running = False
 
     params = {
-        "interval_ms": 10,
-        "random_interval_ms": 0,
+        "interval_us": 10000,
+        "random_interval_us": 0,
         "click_type": "single",
         "button": "left",
         "interval_mode": "Uniform",
@@ -135,8 +358,8 @@ def test_thinking_pause_toggle():
     clicker_off, sleeps_off = build_clicker(
         max_clicks=6,
         thinking_pause_enabled=False,
-        thinking_pause_mean_ms=4000,
-        thinking_pause_std_ms=0,
+        thinking_pause_mean_us=4000000,
+        thinking_pause_std_us=0,
         thinking_pause_min_clicks=2,
         thinking_pause_max_clicks=2,
         fatigue_enabled=False,
@@ -147,8 +370,8 @@ def test_thinking_pause_toggle():
     clicker_on, sleeps_on = build_clicker(
         max_clicks=6,
         thinking_pause_enabled=True,
-        thinking_pause_mean_ms=4000,
-        thinking_pause_std_ms=0,
+        thinking_pause_mean_us=4000000,
+        thinking_pause_std_us=0,
         thinking_pause_min_clicks=2,
         thinking_pause_max_clicks=2,
         fatigue_enabled=False,
@@ -161,12 +384,12 @@ def test_fatigue_toggle():
     clicker_on, sleeps_on = build_clicker(
         clicker_cls=FastHoldClicker,
         max_clicks=40,
-        interval_ms=10,
+        interval_us=10000,
         fatigue_enabled=True,
-        fatigue_threshold_interval_ms=100,
-        fatigue_duration_ms=200,
-        fatigue_cooldown_duration_ms=500,
-        fatigue_cooldown_min_interval_ms=500,
+        fatigue_threshold_interval_us=100000,
+        fatigue_duration_us=200000,
+        fatigue_cooldown_duration_us=500000,
+        fatigue_cooldown_min_interval_us=500000,
         thinking_pause_enabled=False,
     )
     run_clicker(clicker_on)
@@ -175,12 +398,12 @@ def test_fatigue_toggle():
     clicker_off, sleeps_off = build_clicker(
         clicker_cls=FastHoldClicker,
         max_clicks=40,
-        interval_ms=10,
+        interval_us=10000,
         fatigue_enabled=False,
-        fatigue_threshold_interval_ms=100,
-        fatigue_duration_ms=200,
-        fatigue_cooldown_duration_ms=500,
-        fatigue_cooldown_min_interval_ms=500,
+        fatigue_threshold_interval_us=100000,
+        fatigue_duration_us=200000,
+        fatigue_cooldown_duration_us=500000,
+        fatigue_cooldown_min_interval_us=500000,
         thinking_pause_enabled=False,
     )
     run_clicker(clicker_off)
@@ -191,8 +414,8 @@ def test_hold_time_toggle():
     clicker_on, _ = build_clicker(
         max_clicks=5,
         hold_time_enabled=True,
-        hold_time_mean_ms=150,
-        hold_time_std_ms=0,
+        hold_time_mean_us=150000,
+        hold_time_std_us=0,
         thinking_pause_enabled=False,
         fatigue_enabled=False,
     )
@@ -258,6 +481,1061 @@ def test_background_clicker_usage():
         raise AssertionError("Background clicker: expected no mouse interactions")
 
 
+def test_shared_stats_recording():
+    stats = SharedStats()
+    try:
+        clicker, _ = build_clicker(max_clicks=4, human_like=False, stats=stats)
+        run_clicker(clicker)
+        snapshot = stats.snapshot()
+        if snapshot["click_count"] != 4:
+            raise AssertionError(f"Shared stats: expected 4 clicks, got {snapshot['click_count']}")
+        if snapshot["sleep_samples"] != 3 or sum(snapshot["histogram"]) != 3:
+            raise AssertionError("Shared stats: expected one sleep sample per interval")
+        if snapshot["running"]:
+            raise AssertionError("Shared stats: expected stopped after click limit")
+    finally:
+        stats.close()
+
+
+def test_process_clicker_limit():
+    clicker = ProcessClicker(
+        interval_us=1000,
+        random_interval_us=0,
+        click_type="single",
+        button="left",
+        interval_mode="Uniform",
+        click_limit=3,
+        mouse=FakeMouse(),
+    )
+    try:
+        clicker.start()
+        clicker.start_clicking()
+        deadline = time.monotonic() + 5.0
+        while clicker.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if clicker.running or clicker.click_count != 3:
+            raise AssertionError(f"Process clicker: expected stop at 3 clicks, got {clicker.click_count}")
+    finally:
+        clicker.exit()
+
+    class RecordingApp:
+        def __init__(self):
+            self.stopped = threading.Event()
+
+        def after(self, delay_ms, callback):
+            callback()
+
+        def stop_clicking_ui(self):
+            self.stopped.set()
+
+    app = RecordingApp()
+    clicker = ProcessClicker(
+        app=app,
+        interval_us=1000,
+        random_interval_us=0,
+        click_type="single",
+        button="left",
+        interval_mode="Uniform",
+        click_limit=2,
+        mouse=FakeMouse(),
+    )
+    try:
+        clicker.start()
+        clicker.start_clicking()
+        if not app.stopped.wait(5.0):
+            raise AssertionError("Process clicker: child stop was not forwarded to the app")
+    finally:
+        clicker.exit()
+
+
+def test_thread_tuning_fallback():
+    tuning = normalize_tuning({"cpu_affinity": ["1", 0, -3], "sched_priority": "bogus", "timer_slack_ns": "x"})
+    if tuning != {"cpu_affinity": [0, 1]}:
+        raise AssertionError(f"Thread tuning: unexpected normalized config {tuning}")
+    if apply_thread_tuning() != {}:
+        raise AssertionError("Thread tuning: expected no-op without settings")
+    status = apply_thread_tuning(cpu_affinity=[1 << 20])
+    if status.get("cpu_affinity") is not False:
+        raise AssertionError("Thread tuning: expected unavailable CPU to fall back cleanly")
+
+
+def test_pixel_condition_gate():
+    grey = (128, 128, 128)
+    source = FakeFrameSource((130, 126, 129))
+    condition = PixelCondition((10, 20, 4, 3), grey, tolerance=5, frame_source=source)
+    if not condition.satisfied() or source.bboxes[-1] != (10, 20, 14, 23):
+        raise AssertionError("Pixel condition: expected match within tolerance on the bounding box")
+    source.color = (140, 128, 128)
+    if condition.satisfied():
+        raise AssertionError("Pixel condition: expected mismatch outside tolerance")
+    grabs = len(source.bboxes)
+    watcher = PixelWatcher(condition)
+    if len(source.bboxes) != grabs or watcher.satisfied:
+        raise AssertionError("Pixel condition: expected the watcher to take its first sample on its own thread")
+
+    until_grey = PixelCondition((5, 5), grey, mode=PIXEL_MODE_DIFFER, stop_when_unsatisfied=True,
+                                frame_source=FakeFrameSource((0, 200, 0)))
+    clicker_on, _ = build_clicker(max_clicks=4, human_like=False, pixel_condition=until_grey)
+    run_clicker(clicker_on)
+    if clicker_on.click_count != 4:
+        raise AssertionError("Pixel condition: expected clicks while the region differs")
+
+    until_grey.frame_source.color = grey
+    clicker_off, _ = build_clicker(max_clicks=0, human_like=False, pixel_condition=until_grey)
+    run_clicker(clicker_off)
+    if clicker_off.click_count != 0 or clicker_off.running:
+        raise AssertionError("Pixel condition: expected stop once the region turns grey")
+
+
+def test_template_locator():
+    template = make_template((32, 24))
+    screen = FakeScreen(make_screen(template, (203, 117)))
+    locator = TemplateLocator(template, frame_source=screen)
+    if locator.locate() != (219, 129) or locator.full_searches != 1:
+        raise AssertionError("Template locator: expected full search to find the template center")
+    if locator.locate() != (219, 129) or locator.roi_hits != 1 or screen.bboxes[-1] is None:
+        raise AssertionError("Template locator: expected cached ROI hit without a full-screen grab")
+
+    screen.image = make_screen(template, (41, 150))
+    if locator.locate() != (57, 162) or locator.full_searches != 2:
+        raise AssertionError("Template locator: expected ROI miss to fall back to a full search")
+
+    screen.image = Image.new("L", (320, 200), 90)
+    if locator.locate() is not None or locator.locate() is not None or locator.hash_skips != 1:
+        raise AssertionError("Template locator: expected unchanged frame hash to skip the full search")
+
+    # Two copies tie for the minimum; either one is a real match.
+    twice = make_screen(template, (40, 148))
+    twice.paste(template, (248, 20))
+    screen.image = twice
+    locator = TemplateLocator(template, frame_source=screen)
+    if locator.locate() not in ((56, 160), (264, 32)):
+        raise AssertionError("Template locator: expected one of two identical targets to be found")
+
+    screen.image = make_screen(template, (100, 60))
+    clicker, _ = build_clicker(max_clicks=2, human_like=False, target_locator=TemplateLocator(template, frame_source=screen))
+    run_clicker(clicker)
+    if clicker.mouse.position != (116, 72):
+        raise AssertionError(f"Template locator: expected clicks on the match, got {clicker.mouse.position}")
+
+
+def test_scheduled_sessions():
+    wall = {"now": datetime.datetime(2026, 3, 2, 9, 10).timestamp()}
+    events = []
+    sessions = parse_schedule([
+        {"name": "A", "profile": "A", "start": "09:00", "end": "09:30", "cps": 8},
+        {"name": "B", "profile": "B", "every": "2h", "duration": "5m"},
+    ])
+    scheduler = SessionScheduler(
+        sessions,
+        on_start=lambda session: events.append(("start", session.name)),
+        on_stop=lambda session: events.append(("stop", session.name)),
+        wall_clock=lambda: wall["now"],
+    )
+    scheduler.rebuild()
+    if events != [("start", "A")] or len(scheduler.heap) != 2:
+        raise AssertionError(f"Schedule: expected A active at 09:10, got {events}")
+    next_fire = datetime.datetime(2026, 3, 2, 9, 30).timestamp()
+    if abs(scheduler.next_timeout() - min(MAX_WAIT_SEC, next_fire - wall["now"])) > 1e-6:
+        raise AssertionError("Schedule: expected a single wait until the earliest deadline")
+
+    wall["now"] = datetime.datetime(2026, 3, 2, 10, 1).timestamp()
+    scheduler.fire_due()
+    if events[1:] != [("stop", "A"), ("start", "B")]:
+        raise AssertionError(f"Schedule: expected A to stop and B to start, got {events}")
+
+    # Resume from suspend the next morning: deadlines are stale, state is re-derived.
+    wall["now"] = datetime.datetime(2026, 3, 3, 9, 15).timestamp()
+    events.clear()
+    scheduler.rebuild()
+    if sorted(events) != [("start", "A"), ("stop", "B")]:
+        raise AssertionError(f"Schedule: expected reconcile after clock jump, got {events}")
+
+    # A period that doesn't divide the day restarts from start each day.
+    short, wide = parse_schedule([{"start": "00:00", "every": "7h", "duration": "1h"},
+                                  {"start": "00:00", "every": "7h", "duration": "5h"}])
+
+    def at(day, hour, minute=0):
+        return datetime.datetime(2026, 3, day, hour, minute).timestamp()
+    cases = [
+        (short, at(2, 0, 30), (at(2, 0), at(2, 1))),
+        (short, at(2, 5), (at(2, 7), at(2, 8))),
+        (short, at(2, 21, 30), (at(2, 21), at(2, 22))),
+        (short, at(2, 22, 30), (at(3, 0), at(3, 1))),
+        (wide, at(2, 23, 30), (at(2, 21), at(3, 0))),
+        (wide, at(3, 0, 10), (at(3, 0), at(3, 5))),
+    ]
+    for session, now, expected in cases:
+        if session.window_at(now) != expected:
+            raise AssertionError(f"Schedule: expected 7h windows from each day's start, got {session.window_at(now)}")
+
+
+def test_engine_kwargs_from_config():
+    config = {
+        "timing_model": "Uniform",
+        "interval_us": "40000",
+        "human_like": False,
+        "fatigue_enabled": True,
+        "use_current_pos": False,
+        "pos_x": "12",
+        "pos_y": 34,
+        "profiles": {"fast": {"click_type": "double", "repeat_mode": "limit", "repeat_limit": 7}},
+    }
+    kwargs = engine_kwargs_from_config(apply_cps(resolve_profile(config, "fast"), 20))
+    if kwargs["interval_us"] != 50000 or kwargs["click_type"] != "Double" or kwargs["click_limit"] != 7:
+        raise AssertionError(f"Engine kwargs: unexpected profile/cps result {kwargs}")
+    if kwargs["fatigue_enabled"] or kwargs["target_pos"] != (12, 34):
+        raise AssertionError("Engine kwargs: humanization must follow human_like and position must parse")
+    AutoClicker(**kwargs, mouse=FakeMouse())
+    for key, kwarg in (("trace", "tracer"), ("pixel_condition", "pixel_condition"), ("template_target", "target_locator")):
+        if engine_kwargs_from_config({key: True})[kwarg] or engine_kwargs_from_config({key: "out.json"})[kwarg]:
+            raise AssertionError(f"Engine kwargs: expected a non-object {key} to be ignored")
+    rejected = ({"pos_x": "abc"}, {"pos_y": ""}, {"timing_model": "Uniform", "interval_us": 0},
+                {"timing_model": "Uniform", "interval_us": "abc"}, {"exp_mean_interval_us": 0},
+                {"repeat_mode": "limit", "repeat_limit": "zz"}, {"hold_time_enabled": True, "hold_time_std_us": -5000})
+    for bad in rejected:
+        try:
+            engine_kwargs_from_config(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"Engine kwargs: expected {bad} to be rejected")
+    if engine_kwargs_from_config({"interval_us": 0, "human_like": False, "hold_time_mean_us": "x"})["interval_us"] != DEFAULT_INTERVAL_US:
+        raise AssertionError("Engine kwargs: expected fields the session doesn't use to fall back to defaults")
+    bad_configs = ({"schedule": [{"every": "soon"}]}, {"background_click_enabled": True, "use_current_pos": True},
+                   {"pos_x": "abc"})
+    if any(_run_headless(bad, None, HeadlessSession(engine_factory=FakeEngine)) != 1 for bad in bad_configs):
+        raise AssertionError("Engine kwargs: expected headless runs to reject bad config with status 1")
+
+
+def test_click_script():
+    source = "point A 10 20, point B 30 40\nclick A ×3, wait 200–400 ms, double-click B, repeat 2"
+    if parse_script(source) != parse_script("point A 10 20\nrepeat 2\n  click A x3\n  wait 200-400ms\n  double-click 30 40\nend"):
+        raise AssertionError("Click script: trailing repeat should match the block form")
+    program = compile_script(source)
+    ops = program.code[::3]
+    if ops.count(OP_MOVE) != 3 or ops.count(OP_LOOP) != 2 or ops.count(OP_WAIT_UNIFORM) != 1:
+        raise AssertionError(f"Click script: unexpected instruction stream {ops}")
+    try:
+        parse_script("click C")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Click script: expected an unknown point to be rejected")
+
+    clicker, sleeps = build_clicker(max_clicks=10, click_limit=0, human_like=False, script=source)
+    run_clicker(clicker)
+    if clicker.click_count != 10 or clicker.running or clicker.mouse.position != (30, 40):
+        raise AssertionError(f"Click script: expected 10 clicks ending on B, got {clicker.click_count}")
+    waits = [duration for duration in sleeps if duration >= 200]
+    if len(waits) != 2 or not all(duration <= 400 for duration in waits) or sleeps.count(10) != 4:
+        raise AssertionError(f"Click script: unexpected waits {sleeps}")
+
+    for body in ("click 1 1", "click 1 1\nwait 0 ms"):
+        endless = compile_script(f"repeat\n{body}\nend", interval=(OP_WAIT, 0.01)).code[::3]
+        if endless.count(OP_WAIT) != 1:
+            raise AssertionError(f"Click script: expected an endless loop to wait each iteration, got {endless}")
+    if compile_script("repeat\nclick 1 1\nwait 5 ms\nend", interval=(OP_WAIT, 0.01)).code[::3].count(OP_WAIT) != 1:
+        raise AssertionError("Click script: expected no extra wait in a paced endless loop")
+
+    backend = RecordingBackend()
+    clicker, _ = build_clicker(max_clicks=4, backend=backend, human_like=False, random_pos_offset=(5, 5),
+                               script="click x4")
+    run_clicker(clicker)
+    moves = [(x, y) for op, x, y in backend.events if op == "move"]
+    if len(moves) != 4 or not all(abs(x) <= 5 and abs(y) <= 5 for x, y in moves):
+        raise AssertionError(f"Click script: expected cursor-relative clicks to be offset, got {moves}")
+
+    backend = RecordingBackend()
+    clicker, sleeps = build_clicker(max_clicks=3, backend=backend, human_like=False,
+                                    script="click 1 1, wait 10 ms, click 2 2, wait 10 ms, click 3 3")
+    press, sleep = backend.press, clicker.sleep
+
+    def press_and_pause(button, x, y):
+        press(button, x, y)
+        if clicker.click_count == 0:
+            clicker.pause()
+
+    def sleep_and_resume(seconds):
+        sleep(seconds)
+        clicker.resume()
+
+    backend.press, clicker.sleep = press_and_pause, sleep_and_resume
+    run_clicker(clicker)
+    clicks = [(x, y) for op, x, y in backend.events if op == "press"]
+    if clicks != [(1, 1), (2, 2), (3, 3)] or clicker.click_count != 3:
+        raise AssertionError(f"Click script: expected a resumed script to carry on where it paused, got {clicks}")
+
+
+def test_keyboard_actions():
+    ctrl, s_key, a_key = parse_key("ctrl"), parse_key("s"), parse_key("a")
+    if parse_key_combo("ctrl+s") != (ctrl, s_key) or parse_key_combo("ctrl++") != (ctrl, parse_key("+")):
+        raise AssertionError("Keyboard: unexpected key combination parsing")
+
+    keyboard = FakeKeyboard()
+    clicker, sleeps = build_clicker(max_clicks=3, keys=["a", "ctrl+s"], keyboard=keyboard,
+                                    hold_time_enabled=True, hold_time_mean_us=50000, hold_time_std_us=0)
+    run_clicker(clicker)
+    expected = [("press", a_key), ("release", a_key), ("press", ctrl), ("press", s_key),
+                ("release", s_key), ("release", ctrl), ("press", a_key), ("release", a_key)]
+    if keyboard.events != expected or clicker.mouse.click_calls or clicker.mouse.press_count:
+        raise AssertionError(f"Keyboard: expected cycling key taps only, got {keyboard.events}")
+    if sleeps.count(50) != 3:
+        raise AssertionError("Keyboard: expected the hold-time model on key presses")
+
+    keyboard = FakeKeyboard()
+    clicker, _ = build_clicker(max_clicks=3, click_limit=0, human_like=False, keyboard=keyboard,
+                               script="press space x2, wait 5 ms, click 7 8")
+    run_clicker(clicker)
+    if len(keyboard.events) != 4 or clicker.mouse.click_calls != 1 or clicker.click_count != 3:
+        raise AssertionError("Keyboard: expected a script to interleave key presses and clicks")
+
+
+def test_control_server():
+    if parse_control_address("9000") != ("tcp", "127.0.0.1", 9000) or parse_control_address("/tmp/c.sock")[0] != "unix":
+        raise AssertionError("Control: unexpected address parsing")
+    try:
+        parse_control_address("0.0.0.0:9000")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Control: expected non-loopback hosts to be rejected")
+
+    config = {"interval_us": 100000, "profiles": {"fast": {"interval_us": 20000}}}
+    controller = SessionController(config, session=HeadlessSession(engine_factory=FakeEngine))
+    server = ControlServer(controller, "127.0.0.1:0", stats_interval_ms=10)
+    server.start()
+    host, port = server.wait_ready()
+    clients = [socket.create_connection((host, port), timeout=5) for _ in range(3)]
+    streams = [client.makefile("rwb") for client in clients]
+
+    def request(stream, message):
+        stream.write((json.dumps(message) + "\n").encode())
+        stream.flush()
+        return json.loads(stream.readline())
+
+    try:
+        if not request(streams[0], {"cmd": "start", "profile": "fast"})["ok"]:
+            raise AssertionError("Control: expected start to succeed")
+        if controller.session.engine.kwargs["interval_us"] != 20000:
+            raise AssertionError("Control: expected the profile to reach the engine")
+        stats = request(streams[0], {"cmd": "stats"})["stats"]
+        if stats != {"running": True, "paused": False, "click_count": 5, "click_limit": 0, "label": "fast",
+                     "seed": None}:
+            raise AssertionError(f"Control: unexpected stats {stats}")
+        if request(streams[0], {"cmd": "start", "profile": "missing"})["ok"]:
+            raise AssertionError("Control: expected an unknown profile to fail")
+        for stream in streams[1:]:
+            if request(stream, {"cmd": "subscribe"})["stats"]["click_count"] != 5:
+                raise AssertionError("Control: expected current stats in the subscribe reply")
+        controller.session.engine.click_count = 9
+        for stream in streams[1:]:
+            event = json.loads(stream.readline())
+            while event["click_count"] != 9:
+                event = json.loads(stream.readline())
+            if event.get("event") != "stats":
+                raise AssertionError(f"Control: unexpected stats event {event}")
+        request(streams[0], {"cmd": "configure", "config": {"interval_us": 70000}})
+        request(streams[0], {"cmd": "stop"})
+        if controller.config["interval_us"] != 70000 or controller.session.is_clicking():
+            raise AssertionError("Control: expected configure and stop to apply")
+    finally:
+        for client in clients:
+            client.close()
+        server.stop()
+        server.join(5)
+
+    with tempfile.TemporaryDirectory() as directory:
+        notes = os.path.join(directory, "notes.txt")
+        with open(notes, "w") as f:
+            f.write("keep")
+        server = ControlServer(controller, notes)
+        server.start()
+        server.join(5)
+        if not isinstance(server.error, FileExistsError) or not os.path.isfile(notes):
+            raise AssertionError("Control: expected a regular file at the socket path to be left alone")
+        path = os.path.join(directory, "control.sock")
+        with socket.socket(socket.AF_UNIX) as stale:
+            stale.bind(path)
+        server = ControlServer(controller, path)
+        server.start()
+        if server.wait_ready() != path:
+            raise AssertionError("Control: expected a stale socket to be replaced")
+        server.stop()
+        server.join(5)
+        if os.path.exists(path):
+            raise AssertionError("Control: expected the bound socket to be removed on stop")
+
+
+def test_engine_metrics():
+    metrics = EngineMetrics()
+    try:
+        clicker, _ = build_clicker(
+            max_clicks=8,
+            click_type="double",
+            metrics=metrics,
+            thinking_pause_enabled=True,
+            thinking_pause_mean_us=50000,
+            thinking_pause_std_us=0,
+            thinking_pause_min_clicks=4,
+            thinking_pause_max_clicks=4,
+        )
+        run_clicker(clicker)
+        text = metrics.render()
+        for line in (
+            'autoclicker_clicks_total{button="left",type="double"} 4',
+            'autoclicker_clicks_total{button="right",type="single"} 0',
+            "autoclicker_thinking_pauses_total 1",
+            "autoclicker_backend_call_seconds_count 4",
+            'autoclicker_deadline_overshoot_seconds_bucket{le="5e-05"} 3',
+            "autoclicker_deadline_overshoot_seconds_count 3",
+        ):
+            if line not in text.splitlines():
+                raise AssertionError(f"Metrics: missing '{line}' in:\n{text}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "autoclicker.prom")
+            write_textfile(metrics, path)
+            with open(path) as f:
+                if f.read() != text or os.listdir(directory) != ["autoclicker.prom"]:
+                    raise AssertionError("Metrics: expected the textfile to be replaced atomically")
+            textfile = TextfileExporter(metrics, path, interval_ms=60000)
+            textfile.start()
+            textfile.stop()
+            if textfile.is_alive():
+                raise AssertionError("Metrics: expected stop to wait for the textfile writer")
+
+        exporter = MetricsHTTPExporter(metrics, 0)
+        try:
+            host, port = exporter.address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                if response.read().decode() != text:
+                    raise AssertionError("Metrics: expected the HTTP endpoint to serve the same text")
+        finally:
+            exporter.stop()
+        if exporter.render() is not None or exporter.active:
+            raise AssertionError("Metrics: expected no scrape to render after stop")
+    finally:
+        metrics.close()
+    if any(metrics_from_config(value) != (None, None) for value in (True, "9100", [9100])):
+        raise AssertionError("Metrics: expected a non-object metrics config to be ignored")
+
+
+def test_engine_trace():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.json")
+        tracer = Tracer(path)
+        clicker, _ = build_clicker(
+            max_clicks=4,
+            click_type="double",
+            target_pos=(100, 100),
+            hold_time_enabled=True,
+            hold_time_std_us=0,
+            tracer=tracer,
+        )
+        run_clicker(clicker)
+        with open(path) as f:
+            trace = json.load(f)
+        clicker.start_clicking()
+        if tracer.count or list(tracer.spans()):
+            raise AssertionError(f"Trace: expected a new session to start an empty trace, got {tracer.count} spans")
+
+    spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    click = ["press", "hold sleep", "release"]
+    expected = ["fatigue bookkeeping", "position", "cursor move"] + click + ["double-click gap"] + click
+    expected = expected + ["schedule next", "interval sleep"] + expected
+    names = [event["name"] for event in spans]
+    if names != expected:
+        raise AssertionError(f"Trace: expected stages {expected}, got {names}")
+    holds = [event["dur"] for event in spans if event["name"] == "hold sleep"]
+    if any(abs(dur - clicker.hold_time_mean_us) > 1 for dur in holds):
+        raise AssertionError(f"Trace: expected hold spans of {clicker.hold_time_mean_us} us, got {holds}")
+    if any(b["ts"] < a["ts"] + a["dur"] - 0.001 for a, b in zip(spans, spans[1:])):
+        raise AssertionError("Trace: expected spans to follow each other in time")
+
+
+def test_sampling_profiler():
+    done = []
+
+    def spin():
+        while not done:
+            sum(range(1000))
+
+    worker = threading.Thread(target=spin, name="click engine")
+    worker.start()
+    profiler = start_profiler(lambda: [worker], interval_ms=1)
+    try:
+        time.sleep(0.2)
+    finally:
+        profiler.stop()
+        done.append(True)
+        worker.join()
+
+    rows = {label.split(" ")[0]: (self_count, total) for label, self_count, total in profiler.function_stats()}
+    spin_self, spin_total = rows.get("test_sampling_profiler.<locals>.spin", (0, 0))
+    if spin_total == 0 or spin_self != spin_total or "Thread.run" not in rows:
+        raise AssertionError(f"Profiler: expected samples in spin() under Thread.run, got {rows}")
+    with tempfile.TemporaryDirectory() as directory:
+        prefix = os.path.join(directory, "profile")
+        profiler.write(prefix)
+        with open(f"{prefix}.collapsed") as f:
+            lines = f.read().splitlines()
+    if not lines or not all(line.startswith("click engine;") and line.rsplit(" ", 1)[1].isdigit() for line in lines):
+        raise AssertionError(f"Profiler: expected collapsed stacks rooted at the thread name, got {lines[:3]}")
+
+
+def test_input_backends():
+    if available_backends()[0] != "pynput":
+        raise AssertionError(f"Backends: expected auto to keep pynput over xtest, got {available_backends()}")
+    register_backend("test-fast", RecordingBackend, rank=10)
+    register_backend("test-missing", RecordingBackend, available=lambda: False, rank=20)
+    try:
+        if available_backends()[0] != "test-fast" or not isinstance(create_backend(), RecordingBackend):
+            raise AssertionError(f"Backends: expected auto to pick test-fast, got {available_backends()}")
+        if backend_from_config("test-missing") is not None or backend_from_config("nope") is not None:
+            raise AssertionError("Backends: expected unknown or unavailable names to fall back to auto")
+        if backend_from_config("test-fast") != "test-fast":
+            raise AssertionError("Backends: expected an available backend name to pass through")
+        if auto_backend_name({}) != "test-fast" or auto_backend_name({"pynput": 90.0, "test-missing": 1.0}) != "pynput":
+            raise AssertionError("Backends: expected auto to pick the fastest measured available backend")
+        with tempfile.TemporaryDirectory() as directory:
+            path = get_backend_results_path(directory)
+            write_backend_results({"pynput": {"p50_us": 90.0, "events_per_sec": 1000.0}}, path)
+            if read_backend_results(path) != {"pynput": 90.0}:
+                raise AssertionError("Backends: expected saved bench results to read back")
+            with open(path) as f:
+                data = json.load(f)
+            write_atomic(path, json.dumps(dict(data, host="elsewhere")))
+            if read_backend_results(path) != {}:
+                raise AssertionError("Backends: expected results from another machine to be ignored")
+    finally:
+        BACKENDS.pop("test-fast")
+        BACKENDS.pop("test-missing")
+
+    backend = RecordingBackend()
+    clicker, _ = build_clicker(max_clicks=4, click_type="double", target_pos=(10, 20), backend=backend)
+    run_clicker(clicker)
+    click = [("press", 10, 20), ("release", 10, 20)] * 2
+    if backend.events != ([("move", 10, 20)] + click) * 2 or clicker.mouse.click_calls:
+        raise AssertionError(f"Backends: expected the engine to drive the given backend, got {backend.events}")
+
+
+def test_xtest_backend():
+    xlib = FakeXlib()
+    saved = backends._xtest_libs
+    backends._xtest_libs = (xlib, xlib)
+    try:
+        backend = XTestBackend()
+    finally:
+        backends._xtest_libs = saved
+    clicker, _ = build_clicker(max_clicks=4, click_type="double", target_pos=(10, 20), backend=backend)
+    run_clicker(clicker)
+    click = [("motion", 10, 20)] + [("button", 1, 1), ("button", 1, 0)] * 2 + [("flush",)]
+    if xlib.calls != click * 2 + [("close",)]:
+        raise AssertionError(f"XTest: expected one flush per click with the move queued, got {xlib.calls}")
+
+    xlib.calls.clear()
+    backend.display = 1
+    backend.batch([("move", 5, 6), ("press", Button.right, 5, 6), ("release", Button.right, 5, 6)])
+    if xlib.calls != [("motion", 5, 6), ("button", 3, 1), ("button", 3, 0), ("flush",)]:
+        raise AssertionError(f"XTest: expected a batch to flush once, got {xlib.calls}")
+
+    xlib.calls.clear()
+    clicker, _ = build_clicker(max_clicks=1, target_pos=(10, 20), backend=backend, hold_time_enabled=True)
+    run_clicker(clicker)
+    held = [("motion", 10, 20), ("button", 1, 1), ("flush",), ("button", 1, 0), ("flush",), ("close",)]
+    if xlib.calls != held:
+        raise AssertionError(f"XTest: expected a held click to send the move with the press, got {xlib.calls}")
+
+
+def test_cursor_cache():
+    backend = RecordingBackend()
+    clicker, _ = build_clicker(max_clicks=2, backend=backend, cursor_cache=True)
+    clicker.cursor.listener_factory = FakeListener
+    clicker.start_clicking()
+    clicker.cursor.listener.on_move(30, 40)
+    clicker.run()
+    if backend.events != [("press", 30, 40), ("release", 30, 40)] * 2:
+        raise AssertionError(f"Cursor cache: expected clicks at the listener's position, got {backend.events}")
+    if clicker.cursor.listener is not None:
+        raise AssertionError("Cursor cache: expected the listener to stop with the session")
+
+    backend = RecordingBackend()
+    clicker, _ = build_clicker(max_clicks=3, human_like=False, target_pos=(10, 20), backend=backend, cursor_cache=True)
+    clicker.cursor.listener_factory = FakeListener
+    run_clicker(clicker)
+    moves = [event for event in backend.events if event[0] == "move"]
+    if moves != [("move", 10, 20)] or len(backend.events) != 7:
+        raise AssertionError(f"Cursor cache: expected one move to a fixed target, got {backend.events}")
+
+
+def test_specialized_loop_matches_generic():
+    configs = (
+        {"target_pos": (50, 60), "random_pos_offset": (4, 3), "random_interval_us": 7000, "hold_time_enabled": True,
+         "thinking_pause_enabled": True, "thinking_pause_min_clicks": 5, "thinking_pause_max_clicks": 9,
+         "fatigue_enabled": True, "fatigue_duration_us": 100000, "click_type": "double"},
+        {"human_like": False, "interval_mode": "Exponential", "random_pos_offset": (5, 0)},
+        {"keys": ["a", "ctrl+b"], "hold_time_enabled": True, "fatigue_enabled": True},
+        {"button": "right", "random_interval_us": 3000, "click_limit": 0},
+    )
+    for overrides in configs:
+        runs = []
+        for specialize in (False, True):
+            backend = RecordingBackend()
+            clicker, sleeps = build_clicker(max_clicks=30, backend=backend, keyboard=FakeKeyboard(),
+                                            specialize=specialize, **overrides)
+            run_clicker(clicker)
+            runs.append((backend.events, clicker.keyboard.events, sleeps, clicker.click_count))
+        if runs[0] != runs[1]:
+            raise AssertionError(f"Specialized loop: expected the same clicks and sleeps as the generic loop for {overrides}")
+
+
+def test_profile_hot_switch():
+    config = {"timing_model": "Uniform", "interval_us": 10000, "human_like": False, "pos_x": 10, "pos_y": 10,
+              "offset_x": 0, "offset_y": 0, "profiles": {"far": {"pos_x": 90, "pos_y": 90, "interval_us": 40000}}}
+    snapshot = profile_snapshot(config, "far")
+    if snapshot["target_pos"] != (90, 90) or "backend" in snapshot:
+        raise AssertionError(f"Hot switch: unexpected snapshot {snapshot}")
+    if profile_hotkeys_from_config({"f9": "far"}) != {"F9": "far"} or profile_hotkeys_from_config(["far"]) is not None:
+        raise AssertionError("Hot switch: expected hotkeys to normalize and reject non-objects")
+
+    for specialize in (False, True):
+        backend = RecordingBackend()
+        clicker, sleeps = build_clicker(max_clicks=6, backend=backend, specialize=specialize, human_like=False,
+                                        target_pos=(10, 10))
+        press = backend.press
+
+        def press_and_switch(button, x, y):
+            press(button, x, y)
+            if clicker.click_count == 2:
+                clicker.switch_params(snapshot)
+
+        backend.press = press_and_switch
+        run_clicker(clicker)
+        clicks = [(x, y) for op, x, y in backend.events if op == "press"]
+        if clicks != [(10, 10)] * 3 + [(90, 90)] * 3 or sleeps[:6] != [10, 10, 10, 40, 40, 40]:
+            raise AssertionError(f"Hot switch (specialize={specialize}): expected the switch at the next click, "
+                                 f"got {clicks} {sleeps}")
+        if clicker.switch_latency_sec is None or clicker.pending_params is not None:
+            raise AssertionError("Hot switch: expected the switch to be applied and timed")
+
+    backend = RecordingBackend()
+    clicker, sleeps = build_clicker(max_clicks=6, backend=backend, human_like=False, script="click 1 1 x6")
+    press = backend.press
+
+    def press_and_switch(button, x, y):
+        press(button, x, y)
+        if clicker.click_count == 2:
+            clicker.switch_params(dict(snapshot, random_pos_offset=(3, 3)))
+
+    backend.press = press_and_switch
+    run_clicker(clicker)
+    clicks = [(x, y) for op, x, y in backend.events if op == "press"]
+    if sleeps[:5] != [10, 10, 40, 40, 40] or clicks[:3] != [(1, 1)] * 3 or len(clicks) != 6:
+        raise AssertionError(f"Hot switch: expected a script to switch at the next click, got {clicks} {sleeps}")
+    if not all(abs(x - 1) <= 3 and abs(y - 1) <= 3 for x, y in clicks[3:]) or clicker.pending_params is not None:
+        raise AssertionError(f"Hot switch: expected the switched offset to reach the script, got {clicks}")
+
+
+def test_injection_verifier():
+    clock = FakeClock()
+    verifier = InjectionVerifier(timeout_ms=50, clock=clock.perf_counter, sleep=clock.sleep,
+                                 listener_factory=FakeClickListener)
+    backend = LoopbackBackend(clock)
+    backend.verifier = verifier
+    clicker, _ = build_clicker(max_clicks=8, clock=clock, backend=backend, verifier=verifier, human_like=False,
+                               target_pos=(40, 50))
+    clicker.start_clicking()
+    verifier.listener.on_click(5, 5, Button.right, True)
+    clicker.run()
+    report = verifier.report()
+    if (report["issued"], report["observed"], report["dropped"], report["extra"]) != (16, 14, 2, 1):
+        raise AssertionError(f"Verifier: unexpected counts {report}")
+    if round(report["latency_p50_us"]) != 2000 or report["position_error_max_px"] != 1:
+        raise AssertionError(f"Verifier: expected 2 ms latency and 1 px error, got {report}")
+    if verifier.listener is not None:
+        raise AssertionError("Verifier: expected the listener to stop after the session")
+    if verifier_from_config({"timeout_ms": "x"}) is not None or verifier_from_config(True) is None:
+        raise AssertionError("Verifier: unexpected config parsing")
+
+
+def test_layout_manager():
+    calls = []
+    passes = []
+    root = FakeIdleRoot()
+    layout = LayoutManager(root, lambda: passes.append(1))
+    entries = [FakeWidget(calls) for _ in range(3)]
+    rows = [FakeWidget(calls) for _ in range(2)]
+
+    layout.set_state(entries, True)
+    layout.apply_rows(rows, True)
+    calls.clear()
+    if layout.set_state(entries, True) or layout.apply_rows(rows, True) or calls:
+        raise AssertionError(f"Layout: expected no Tk calls for unchanged state, got {calls}")
+
+    layout.set_state(entries[:1], False)
+    if not layout.apply_rows(rows[1:], False) or [call[0] for call in calls] != ["configure", "grid_remove"]:
+        raise AssertionError(f"Layout: expected only the changed widgets to be touched, got {calls}")
+
+    for _ in range(5):
+        layout.request_geometry()
+    root.run_idle()
+    layout.request_geometry()
+    root.run_idle()
+    if len(passes) != 2:
+        raise AssertionError(f"Layout: expected one geometry pass per idle cycle, got {len(passes)}")
+
+
+def test_theme_loads_lazily():
+    # Plain Tcl with Tk stubbed out: only checks which theme files sv.tcl sources.
+    interp = tkinter.Tcl()
+    interp.eval("""
+        package provide Tk 8.6
+        proc font args {}
+        proc bind args {}
+        proc winfo args { return Tk }
+        proc tk args { return x11 }
+        namespace eval ttk { proc style args { return [list clam {*}$::loaded_themes] } }
+        set loaded_themes {}
+        set sourced {}
+    """)
+    sv_tcl = os.path.join(os.path.dirname(os.path.abspath(__file__)), "themes", "sun-valley", "sv.tcl")
+    interp.call("source", sv_tcl)
+    interp.eval("""
+        rename source tcl_source
+        proc source path {
+            lappend ::sourced [file tail $path]
+            lappend ::loaded_themes sun-valley-[file rootname [file tail $path]]
+        }
+    """)
+    if interp.eval("set sourced"):
+        raise AssertionError("Theme: expected sv.tcl not to load any theme by itself")
+    interp.call("sv_load_theme", "dark")
+    interp.call("sv_load_theme", "dark")
+    if interp.eval("set sourced") != "dark.tcl":
+        raise AssertionError(f"Theme: expected dark.tcl to load once, got {interp.eval('set sourced')}")
+
+
+def test_profile_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        write_atomic(path, "{}")
+        if os.listdir(tmp) != ["config.json"]:
+            raise AssertionError(f"Autosave: expected no temp file left behind, got {os.listdir(tmp)}")
+
+        # Two writers to one path (e.g. the UI and a --headless instance) each use their own temp file.
+        errors = []
+
+        def write_many(text):
+            try:
+                for _ in range(50):
+                    write_atomic(path, text)
+            except OSError as exc:
+                errors.append(exc)
+
+        writers = [threading.Thread(target=write_many, args=(text,)) for text in ('{"a": 1}', '{"b": 2}')]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        with open(path) as f:
+            content = f.read()
+        if errors or content not in ('{"a": 1}', '{"b": 2}') or os.listdir(tmp) != ["config.json"]:
+            raise AssertionError(f"Atomic write: concurrent writers failed ({errors}, {content!r}, {os.listdir(tmp)})")
+        os.chmod(path, 0o640)
+        write_atomic(path, "{}")
+        if stat.S_IMODE(os.stat(path).st_mode) != 0o640:
+            raise AssertionError(f"Atomic write: expected the file mode to be kept, got {oct(os.stat(path).st_mode)}")
+
+        saver = AutoSaver(delay_ms=20)
+        saver.start()
+        for interval_ms in (10, 20, 30):
+            saver.schedule(path, {"interval_ms": interval_ms})
+        deadline = time.monotonic() + 2
+        while saver.writes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with open(path) as handle:
+            saved = json.load(handle)
+        if saver.writes != 1 or saved != {"interval_ms": 30}:
+            raise AssertionError(f"Autosave: expected one debounced write of the last value, got {saver.writes} {saved}")
+        saver.schedule(path, {"interval_ms": 30})
+        saver.stop()
+        if saver.writes != 1:
+            raise AssertionError("Autosave: expected unchanged content not to be rewritten")
+
+        directory = os.path.join(tmp, "profiles")
+        saver = AutoSaver()
+        store = ProfileStore(directory, saver=saver)
+        store.put("fast", {"interval_us": 20000})
+        store.put("slow/1", {"interval_us": 500000})
+        store.put("fast", {"interval_us": 20000})
+        saver.stop()
+        if saver.writes != 2:
+            raise AssertionError(f"Profiles: expected one write per changed profile, got {saver.writes}")
+
+        store = ProfileStore(directory)
+        if store.names() != ["fast", "slow/1"] or store.cache:
+            raise AssertionError(f"Profiles: expected names listed without reading files, got {store.names()}")
+        config = resolve_profile({"interval_us": 100000, "profiles": {"fast": {"interval_us": 5000}}}, "slow/1", store)
+        if config["interval_us"] != 500000 or list(store.cache) != ["slow/1"]:
+            raise AssertionError(f"Profiles: expected only the used profile to load, got {store.cache}")
+        if resolve_profile({"profiles": {"fast": {"interval_us": 5000}}}, "fast", store)["interval_us"] != 5000:
+            raise AssertionError("Profiles: expected inline config profiles to win")
+        store.delete("fast")
+        if ProfileStore(directory).names() != ["slow/1"]:
+            raise AssertionError("Profiles: expected delete to remove the file")
+
+
+def test_parameter_sweep():
+    if parse_axis("exp_mean_interval_ms=50:200:50") != ("exp_mean_interval_ms", [50, 100, 150, 200]):
+        raise AssertionError("Sweep: expected an inclusive integer range")
+    if parse_axis("thinking_pause_enabled=true,false") != ("thinking_pause_enabled", [True, False]):
+        raise AssertionError("Sweep: expected JSON-parsed list values")
+
+    steady = simulate({"timing_model": "Uniform", "interval_us": 50000, "human_like": False}, duration_sec=60)
+    if abs(steady["cps"] - 20) > 0.5 or steady["pause_share"] or abs(steady["interval_p99_ms"] - 50) > 1e-6:
+        raise AssertionError(f"Sweep: expected 20 CPS at a fixed 50 ms interval, got {steady}")
+    paused = simulate({"timing_model": "Uniform", "interval_us": 50000, "thinking_pause_min_clicks": 10,
+                       "thinking_pause_max_clicks": 10, "fatigue_enabled": False}, duration_sec=60)
+    if not 0.5 < paused["pause_share"] < 0.9 or paused["cps"] >= steady["cps"]:
+        raise AssertionError(f"Sweep: expected thinking pauses to take time share and CPS, got {paused}")
+
+    base = {"timing_model": "Exponential", "fatigue_enabled": False}
+    points = grid_points([parse_axis("exp_mean_interval_ms=40,80"), parse_axis("thinking_pause_enabled=true,false")])
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "sweep.csv" + CHECKPOINT_SUFFIX)
+        rows = run_sweep(base, points, duration_sec=30, checkpoint_path=checkpoint, workers=2)
+        if [row["exp_mean_interval_ms"] for row in rows] != [40, 40, 80, 80] or rows[0]["cps"] <= rows[2]["cps"]:
+            raise AssertionError(f"Sweep: expected rows in grid order, got {rows}")
+
+        # A crash after one point, mid-way through writing the next.
+        with open(checkpoint) as handle:
+            first = handle.readline()
+        with open(checkpoint, "w") as handle:
+            handle.write(first + first[:20])
+        resumed = run_sweep(base, points, duration_sec=30, checkpoint_path=checkpoint, workers=1)
+        with open(checkpoint) as handle:
+            lines = handle.read().splitlines()
+        if resumed != rows or len(lines) != 4:
+            raise AssertionError(f"Sweep: expected a resume to rerun only missing points, got {len(lines)} lines")
+
+
+def test_settings_preview():
+    base = {"timing_model": "Exponential", "exp_mean_interval_us": 80000, "fatigue_enabled": False}
+    key = preview_key(base)
+    if preview_key(dict(base, interval_us=999000, thinking_pause_enabled=True, pos_x=7)) != key:
+        raise AssertionError("Preview: expected settings that don't change timing to share a key")
+    if preview_key(dict(base, exp_mean_interval_us=81000)) == key or preview_key(dict(base, fatigue_duration_us=1000)) != key:
+        raise AssertionError("Preview: expected the key to follow only active timing parameters")
+
+    results = []
+    done = threading.Event()
+    release = threading.Event()
+
+    def slow_simulate(config, duration_sec):
+        release.wait(2)
+        return {"cps": 1_000_000 / config["exp_mean_interval_us"], "pause_share": 0.1, "cooldown_share": 0.0,
+                "interval_p50_ms": 50.0, "interval_p95_ms": 200.0}
+
+    def on_result(result_key, result):
+        results.append(result_key)
+        done.set()
+
+    worker = PreviewWorker(on_result, cache_size=2, simulate_fn=slow_simulate,
+                           executor_factory=lambda: ThreadPoolExecutor(max_workers=1))
+    worker.start()
+    try:
+        configs = [dict(base, exp_mean_interval_us=value * 1000) for value in (50, 100, 200)]
+        keys = [preview_key(config) for config in configs]
+        started = time.perf_counter()
+        for config_key, config in zip(keys, configs):
+            if worker.request(config_key, config) is not None:
+                raise AssertionError("Preview: expected an uncached request to be queued")
+        if time.perf_counter() - started > 0.1:
+            raise AssertionError("Preview: expected requests not to wait for the simulation")
+        release.set()
+        deadline = time.monotonic() + 2
+        while keys[-1] not in results and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if results[-1] != keys[-1] or worker.runs > 2:
+            raise AssertionError(f"Preview: expected queued edits to collapse to the newest, got {worker.runs} runs")
+        cached = worker.request(keys[-1], configs[-1])
+        if cached is None or "5.0 CPS" not in format_preview(cached):
+            raise AssertionError(f"Preview: expected a repeated request to hit the cache, got {cached}")
+        for config_key, config in zip(keys[:2], configs[:2]):
+            done.clear()
+            if worker.request(config_key, config) is None:
+                done.wait(2)
+        if keys[-1] in worker.cache or len(worker.cache) != 2:
+            raise AssertionError("Preview: expected the least recently used result to be evicted")
+    finally:
+        worker.stop()
+
+    done.clear()
+    worker = PreviewWorker(on_result, duration_sec=5)
+    worker.start()
+    try:
+        worker.request(key, base)
+        done.wait(30)
+        if "cps" not in worker.cache.get(key, {}) or not isinstance(worker.executor, ProcessPoolExecutor):
+            raise AssertionError("Preview: expected the simulation to run in a child process")
+    finally:
+        worker.stop()
+
+
+def test_random_streams():
+    stream = CounterRandom(stream_key(7, "interval"))
+    draws = [stream.random() for _ in range(200)]
+    jumped = CounterRandom(stream_key(7, "interval"))
+    jumped.jump(130)
+    if jumped.random() != draws[130]:
+        raise AssertionError("Streams: expected a jump to land on the same draw")
+    if RandomStreams(7).fork(1).interval.random() == draws[0] or RandomStreams(7).position.random() == draws[0]:
+        raise AssertionError("Streams: expected chunks and subsystems to get distinct streams")
+
+    def interval_sleeps(runs=1, **overrides):
+        clock = FakeClock()
+        sleeps = []
+        clicker_ref = {}
+
+        def sleep_fn(seconds):
+            clicker = clicker_ref["clicker"]
+            if not clicker.running:
+                clicker.program_running = False
+                return
+            clock.sleep(seconds)
+            sleeps.append(seconds)
+
+        params = {"interval_mode": "Exponential", "exp_mean_interval_us": 40000, "human_like": True,
+                  "thinking_pause_enabled": False, "fatigue_enabled": False, "click_limit": 40}
+        params.update(overrides)
+        clicker = AutoClicker(100_000, 0, "single", "left", seed=1234, time_provider=clock.perf_counter,
+                              sleep_fn=sleep_fn, mouse=FakeMouse(), **params)
+        clicker_ref["clicker"] = clicker
+        for _ in range(runs):
+            clicker.start_clicking()
+            clicker.program_running = True
+            clicker.run()
+        return sleeps
+
+    plain = interval_sleeps()
+    if interval_sleeps(random_pos_offset=(5, 5), drift_enabled=True, target_pos=(50, 50)) != plain:
+        raise AssertionError("Streams: expected drift not to shift the interval sequence")
+    if interval_sleeps(specialize=False) != plain or interval_sleeps(runs=2) != plain * 2:
+        raise AssertionError("Streams: expected every session to replay exactly from its seed")
+    if engine_kwargs_from_config({"seed": "42"})["seed"] != 42:
+        raise AssertionError("Streams: expected the config seed to reach the engine")
+
+
+def test_microsecond_durations():
+    legacy = {"interval_ms": 0.25, "hold_time_mean_ms": "40", "exp_mean_interval_ms": 80, "exp_mean_interval_us": 500,
+              "random_interval": 0.01, "lambda_rate": 10, "profiles": {"fast": {"thinking_pause_mean_ms": 1.5}}}
+    migrated = migrate_config(legacy)
+    expected = {"interval_us": 250, "hold_time_mean_us": 40000, "exp_mean_interval_us": 500,
+                "random_interval_us": 10000, "profiles": {"fast": {"thinking_pause_mean_us": 1500}}}
+    if migrated != expected or "interval_ms" not in legacy:
+        raise AssertionError(f"Durations: unexpected migration {migrated}")
+    for text in ("inf", "1e999", "-inf", "nan"):
+        try:
+            engine_kwargs_from_config({"timing_model": "Uniform", "interval_ms": text})
+        except ValueError:
+            continue
+        raise AssertionError(f"Durations: expected {text!r} to be rejected")
+    if migrate_config({"lambda_rate": 10})["exp_mean_interval_us"] != 100000:
+        raise AssertionError("Durations: expected lambda_rate to become a mean interval")
+    base = {"interval_us": 100000, "profiles": {"fast": {"interval_ms": 0.5}}}
+    if engine_kwargs_from_config(resolve_profile(base, "fast"))["interval_us"] != 500:
+        raise AssertionError("Durations: expected a millisecond profile to override the microsecond base")
+
+    clicker, sleeps = build_clicker(max_clicks=5, interval_us=250, human_like=False)
+    run_clicker(clicker)
+    if clicker.click_count != 5 or any(abs(duration - 0.25) > 1e-9 for duration in sleeps[:4]):
+        raise AssertionError(f"Durations: expected 0.25 ms waits, got {sleeps}")
+    if parse_script("wait 250us") != [("wait", 250, 250)] or compile_script("wait 1.5 ms").code[:2] != [OP_WAIT, 0.0015]:
+        raise AssertionError("Durations: expected microsecond script waits")
+
+    clock = FakeClock()
+    slept = []
+
+    def coarse_sleep(seconds):
+        slept.append(seconds)
+        clock.sleep(seconds * 0.9)
+
+    def clock_ns():
+        clock.current += 0.00001
+        return round(clock.current * 1e9)
+
+    spin_sleeper(200, sleep=coarse_sleep, clock_ns=clock_ns)(0.001)
+    if len(slept) != 1 or not 0.0007 < slept[0] < 0.0008 or clock.current < 0.001:
+        raise AssertionError(f"Durations: expected a coarse sleep then a spin to the deadline, got {slept}")
+    if normalize_tuning({"spin_us": "200"}) != {"spin_us": 200} or normalize_tuning({"spin_us": "x"}):
+        raise AssertionError("Durations: expected spin_us to be validated")
+
+
+def wait_for(condition, timeout_sec=2.0):
+    deadline = time.monotonic() + timeout_sec
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+
+def test_user_takeover():
+    # Character hotkeys: the dummy pynput backend aliases every named Key.
+    hotkeys = app_hotkeys({"hotkey_start": "Q", "hotkey_pick": "F8", "profile_hotkeys": {"z": "fast"}})
+    guard = takeover_from_config({"idle_ms": 50}, hotkeys)
+    guard.mouse_listener_factory = guard.keyboard_listener_factory = FakeInputListener
+    stats = SharedStats()
+    clicker, sleeps = build_clicker(max_clicks=8, takeover=guard, human_like=False, target_pos=(40, 50),
+                                    random_pos_offset=(3, 3), stats=stats)
+    clicker.start_clicking()
+    pointer, keyboard = guard.listeners
+    pointer.on_move(42, 47)
+    pointer.on_click(43, 53, Button.left, True)
+    pointer.on_move(300, 300, True)
+    keyboard.on_press(parse_key("a"), True)
+    keyboard.on_press(parse_key("q"))
+    keyboard.on_release(parse_key("Z"))
+    if not clicker.running or guard.takeovers:
+        raise AssertionError("Takeover: expected our own, injected and hotkey events to be ignored")
+    taken_at = time.monotonic()
+    pointer.on_move(300, 300)
+    if clicker.running or not clicker.paused or guard.takeovers != 1:
+        raise AssertionError("Takeover: expected a real move to pause the engine at once")
+    if not stats.running or not stats.paused:
+        raise AssertionError("Takeover: expected a process engine to report the pause through shared stats")
+    time.sleep(0.03)
+    keyboard.on_press(parse_key("a"))
+    if not wait_for(lambda: clicker.running) or time.monotonic() - taken_at < 0.08 or stats.paused:
+        raise AssertionError("Takeover: expected the resume to wait for idle_ms after the last event")
+    pointer.on_click(40, 50, Button.right, True)
+    if not clicker.paused:
+        raise AssertionError("Takeover: expected a click with another button to pause")
+    clicker.stop_clicking()
+    pointer.on_scroll(0, 0, 0, 1)
+    if clicker.paused or pointer.alive or guard.thread is not None:
+        raise AssertionError("Takeover: expected stop to end the pause, listeners and resume thread")
+
+    # A session paused mid-run carries on where it left off.
+    clicker.start_clicking()
+    pointer, _keyboard = guard.listeners
+    engine_sleep = clicker.sleep
+
+    def sleep(seconds):
+        if clicker.click_count == 3 and not guard.takeovers:
+            pointer.on_scroll(0, 0, 0, 1)
+        if clicker.paused:
+            time.sleep(0.001)
+        engine_sleep(seconds)
+    guard.takeovers = 0
+    clicker.sleep = sleep
+    clicker.run()
+    if clicker.click_count != 8 or guard.takeovers != 1 or 100 not in sleeps:
+        raise AssertionError(f"Takeover: expected 8 clicks around one pause, got {clicker.click_count}")
+    clicker.stop_clicking()
+    stats.close()
+    if takeover_from_config({"idle_ms": "x"}) is not None or takeover_from_config({"idle_ms": 250}).idle_sec != 0.25:
+        raise AssertionError("Takeover: unexpected config parsing")
+
+
 def run_all_tests():
     tests = [
         test_thinking_pause_toggle,
@@ -265,6 +1543,33 @@ def run_all_tests():
         test_hold_time_toggle,
         test_drift_toggle,
         test_background_clicker_usage,
+        test_shared_stats_recording,
+        test_process_clicker_limit,
+        test_thread_tuning_fallback,
+        test_pixel_condition_gate,
+        test_template_locator,
+        test_scheduled_sessions,
+        test_engine_kwargs_from_config,
+        test_click_script,
+        test_keyboard_actions,
+        test_control_server,
+        test_engine_metrics,
+        test_engine_trace,
+        test_sampling_profiler,
+        test_input_backends,
+        test_xtest_backend,
+        test_cursor_cache,
+        test_specialized_loop_matches_generic,
+        test_layout_manager,
+        test_theme_loads_lazily,
+        test_profile_store,
+        test_profile_hot_switch,
+        test_injection_verifier,
+        test_parameter_sweep,
+        test_settings_preview,
+        test_random_streams,
+        test_microsecond_durations,
+        test_user_takeover,
     ]
     for test in tests:
         test()
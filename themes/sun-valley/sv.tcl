@@ -1,7 +1,14 @@
 package require Tk 8.6-
 
-source [file join [file dirname [info script]] theme light.tcl]
-source [file join [file dirname [info script]] theme dark.tcl]
+# Each theme slices its sprite sheet when first used, so only the
+# visible one is loaded at startup.
+set ::sv_theme_dir [file join [file dirname [file normalize [info script]]] theme]
+
+proc sv_load_theme {mode} {
+  if {"sun-valley-$mode" ni [ttk::style theme names]} {
+    source [file join $::sv_theme_dir $mode.tcl]
+  }
+}
 
 
 if {[tk windowingsystem] == "win32"} {
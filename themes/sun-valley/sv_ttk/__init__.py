@@ -17,6 +17,19 @@ def _load_theme(style: ttk.Style) -> None:
         style.master._sv_ttk_loaded = True  # type: ignore
 
 
+# set_theme slices a theme's sprites on first use; this does it ahead of time.
+def load_theme(theme: str, root: tkinter.Tk | None = None) -> None:
+    style = ttk.Style(master=root)
+    _load_theme(style)
+
+    theme = theme.lower()
+
+    if theme not in {"dark", "light"}:
+        raise RuntimeError(f"not a valid sv_ttk theme: {theme}")
+
+    style.tk.call("sv_load_theme", theme)
+
+
 def get_theme(root: tkinter.Tk | None = None) -> str:
     style = ttk.Style(master=root)
     _load_theme(style)
@@ -34,6 +47,7 @@ def set_theme(theme: str, root: tkinter.Tk | None = None) -> None:
     if theme not in {"dark", "light"}:
         raise RuntimeError(f"not a valid sv_ttk theme: {theme}")
 
+    style.tk.call("sv_load_theme", theme)
     style.theme_use(f"sun-valley-{theme}")
 
 
@@ -19,6 +19,7 @@ namespace eval ttk::theme::sv_dark {
       set I($name) [image create photo -width $width -height $height]
       $I($name) copy spritesheet -from $x $y [expr {$x+$width}] [expr {$y+$height}]
     }
+    image delete spritesheet
   }
 
   load_images [file join [file dirname [info script]] spritesheet_dark.png]
@@ -38,6 +38,14 @@ def test_toggle_theme():
     assert sv_ttk.get_theme() == "light"
 
 
+def test_load_theme():
+    sv_ttk.load_theme("light")
+    assert "sun-valley-light" in ttk.Style().theme_names()
+
+    with pytest.raises(RuntimeError):
+        sv_ttk.load_theme("blue")
+
+
 def test_no_default_root():
     tkinter.NoDefaultRoot()
     with pytest.raises(RuntimeError):